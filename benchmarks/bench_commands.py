@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Throughput benchmark of concurrent attacks.
+
+Run from the repository root:
+
+    $ python benchmarks/bench_commands.py
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import conslayer
+
+# Module Constants
+ATTACKS = 20000
+THREADS = [1, 2, 4, 8, 16, 32]
+
+def setup() -> conslayer.Arena:
+    """Setup arena with a hero and a monster, that cannot die."""
+    stdout = conslayer.MessageQueue()
+    stdout.silent = True
+    conslayer.CombatantDict()["ogre"] = conslayer.Species(conslayer.Monster, "ogre", 10**9, 0, 1000.)
+    arena = conslayer.Arena()
+    arena.stop_fight()
+    arena.clear()
+    arena.add("hero")
+    arena.add("ogre")
+    conslayer.Guardian().watch(arena)
+    arena.start_fight()
+    stdout.flush()
+    return arena
+
+def run(threads: int) -> float:
+    """Run concurrent attacks and return the throughput in attacks per second."""
+    arena = setup()
+    hero = arena["hero"]
+    ogre = arena["ogre"]
+    health = ogre.health
+    attacks = ATTACKS // threads
+
+    def attacker() -> None:
+        for _ in range(attacks):
+            arena.record_attack(hero, ogre)
+
+    workers = [threading.Thread(target=attacker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    # Check that no attack was lost
+    total = attacks * threads
+    if health - ogre.health != total * hero.damage:
+        raise RuntimeError("Lost attacks")
+
+    arena.stop_fight()
+    conslayer.MessageQueue().flush()
+    return total / elapsed
+
+def main() -> None:
+    print(f"{'threads':>8} {'attacks/s':>12}")
+    for threads in THREADS:
+        print(f"{threads:>8} {run(threads):>12.0f}")
+
+if __name__ == '__main__':
+    main()
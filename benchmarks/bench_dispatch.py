@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Benchmark of the per-event overhead of state change dispatch.
+
+Compares reactivex behaviour subjects with the built-in subjects. Run from
+the repository root:
+
+    $ python benchmarks/bench_dispatch.py
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+EVENTS = 200000
+SUBSCRIBERS = [0, 1, 4]
+
+def measure(subject, subscribers: int) -> float:
+    """Measure dispatch time per event in nanoseconds."""
+    for _ in range(subscribers):
+        subject.subscribe(lambda _: None)
+    on_next = subject.on_next
+    seconds = min(timeit.repeat(lambda: on_next(None), number=EVENTS, repeat=5))
+    return seconds / EVENTS * 1e9
+
+def main() -> None:
+    print(f"{'subscribers':>12} {'reactivex ns':>14} {'builtin ns':>12} {'speedup':>8}")
+    for subscribers in SUBSCRIBERS:
+        before = measure(rx.subject.BehaviorSubject(None), subscribers)
+        after = measure(conslayer.Subject(), subscribers)
+        print(f"{subscribers:>12} {before:>14.0f} {after:>12.0f} {before / after:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Benchmark of the startup time.
+
+Measures the cumulative import times, which are reported by the interpreter
+option '-X importtime', and the wall time of short-lived processes. Run from
+the repository root:
+
+    $ python benchmarks/bench_import.py [runs]
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Module Constants
+ROOT = Path(__file__).resolve().parents[1]
+RUNS = 20
+IMPORTS = ['conslayer', 'conslayer.cli', 'conslayer.arena']
+COMMANDS = [
+    ['-c', 'pass'],
+    ['-m', 'conslayer', '--version'],
+    ['-c', 'import conslayer.arena']]
+
+def environ() -> dict:
+    """Get environment, which imports conslayer from the repository root."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
+    return env
+
+def importtime(module: str) -> float:
+    """Get cumulative import time of a module in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=environ(), capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    return 0.
+
+def walltime(args: list) -> float:
+    """Get wall time of a process in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args], env=environ(), capture_output=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+def main(runs: int = RUNS) -> None:
+    print(f"{'import':<40} {'median ms':>10} {'min ms':>8}")
+    for module in IMPORTS:
+        times = [importtime(module) for _ in range(runs)]
+        print(f"{module:<40} {statistics.median(times):>10.1f} {min(times):>8.1f}")
+    print()
+    print(f"{'process':<40} {'median ms':>10} {'min ms':>8}")
+    for args in COMMANDS:
+        times = [walltime(args) for _ in range(runs)]
+        print(f"{' '.join(args):<40} {statistics.median(times):>10.1f} {min(times):>8.1f}")
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
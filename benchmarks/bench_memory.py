@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Benchmark of the per-combatant memory.
+
+Compares combatants with a reactivex behaviour subject reference, which
+stores the combatant state and an arena subscription like combatants did
+before. Run from the repository root:
+
+    $ python benchmarks/bench_memory.py
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+COMBATANTS = 10000
+ORC = conslayer.Species(conslayer.Monster, "orc", 7, 1, 1.5)
+
+def measure(factory: Callable[[int], Any]) -> float:
+    """Measure allocated memory per object in bytes."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(COMBATANTS)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size / COMBATANTS
+
+def reference(i: int) -> Any:
+    """Reactivex behaviour subject with combatant state and subscription."""
+    state = {
+        'kind': conslayer.Monster, 'name': f"orc{i}", 'health': 7, 'damage': 1, 'interval': 1.5}
+    subject = rx.subject.BehaviorSubject(state)
+    subject.subscribe(lambda _: None)
+    return subject
+
+def compact(i: int) -> Any:
+    """Unobserved combatant, spawned from the species prototype."""
+    return ORC.spawn(f"orc{i}")
+
+def observed(i: int) -> Any:
+    """Combatant after first subscription."""
+    combatant = ORC.spawn(f"orc{i}")
+    combatant.subscribe(lambda _: None)
+    return combatant
+
+def main() -> None:
+    names = measure(lambda i: f"orc{i}")
+    before = measure(reference)
+    print(f"{'':>10} {'total':>8} {'':>7} {'without name':>14}")
+    print(f"{'reactivex':>10} {before:>8.0f} {'':>7} {before - names:>14.0f}")
+    for name, factory in [('compact', compact), ('observed', observed)]:
+        after = measure(factory)
+        ratio = (before - names) / (after - names)
+        print(f"{name:>10} {after:>8.0f} {before / after:>6.1f}x {after - names:>14.0f} {ratio:>6.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Benchmark suite of the arena hot paths.
+
+Measures throughput and latency of the hot paths for growing numbers of
+combatants in arena, writes the results as JSON and compares them with a
+baseline. The comparison fails with exit status 1, if the median time of any
+hot path exceeds the baseline by more than the threshold. The baseline is
+specific to the machine and is updated by writing the results to it. Run
+from the repository root:
+
+    $ python benchmarks/bench_suite.py [--sizes 1,10,100] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--threshold 0.5]
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+SIZES = [1, 10, 100, 1000, 10000, 100000]
+THRESHOLD = .5
+SAMPLES = 1000
+BUDGET = 20.
+REPEAT = 3
+
+#
+# Setup
+#
+
+def setup(size: int, guardian: bool = False) -> conslayer.Arena:
+    """Setup arena with a hero and immortal monsters on a virtual clock."""
+    stdout = conslayer.MessageQueue()
+    stdout.silent = True
+    conslayer.Guardian().unwatch()
+    arena = conslayer.Arena()
+    arena.stop_fight()
+    arena.clear()
+    arena.scheduler = rx.scheduler.HistoricalScheduler()
+    arena.add("hero")
+    species = conslayer.Species(conslayer.Monster, "ogre", 10**9, 0, 1000.)
+    for index in range(size):
+        arena.enter(species.spawn(f"ogre-{index}"))
+    if guardian:
+        conslayer.Guardian().watch(arena)
+    stdout.flush()
+    return arena
+
+def teardown() -> None:
+    """Remove all combatants and restore the default scheduler."""
+    conslayer.Guardian().unwatch()
+    arena = conslayer.Arena()
+    arena.stop_fight()
+    arena.clear()
+    arena.scheduler = None
+    conslayer.MessageQueue().flush()
+
+def samples(size: int) -> int:
+    """Get number of samples for operations, which cost time in the size."""
+    return max(5, min(SAMPLES, SAMPLES * 100 // size))
+
+#
+# Cases
+#
+
+def bench_add(size: int) -> List[float]:
+    """Arena.add of the combatants of a roster with the given size."""
+    setup(0)
+    combatants = conslayer.CombatantDict()
+    items = dict(combatants)
+    names = [f"ogre-{index}" for index in range(size)]
+    species = [conslayer.Species(conslayer.Monster, name, 10**9, 0, 1000.) for name in names]
+    combatants.update(zip(names, species))
+    arena = conslayer.Arena()
+    times = []
+    try:
+        for name in names:
+            start = time.perf_counter()
+            arena.add(name)
+            times.append(time.perf_counter() - start)
+    finally:
+        combatants.clear()
+        combatants.update(items)
+    return times
+
+def bench_record_attack(size: int) -> List[float]:
+    """Arena.record_attack of the hero, observed by the guardian."""
+    arena = setup(size, guardian=True)
+    arena.start_fight()
+    hero = arena["hero"]
+    ogre = arena["ogre-0"]
+    times = []
+    for _ in range(samples(size)):
+        start = time.perf_counter()
+        arena.record_attack(hero, ogre)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_guardian(size: int) -> List[float]:
+    """Guardian.on_next with the arena state."""
+    arena = setup(size)
+    guardian = conslayer.Guardian()
+    state = arena.state
+    times = []
+    for _ in range(samples(size)):
+        start = time.perf_counter()
+        guardian.on_next(state)
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_remove(size: int) -> List[float]:
+    """Arena.remove of single monsters."""
+    arena = setup(size)
+    times = []
+    for index in range(min(size, SAMPLES)):
+        start = time.perf_counter()
+        arena.remove(f"ogre-{index}")
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_clear(size: int) -> List[float]:
+    """Arena.clear of all combatants."""
+    times = []
+    for _ in range(max(1, samples(size) // 100)):
+        arena = setup(size)
+        start = time.perf_counter()
+        arena.clear()
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_fight(size: int) -> List[float]:
+    """Arena.start_fight and Arena.stop_fight including attack schedules."""
+    arena = setup(size)
+    times = []
+    for _ in range(max(1, samples(size) // 10)):
+        start = time.perf_counter()
+        arena.start_fight()
+        arena.stop_fight()
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_messages(size: int) -> List[float]:
+    """MessageQueue.queue of messages and MessageQueue.print of the queue."""
+    stdout = conslayer.MessageQueue()
+    stdout.flush()
+    stdout.silent = False
+    times = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(max(1, samples(size) // 10)):
+                start = time.perf_counter()
+                for index in range(size):
+                    stdout.queue("Hero hits Ogre. Ogre health is 10.")
+                stdout.print()
+                times.append(time.perf_counter() - start)
+    finally:
+        stdout.silent = True
+        stdout.flush()
+    return times
+
+CASES: Dict[str, Callable[[int], List[float]]] = {
+    'add': bench_add,
+    'record_attack': bench_record_attack,
+    'guardian': bench_guardian,
+    'remove': bench_remove,
+    'clear': bench_clear,
+    'fight': bench_fight,
+    'messages': bench_messages}
+
+#
+# Results
+#
+
+def summarize(times: List[float]) -> dict:
+    """Summarize operation times in microseconds and operations per second."""
+    times = sorted(times)
+    mean = statistics.mean(times)
+    return {
+        'samples': len(times),
+        'mean_us': mean * 1e6,
+        'p50_us': times[len(times) // 2] * 1e6,
+        'p99_us': times[min(len(times) - 1, int(len(times) * .99))] * 1e6,
+        'ops': 1. / mean if mean > 0 else 0.}
+
+def measure(case: str, size: int, repeat: int = REPEAT) -> dict:
+    """Measure a case for a size.
+
+    Like timeit, garbage collection is disabled while measuring and the
+    fastest of the repeated rounds is used, since slower rounds are caused
+    by other processes rather than by the measured code.
+
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            summary = summarize(CASES[case](size))
+        finally:
+            gc.enable()
+        if best is None or summary['p50_us'] < best['p50_us']:
+            best = summary
+    return best
+
+def run(sizes: List[int], cases: List[str], repeat: int = REPEAT) -> dict:
+    """Run benchmark cases for all sizes.
+
+    Larger sizes of a case are skipped, after a size exceeded the time budget
+    in seconds.
+
+    """
+    results: Dict[str, Dict[str, dict]] = {}
+    try:
+        for case in cases:
+            results[case] = {}
+            for size in sizes:
+                start = time.perf_counter()
+                summary = measure(case, size, repeat)
+                results[case][str(size)] = summary
+                print(f"{case:<14} {size:>8} {summary['p50_us']:>12.1f} "
+                    f"{summary['p99_us']:>12.1f} {summary['ops']:>12.0f}")
+                if time.perf_counter() - start > BUDGET:
+                    break
+    finally:
+        teardown()
+    return {
+        'meta': {
+            'version': conslayer.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results}
+
+def compare(results: dict, baseline: dict,
+        threshold: float = THRESHOLD) -> List[Tuple[str, str, float]]:
+    """Compare results with a baseline.
+
+    Args:
+        results (dict): Benchmark results
+        baseline (dict): Benchmark results of the baseline
+        threshold (float, optional): Tolerated relative slowdown of the median
+
+    Returns:
+        List of regressions as tuples of the case, the size and the ratio of
+        the medians. The list is empty, if no hot path slowed down.
+
+    """
+    regressions = []
+    for case, sizes in results['results'].items():
+        for size, summary in sizes.items():
+            reference = baseline.get('results', {}).get(case, {}).get(size)
+            if reference is None or reference['p50_us'] <= 0:
+                continue
+            ratio = summary['p50_us'] / reference['p50_us']
+            if ratio > 1. + threshold:
+                regressions.append((case, size, ratio))
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark suite of the arena hot paths")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+        help="comma separated numbers of monsters in arena")
+    parser.add_argument('--cases', default=','.join(CASES),
+        help="comma separated benchmark cases")
+    parser.add_argument('--repeat', type=int, default=REPEAT,
+        help="number of rounds, of which the fastest is used")
+    parser.add_argument('--output', help="path of the JSON results")
+    parser.add_argument('--baseline', help="path of the JSON baseline to compare with")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+        help="tolerated relative slowdown compared with the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = args.cases.split(',')
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases {sorted(unknown)}")
+
+    print(f"{'case':<14} {'size':>8} {'median us':>12} {'p99 us':>12} {'ops/s':>12}")
+    results = run(sizes, cases, args.repeat)
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold)
+
+        # Measure suspected regressions again to rule out temporary load
+        try:
+            for case, size, _ in regressions:
+                summary = measure(case, int(size), args.repeat)
+                if summary['p50_us'] < results['results'][case][size]['p50_us']:
+                    results['results'][case][size] = summary
+        finally:
+            teardown()
+        regressions = compare(results, baseline, args.threshold)
+        for case, size, ratio in regressions:
+            print(f"Regression: {case} ({size}) is {ratio:.2f}x slower than the baseline")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Steady-state soak test of the endless wave mode.
+
+Runs an endless wave on a virtual clock and reports memory, pool usage and
+attack processing time per reporting period. Memory and attack time are
+expected to stay flat. Run from the repository root:
+
+    $ python benchmarks/soak_wave.py [hours]
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+HOURS = 2.
+PERIOD = 600.
+SPAWN_RATE = 5.
+HERO_RATE = 10.
+LIMIT = 50
+
+def main(hours: float = HOURS) -> None:
+
+    # Setup arena with an immortal hero on a virtual clock
+    stdout = conslayer.MessageQueue()
+    stdout.silent = True
+    scheduler = rx.scheduler.HistoricalScheduler()
+    combatants = conslayer.CombatantDict()
+    combatants["hero"] = conslayer.Species(conslayer.Hero, "hero", 10**9, 2)
+    arena = conslayer.Arena()
+    arena.scheduler = scheduler
+    arena.add("hero")
+    conslayer.Guardian().watch(arena)
+    wave = conslayer.Wave(rate=SPAWN_RATE, limit=LIMIT)
+    wave.start()
+    arena.start_fight()
+
+    # Let the hero attack the first monster
+    attacks = [0, 0.]
+    def attack() -> None:
+        monsters = arena.monsters
+        if not monsters:
+            return
+        start = time.perf_counter()
+        arena["hero"].attack(monsters[0].name)
+        attacks[0] += 1
+        attacks[1] += time.perf_counter() - start
+    hero = conslayer.PeriodicTimer(scheduler, 1. / HERO_RATE, attack)
+
+    # Run fight and report per period
+    tracemalloc.start()
+    print(f"{'hours':>6} {'memory KiB':>11} {'alive':>6} {'pooled':>7} "
+        f"{'created':>8} {'recycled':>9} {'attack us':>10}")
+    for period in range(int(hours * 3600 / PERIOD)):
+        attacks[:] = [0, 0.]
+        scheduler.advance_by(PERIOD)
+        stdout.flush()
+        memory = tracemalloc.get_traced_memory()[0] / 1024
+        latency = attacks[1] / max(attacks[0], 1) * 1e6
+        print(f"{(period + 1) * PERIOD / 3600:>6.2f} {memory:>11.0f} {wave.alive:>6} "
+            f"{len(wave.pool):>7} {wave.pool.created:>8} {wave.pool.recycled:>9} "
+            f"{latency:>10.1f}")
+
+    # Cleanup
+    hero.dispose()
+    arena.stop_fight()
+    arena.clear()
+    arena.scheduler = None
+    tracemalloc.stop()
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:2]])
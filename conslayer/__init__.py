@@ -20,64 +20,49 @@ __email__ = 'patrick.michl@gmail.com'
 __maintainer__ = 'Patrick Michl'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
-# For conveniance import all classes to toplevel of conslayer package
-from conslayer.arena import Arena, Guardian
-from conslayer.combatant import Combatant, CombatantDict, Hero, Monster
-from conslayer.console import MessageQueue
+# For conveniance all classes are available at the toplevel of the conslayer
+# package. They are imported on first access, such that importing the package
+# and the command line interface does not import the combat engine.
+_exports = {
+    'Arena': 'conslayer.arena',
+    'Guardian': 'conslayer.arena',
+    'CommandQueue': 'conslayer.command',
+    'Combatant': 'conslayer.combatant',
+    'CombatantDict': 'conslayer.combatant',
+    'Hero': 'conslayer.combatant',
+    'Monster': 'conslayer.combatant',
+    'Species': 'conslayer.combatant',
+    'Dashboard': 'conslayer.dashboard',
+    'MessageQueue': 'conslayer.console',
+    'MetricsDump': 'conslayer.exporter',
+    'MetricsServer': 'conslayer.exporter',
+    'Counter': 'conslayer.metrics',
+    'Histogram': 'conslayer.metrics',
+    'Metrics': 'conslayer.metrics',
+    'FightHistory': 'conslayer.history',
+    'HealthRecorder': 'conslayer.recorder',
+    'PeriodicTimer': 'conslayer.scheduler',
+    'Subject': 'conslayer.subject',
+    'Subscription': 'conslayer.subject',
+    'TopicRegistry': 'conslayer.topic',
+    'ArenaView': 'conslayer.view',
+    'CombatantView': 'conslayer.view',
+    'CombatantPool': 'conslayer.wave',
+    'Wave': 'conslayer.wave',
+    'Snapshot': 'conslayer.snapshot',
+    'WireDecoder': 'conslayer.wire',
+    'WireEncoder': 'conslayer.wire',
+    'main': 'conslayer.cli'}
 
-def main() -> None:
-    """Entrypoint for conslayer."""
+def __getattr__(name: str) -> object:
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module 'conslayer' has no attribute '{name}'")
+    value = getattr(__import__(module, fromlist=[name]), name)
 
-    # Bind message queue
-    stdout = MessageQueue()
+    # Bind attribute, such that further accesses do not invoke this function
+    globals()[name] = value
+    return value
 
-    # Create arena and add hero
-    arena = Arena()
-    arena.add("hero")
-
-    # Create guardian and let the guardian watch the arena
-    guardian = Guardian()
-    guardian.watch(arena)
-
-    # Print and flush message queue
-    stdout.print()
-
-    # Start the game
-    while True:
-
-        # Get input from user
-        command = input("> ").strip().lower()
-
-        # Evaluate input
-        if command == "exit":
-            break
-        elif command[:4] == "add ":
-            arena.add(command[4:].strip())
-        elif command == "start":
-            arena.start_fight()
-        elif command == "stop":
-            arena.stop_fight()
-        elif command[:7] == "attack ":
-            arena["hero"].attack(command[7:].strip())
-        elif command == "help":
-            stdout.queue("Available commands:")
-            stdout.queue("  'add <name>': Add a combatant to the arena (orc, dragon, hero)")
-            stdout.queue("  'start': Start the fight")
-            stdout.queue("  'attack <name>': Attack the combatant")
-            stdout.queue("  'stop': Stop the fight")
-            stdout.queue("  'help': Show this help message")
-            stdout.queue("  'about': Show application version")
-            stdout.queue("  'exit': Exit the game")
-        elif command == "about":
-            stdout.queue(f"Console Slayer v{__version__}")
-        elif command == "":
-            pass
-        else:
-            stdout.queue(f"Unknown command. Type 'help' for a list of available commands.")
-
-        # Print and flush message queue
-        stdout.print()
-
-# Run main() if this file is executed directly
-if __name__ == '__main__':
-    main()
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_exports))
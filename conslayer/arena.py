@@ -11,16 +11,25 @@ __author__ = 'Patrick Michl'
 __email__ = 'patrick.michl@gmail.com'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
-from typing import Dict, Iterator, List, Optional, OrderedDict
+import fnmatch
+import itertools
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import reactivex as rx
+from reactivex import operators as ops
 import conslayer
+from conslayer.metrics import Metrics
+from conslayer.subject import Subject
+from conslayer.view import ArenaView, CombatantView
 
 #
 # Arena
 #
 
-class Arena(rx.subject.BehaviorSubject):
+class Arena(Subject):
     """Arena Class.
 
     Collect states of individual combatants to a consolidated arena state and propagate
@@ -30,31 +39,100 @@ class Arena(rx.subject.BehaviorSubject):
         (3) Behaviour Subject pattern for concurrent observability
         (4) State pattern for arena state determination
         (5) Iterable pattern for iterating over combatants
+        (6) Single writer pattern for race-free state mutations
+
+    All state mutations are submitted to a command queue and executed by a
+    single writer. Mutations, which are requested while another thread is
+    writing, are executed by that thread and the requesting thread returns
+    without waiting.
+
+    The arena does not subscribe to its combatants, but propagates state
+    changes of its own mutations. Combatants therefore remain compact until
+    they are subscribed by external observers.
+
+    Combatants are given integer identifiers when they enter the arena. The
+    registry and the attack schedulers are indexed by these identifiers,
+    while names are only resolved at the boundary, by a single index.
+
+    The arena state is a read-only view, which is backed by the registry and
+    remains valid across changes. Observers therefore read states without
+    allocation, but are required to copy states, which they keep.
+
+    The resources, which are held by the arena, are reported by 'resources'.
+    In debug mode, attack timers are tracked and any subscriptions and timers,
+    which are not disposed when a fight ends or a combatant is removed, are
+    reported as leaks.
+
+    Besides the arena state, individual events can be subscribed by topic:
+        'spawn': Combatant entered the arena, receives the combatant
+        'remove': Combatant was removed from the arena, receives the combatant
+        'death': Combatant died, receives the combatant
+        'hit': Any combatant was hit, receives the attack as dict
+        'hit:<name>': Combatant <name> was hit, receives the attack as dict
+        'fight_state': Fight was started or stopped, receives the started flag
+        'shutdown': Arena is shut down, receives the deadline of the shutdown
+            in seconds of the clock 'time.monotonic'
 
     Attributes:
-        state (List[dict], readonly): Global state of arenas' combatant properties.
+        state (ArenaView, readonly): Read-only view of the states of all
+            combatants. The method 'copy' returns a detached list of states.
         heroes (List[Hero], readonly): All heroes in arena.
         monsters (List[Monster], readonly): All monsters in arena.
+        started (bool, readonly): Flag indicating that the fight is started.
+        policy (str): Policy for missed attack deadlines, 'catchup' or 'skip'.
+        scheduler (Scheduler): Scheduler of the monster attacks. By default or
+            if set to None, all monsters share an event loop scheduler, which
+            is stopped when it is replaced.
+        endless (bool): Flag indicating that the fight continues without monsters.
+        timing (Dict[str, dict], readonly): Lag and jitter statistics of the
+            attack schedulers of the monsters in seconds.
+        resources (Dict[str, int], readonly): Numbers of combatants, attack
+            timers, subscriptions of the arena, its topics and combatants and
+            live threads of the default scheduler and the workers.
+        debug (bool): Flag indicating that leaks of resources are reported.
+            Enabling debug mode clears the reported leaks.
+        leaks (List[str], readonly): Descriptions of the reported leaks.
 
     """
 
     __instance: Optional['Arena'] = None
     __initialized: bool = False
     __started: bool = False
-    __registry: OrderedDict[str, 'conslayer.Combatant'] = OrderedDict()
-    __listener: Dict[str, rx.abc.disposable.DisposableBase] = {}
-    __scheduler: Dict[str, rx.abc.disposable.DisposableBase] = {}
+    __since: float = 0.
+    __registry: Dict[int, 'conslayer.Combatant'] = {}
+    __index: Dict[str, int] = {}
+    __ids: Iterator[int] = itertools.count(1)
+    __scheduler: Dict[int, 'conslayer.PeriodicTimer'] = {}
+    __views: Dict[int, CombatantView] = {}
+    __rows: Optional[Tuple[int, Tuple[CombatantView, ...]]] = None
+    __generation: int = 0
+    __view: ArenaView
+    __policy: str = 'catchup'
+    __clock: Optional[rx.abc.SchedulerBase] = None
+    __owned: bool = False
+    __threads: List[threading.Thread] = []
+    __lock: threading.Lock = threading.Lock()
+    __debug: bool = False
+    __timers: 'weakref.WeakSet[conslayer.PeriodicTimer]'
+    __leaks: List[str] = []
+    __endless: bool = False
+    __commands: 'conslayer.CommandQueue'
+    __topics: 'conslayer.TopicRegistry'
 
     @property
-    def state(self) -> List[dict]:
-        """Get global state of all combatants."""
-        return self.__getstate__()
+    def state(self) -> ArenaView:
+        """Get read-only view of the states of all combatants."""
+        return self.__view
+
+    @property
+    def value(self) -> ArenaView:
+        return self.__view
 
     @property
     def heroes(self) -> List['conslayer.Hero']:
         """Get list of heroes"""
         return [
-            combatant for combatant in self.__registry.values()
+            combatant for combatant in list(self.__registry.values())
             if isinstance(combatant, conslayer.Hero)
         ]
 
@@ -62,10 +140,87 @@ class Arena(rx.subject.BehaviorSubject):
     def monsters(self) -> List['conslayer.Monster']:
         """Get list of monsters"""
         return [
-            combatant for combatant in self.__registry.values()
+            combatant for combatant in list(self.__registry.values())
             if isinstance(combatant, conslayer.Monster)
         ]
 
+    @property
+    def started(self) -> bool:
+        """Get flag indicating that the fight is started."""
+        return self.__started
+
+    @property
+    def policy(self) -> str:
+        """Get policy for missed attack deadlines."""
+        return self.__policy
+
+    @policy.setter
+    def policy(self, policy: str) -> None:
+        if policy not in ('catchup', 'skip'):
+            raise ValueError("Argument 'policy' requires to be 'catchup' or 'skip'")
+        self.__policy = policy
+
+    @property
+    def scheduler(self) -> rx.abc.SchedulerBase:
+        """Get scheduler of monster attacks."""
+        if self.__clock is None:
+            self.__clock = rx.scheduler.EventLoopScheduler(
+                thread_factory=self.thread, exit_if_empty=True)
+            self.__owned = True
+        return self.__clock
+
+    @scheduler.setter
+    def scheduler(self, scheduler: Optional[rx.abc.SchedulerBase]) -> None:
+        if scheduler is not None and not isinstance(scheduler, rx.abc.SchedulerBase):
+            raise TypeError("Argument 'scheduler' requires type 'SchedulerBase'")
+        if self.__owned and self.__clock is not scheduler:
+            self.__clock.dispose()
+        self.__clock = scheduler
+        self.__owned = False
+
+    @property
+    def endless(self) -> bool:
+        """Get flag indicating that the fight continues without monsters."""
+        return self.__endless
+
+    @endless.setter
+    def endless(self, endless: bool) -> None:
+        self.__endless = bool(endless)
+
+    @property
+    def timing(self) -> Dict[str, dict]:
+        """Get lag and jitter statistics of attack schedulers."""
+        registry = self.__registry
+        return {registry[id].name: timer.stats for id, timer in list(self.__scheduler.items())}
+
+    @property
+    def resources(self) -> Dict[str, int]:
+        """Get numbers of resources held by the arena."""
+        combatants = list(self.__registry.values())
+        return {
+            'combatants': len(combatants),
+            'timers': len(self.__scheduler),
+            'subscriptions': self.observers + len(self.__topics) + sum(
+                combatant.observers for combatant in combatants),
+            'threads': sum(thread.is_alive() for thread in list(self.__threads))}
+
+    @property
+    def debug(self) -> bool:
+        """Get flag indicating that leaks of resources are reported."""
+        return self.__debug
+
+    @debug.setter
+    def debug(self, debug: bool) -> None:
+        if debug and not self.__debug:
+            self.__timers = weakref.WeakSet(self.__scheduler.values())
+            self.__leaks = []
+        self.__debug = bool(debug)
+
+    @property
+    def leaks(self) -> List[str]:
+        """Get descriptions of the reported leaks."""
+        return list(self.__leaks)
+
     def __new__(cls) -> 'Arena':
         if cls.__instance is None:
             cls.__instance = super(Arena, cls).__new__(cls)
@@ -74,27 +229,183 @@ class Arena(rx.subject.BehaviorSubject):
 
     def __init__(self) -> None:
         if not self.__initialized:
-            super(Arena, self).__init__(self.state)
+            self.__commands = conslayer.CommandQueue()
+            self.__topics = conslayer.TopicRegistry()
+            self.__view = ArenaView(self.__get_rows)
+            super(Arena, self).__init__()
+            metrics = Metrics()
+            metrics.gauge(
+                'commands', "Pending commands of the arena",
+                lambda: self.__commands.pending)
+            metrics.gauge(
+                'threads', "Live background threads of the arena and its workers",
+                lambda: self.resources['threads'])
+            metrics.gauge(
+                'scheduler_lag', "Maximum mean lag of attack schedulers in seconds",
+                lambda: max(
+                    (timer.stats['lag'] for timer in list(self.__scheduler.values())),
+                    default=0.))
             stdout = conslayer.MessageQueue()
             stdout.queue("Welcome to the arena! Type 'help' for more information.")
             self.__initialized = True
 
     def __getstate__(self) -> List[dict]:
-        return [combatant.state for combatant in self.__registry.values()]
+        return [combatant.__getstate__() for combatant in list(self.__registry.values())]
+
+    def __get_rows(self) -> Tuple[CombatantView, ...]:
+
+        # Rows are cached until the combatants change. The generation is read
+        # before the rows, such that concurrently changed rows are rebuilt.
+        generation = self.__generation
+        rows = self.__rows
+        if rows is None or rows[0] != generation:
+            rows = self.__rows = (generation, tuple(self.__views.values()))
+        return rows[1]
 
-    def __contains__(self, name: str) -> bool:
-        return name in self.__registry
+    def thread(self, target: Callable[[], None],
+            name: str = "conslayer-arena") -> threading.Thread:
+        """Create background thread, which is joined on shutdown.
 
-    def __getitem__(self, name: str) -> 'conslayer.Combatant':
-        return self.__registry[name]
+        Description:
+            Threads of the default scheduler and of workers, which depend on
+            the arena, are created by this method, such that they are
+            accounted in 'resources' and joined and reported by 'shutdown'.
+            The thread is created as daemon thread and is not started.
+
+        Args:
+            target (Callable): Function, which is run by the thread.
+            name (str, optional): Name of the thread.
+
+        Returns:
+            Unstarted thread.
+
+        """
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        with self.__lock:
+            self.__threads = [
+                alive for alive in self.__threads if alive.is_alive()] + [thread]
+        return thread
+
+    def __audit(self, combatants: List['conslayer.Combatant']) -> None:
+        if not self.__debug:
+            return
+
+        # Find subscriptions of removed combatants and timers, which are
+        # neither disposed nor scheduling attacks of combatants in arena
+        leaks = []
+        for combatant in combatants:
+            name = combatant.name
+            if combatant.observers:
+                leaks.append(
+                    f"Combatant '{name}' removed with {combatant.observers} subscriptions.")
+            count = self.__topics.count('hit:' + name)
+            if count:
+                leaks.append(f"Topic 'hit:{name}' has {count} subscriptions after removal.")
+        active = set(self.__scheduler.values())
+        timers = [timer for timer in list(self.__timers)
+            if not timer.disposed and timer not in active]
+        if timers:
+            leaks.append(f"{len(timers)} attack timers are not disposed.")
+
+        # Report leaks
+        stdout = conslayer.MessageQueue()
+        for leak in leaks:
+            stdout.queue(f"Resource leak: {leak}")
+        self.__leaks.extend(leaks)
+
+    def __contains__(self, key: Union[str, int]) -> bool:
+        if isinstance(key, int):
+            return key in self.__registry
+        return key in self.__index
+
+    def __getitem__(self, key: Union[str, int]) -> 'conslayer.Combatant':
+        if isinstance(key, int):
+            return self.__registry[key]
+        return self.__registry[self.__index[key]]
 
     def __len__(self) -> int:
         return len(self.__registry)
 
     def __iter__(self) -> Iterator['conslayer.Combatant']:
-        for combatant in self.__registry.values():
+        for combatant in list(self.__registry.values()):
             yield combatant
 
+    def lookup(self, name: str) -> Optional[int]:
+        """Get identifier of a combatant by name.
+
+        Args:
+            name (str): Case insensitive name of the combatant.
+
+        Returns:
+            Identifier of the combatant or None, if the combatant is not in arena.
+
+        """
+        index = self.__index
+        id = index.get(name)
+        if id is None:
+            id = index.get(name.lower())
+        return id
+
+    def on(self, topic: str, callback: Callable[[Any], None]) -> rx.abc.DisposableBase:
+        """Subscribe to arena events of a topic.
+
+        Args:
+            topic (str): Topic of the events, e.g. 'death' or 'hit:orc'.
+            callback (Callable): Callback, which receives the events.
+
+        Returns:
+            Disposable to unsubscribe from topic.
+
+        """
+        return self.__topics.subscribe(topic, callback)
+
+    def stream(self, rate: Optional[float] = None, debounce: Optional[float] = None,
+            sampler: Optional[rx.Observable] = None,
+            scheduler: Optional[rx.abc.SchedulerBase] = None) -> rx.Observable:
+        """Get rate limited stream of arena states.
+
+        Description:
+            Observers of the stream receive at most one arena state per period
+            of the given sampling rate, the latest arena state after changes
+            have settled for the given debounce time or the latest arena
+            state whenever the given sampler emits. Without any option all
+            arena states are received.
+
+        Args:
+            rate (float, optional): Maximum number of arena states per second.
+            debounce (float, optional): Seconds without changes before the
+                latest arena state is received.
+            sampler (Observable, optional): Observable, that requests the
+                latest arena state on demand.
+            scheduler (Scheduler, optional): Scheduler for sampling timers.
+
+        Returns:
+            Observable of arena states.
+
+        Raises:
+            ValueError: More than one option is given.
+            ValueError: Argument 'rate' or 'debounce' is not positive.
+
+        """
+
+        # Check arguments
+        options = [rate, debounce, sampler]
+        if len(options) - options.count(None) > 1:
+            raise ValueError("Arguments 'rate', 'debounce' and 'sampler' are exclusive")
+        if rate is not None and rate <= 0:
+            raise ValueError("Argument 'rate' requires to be positive")
+        if debounce is not None and debounce <= 0:
+            raise ValueError("Argument 'debounce' requires to be positive")
+
+        # Create stream
+        if rate is not None:
+            return self.pipe(ops.sample(1. / rate, scheduler=scheduler))
+        if debounce is not None:
+            return self.pipe(ops.debounce(debounce, scheduler=scheduler))
+        if sampler is not None:
+            return self.pipe(ops.sample(sampler, scheduler=scheduler))
+        return self.pipe()
+
     def add(self, name: str) -> None:
         """Add combatant to arena.
 
@@ -110,12 +421,16 @@ class Arena(rx.subject.BehaviorSubject):
         if not isinstance(name, str):
             raise TypeError("Argument 'name' requires type 'str'")
 
+        self.__commands.submit(self.__add, name)
+
+    def __add(self, name: str) -> None:
+
         # Bind message queue
         stdout = conslayer.MessageQueue()
 
         # Check if combatant is already in arena
         name = name.lower()
-        if name in self.__registry:
+        if name in self.__index:
             stdout.queue(f"{name} is already in arena.")
             return
 
@@ -124,22 +439,61 @@ class Arena(rx.subject.BehaviorSubject):
             stdout.queue(f"{name} is not known.")
             return
 
-        # Get combatant
-        args = conslayer.CombatantDict()[name]
-        combatant = args[0](*args[1:])
+        # Spawn combatant
+        self.__enter(conslayer.CombatantDict()[name].spawn())
 
-        # Add combatant to registry
-        self.__registry[combatant.name] = combatant
+    def enter(self, combatant: 'conslayer.Combatant') -> None:
+        """Let an existing combatant enter the arena.
+
+        Description:
+            Monsters, which enter the arena during a fight, immediately start
+            their attack schedule.
+
+        Args:
+            combatant (Combatant): Combatant to add to arena.
+
+        Raises:
+            TypeError: Argument 'combatant' requires type 'Combatant'.
+
+        """
+
+        # Check argument type
+        if not isinstance(combatant, conslayer.Combatant):
+            raise TypeError("Argument 'combatant' requires type 'Combatant'")
 
-        # Subscribe to combatant state changes
-        listener = combatant.subscribe(lambda _: self.on_next(self.state))
+        self.__commands.submit(self.__enter, combatant)
 
-        # Add subscription to listeners
-        self.__listener[combatant.name] = listener
+    def __enter(self, combatant: 'conslayer.Combatant') -> None:
+
+        # Bind message queue
+        stdout = conslayer.MessageQueue()
+
+        # Check if combatant is already in arena
+        if combatant.name in self.__index:
+            stdout.queue(f"{combatant.name} is already in arena.")
+            return
+
+        # Add combatant to registry
+        id = next(self.__ids)
+        combatant._bind(id)
+        self.__index[combatant.name] = id
+        self.__registry[id] = combatant
+        self.__views[id] = combatant.state
+        self.__generation += 1
+
+        # Create attack scheduler
+        if self.__started and isinstance(combatant, conslayer.Monster):
+            self.__arm(combatant)
 
         # Create message
         stdout.queue(f"{combatant.name.title()} enters arena.")
 
+        # Publish event
+        self.__topics.publish('spawn', combatant)
+
+        # Propagate state change
+        self.on_next(self.state)
+
     def remove(self, name: str) -> None:
         """Remove combatant from arena.
         
@@ -155,57 +509,96 @@ class Arena(rx.subject.BehaviorSubject):
         if not isinstance(name, str):
             raise TypeError("Argument 'name' requires type 'str'")
 
-        # Bind message queue
-        stdout = conslayer.MessageQueue()
+        self.__commands.submit(self.__remove, name)
 
-        # Check if combatant is in arena
-        name = name.lower()
-        if name not in self.__registry:
-            stdout.queue(f"{name.title()} is not in arena.")
-            return
+    def __remove(self, name: str) -> None:
+        self.__remove_many([name])
 
-        # Create message
-        stdout.queue(f"{name.title()} is removed from arena.")
+    def remove_many(self, keys: Iterable[Union[str, int]]) -> None:
+        """Remove multiple combatants from arena.
 
-        # Dispose listener
-        if name in self.__listener:
-            self.__listener[name].dispose()
-            del self.__listener[name]
+        In contrast to repeated removals of single combatants, the state
+        change is only propagated once, such that observers, which react to
+        removals by further state changes, are not re-entered per combatant.
 
-        # Dispose scheduler
-        if name in self.__scheduler:
-            self.__scheduler[name].dispose()
-            del self.__scheduler[name]
+        Args:
+            keys (Iterable[str or int]): Names or identifiers of combatants
+                to remove.
+
+        Raises:
+            TypeError: Argument 'keys' requires an iterable of type 'str' or 'int'.
+
+        """
+
+        # Check argument types
+        keys = [keys] if isinstance(keys, (str, int)) else list(keys)
+        if not all(isinstance(key, (str, int)) for key in keys):
+            raise TypeError("Argument 'keys' requires an iterable of type 'str' or 'int'")
+
+        self.__commands.submit(self.__remove_many, keys)
+
+    def __remove_many(self, keys: List[Union[str, int]]) -> None:
 
-        # Remove combatant from registry
-        del self.__registry[name]
+        # Bind message queue
+        stdout = conslayer.MessageQueue()
+
+        # Dispose schedulers and remove combatants from registry in one pass
+        registry = self.__registry
+        removed = []
+        for key in dict.fromkeys(keys):
+            id = key if isinstance(key, int) else self.lookup(key)
+            combatant = registry.pop(id, None)
+            if combatant is None:
+                if isinstance(key, str):
+                    stdout.queue(f"{key.title()} is not in arena.")
+                continue
+            stdout.queue(f"{combatant.name.title()} is removed from arena.")
+            del self.__index[combatant.name]
+            del self.__views[id]
+            combatant._bind(None)
+            timer = self.__scheduler.pop(id, None)
+            if timer is not None:
+                timer.dispose()
+            removed.append(combatant)
+        if not removed:
+            return
+        self.__generation += 1
+        self.__audit(removed)
+
+        # Notify listeners
+        for combatant in removed:
+            self.__topics.publish('remove', combatant)
 
         # Propagate state change
         self.on_next(self.state)
 
     def clear(self) -> None:
         """Remove all combatants from arena."""
+        self.__commands.submit(self.__clear)
 
-        # Iterate over combatants
-        for name in self.__registry:
+    def __clear(self) -> None:
 
-            # Dispose listener
-            if name in self.__listener:
-                self.__listener[name].dispose()
-                del self.__listener[name]
-
-            # Dispose scheduler
-            if name in self.__scheduler:
-                self.__scheduler[name].dispose()
-                del self.__scheduler[name]
+        # Dispose schedulers
+        for timer in self.__scheduler.values():
+            timer.dispose()
+        self.__scheduler.clear()
 
         # Remove all combatants from registry
+        combatants = list(self.__registry.values())
         self.__registry.clear()
+        self.__index.clear()
+        self.__views.clear()
+        self.__generation += 1
+        for combatant in combatants:
+            combatant._bind(None)
+            self.__topics.publish('remove', combatant)
+        self.__audit(combatants)
 
         # Propagate state change
         self.on_next(self.state)
 
-    def start_fight(self, message: Optional[str] = None) -> None:
+    def start_fight(self, message: Optional[str] = None,
+            phase: Optional[Dict[str, float]] = None) -> None:
         """Start fight.
 
         Description:
@@ -213,8 +606,15 @@ class Arena(rx.subject.BehaviorSubject):
 
         Args:
             message (str, optional): Message to print.
+            phase (Dict[str, float], optional): Seconds until the first attack
+                of the respective monsters. By default monsters attack after
+                their full interval.
 
         """
+        self.__commands.submit(self.__start_fight, message, phase)
+
+    def __start_fight(self, message: Optional[str],
+            phase: Optional[Dict[str, float]]) -> None:
 
         # Bind message queue
         stdout = conslayer.MessageQueue()
@@ -230,34 +630,46 @@ class Arena(rx.subject.BehaviorSubject):
             return
 
         # Check if there is a monster in arena
-        if len(self.monsters) == 0:
+        if len(self.monsters) == 0 and not self.__endless:
             stdout.queue("No monsters in arena. Fight cannot start.")
             return
 
-        # Define attack builder
-        def build_attack(monster: conslayer.Monster) -> None:
-            arena = conslayer.Arena()
-            def attack(value):
-                if monster.health <= 0: return value
-                if not "hero" in arena: return value
-                if arena["hero"].health <= 0: return value
-                monster.attack("hero")
-                return value
-            return attack
-
         # Create attack scheduler
         for monster in self.monsters:
-            scheduler = rx.scheduler.EventLoopScheduler()
-            attack = build_attack(monster)
-            obs = scheduler.schedule_periodic(monster.interval, attack)
-            self.__scheduler[monster.name] = obs
+            delay = None
+            if phase is not None and monster.name in phase:
+                delay = max(0., phase[monster.name])
+            self.__arm(monster, delay)
 
         # Start fight
         self.__started = True
+        self.__since = time.monotonic()
         stdout.queue("Fight started!")
         if message is not None:
             stdout.queue(message)
 
+        # Publish event
+        self.__topics.publish('fight_state', True)
+
+    def __arm(self, monster: 'conslayer.Monster', delay: Optional[float] = None) -> None:
+
+        # Define attack
+        def attack():
+            if monster.health <= 0: return
+            if monster.species.area:
+                if not any(hero.health > 0 for hero in self.heroes): return
+                return monster.attack("all")
+            if not "hero" in self: return
+            if self["hero"].health <= 0: return
+            monster.attack("hero")
+
+        # Schedule attack
+        timer = conslayer.PeriodicTimer(
+            self.scheduler, monster.interval, attack, delay=delay, policy=self.__policy)
+        self.__scheduler[monster.id] = timer
+        if self.__debug:
+            self.__timers.add(timer)
+
     def stop_fight(self, message: Optional[str] = None) -> None:
         """Stop fight.
 
@@ -268,6 +680,9 @@ class Arena(rx.subject.BehaviorSubject):
             message (optional, str): Message to print.
 
         """
+        self.__commands.submit(self.__stop_fight, message)
+
+    def __stop_fight(self, message: Optional[str]) -> None:
 
         # Bind message queue
         stdout = conslayer.MessageQueue()
@@ -281,13 +696,166 @@ class Arena(rx.subject.BehaviorSubject):
         for scheduler in self.__scheduler.values():
             scheduler.dispose()
         self.__scheduler.clear()
+        self.__audit([])
 
         # Stop fight
         self.__started = False
+        metrics = Metrics()
+        if metrics.enabled:
+            metrics.fight_duration.observe(time.monotonic() - self.__since)
         stdout.queue("Fight stopped!")
         if message is not None:
             stdout.queue(message)
 
+        # Publish event
+        self.__topics.publish('fight_state', False)
+
+    def defer(self, callback: Callable[[], Any]) -> None:
+        """Call a callback after all submitted mutations of the arena.
+
+        Description:
+            Mutations, which are submitted while another mutation is
+            executed, e.g. by observers of the arena, are deferred until the
+            current mutation is finished. The callback is deferred likewise,
+            such that it observes the effects of all previously submitted
+            mutations.
+
+        Args:
+            callback (Callable): Callback without arguments.
+
+        """
+        self.__commands.submit(callback)
+
+    def next_attack(self, name: str) -> Optional[float]:
+        """Get time until the next scheduled attack of a combatant.
+
+        Args:
+            name (str): Name of the combatant.
+
+        Returns:
+            Seconds until the next attack of the combatant or None, if no
+            attack of the combatant is scheduled.
+
+        """
+        timer = self.__scheduler.get(self.lookup(name))
+        if timer is None:
+            return None
+        return max(0., timer.remaining)
+
+    def shutdown(self, timeout: float = 1.) -> List[str]:
+        """Shutdown background work of the arena.
+
+        Description:
+            Cancel all attack timers, stop the default scheduler and all
+            workers, join their threads within the timeout, report threads,
+            which did not stop, and print pending messages. The
+            combatants remain in arena and a started fight is stopped without
+            message. A subsequent fight creates a new default scheduler.
+            Schedulers, which have been set explicitly, are not stopped.
+
+            Workers subscribe to the topic 'shutdown' and stop themselves,
+            when it is published. Their threads are created by 'thread' and
+            joined by the shutdown. These are the endless wave, the
+            dashboard, the roster file watcher, the fight history and the
+            metrics exporters.
+
+        Args:
+            timeout (float, optional): Seconds to wait for threads to stop.
+                By default one second.
+
+        Returns:
+            Names of the threads, which did not stop within the timeout. The
+            list is empty, if the shutdown completed.
+
+        Raises:
+            TypeError: Argument 'timeout' requires type 'float'
+            ValueError: Argument 'timeout' requires to be positive
+
+        """
+
+        # Check argument types and values
+        if not isinstance(timeout, float):
+            raise TypeError("Argument 'timeout' requires type 'float'")
+        if timeout < 0:
+            raise ValueError("Argument 'timeout' requires to be positive")
+
+        # Cancel attack timers. If another thread is writing, the timers are
+        # cancelled by that thread before it stops.
+        deadline = time.monotonic() + timeout
+        self.__commands.submit(self.__halt)
+
+        # Stop workers, which depend on the arena
+        self.__topics.publish('shutdown', deadline)
+
+        # Stop default scheduler, which lets its threads exit after the
+        # current action
+        if self.__owned and self.__clock is not None:
+            self.__clock.dispose()
+            self.__clock = None
+            self.__owned = False
+
+        # Join threads of the default scheduler and the workers until deadline
+        current = threading.current_thread()
+        with self.__lock:
+            threads = list(self.__threads)
+        for thread in threads:
+            if thread is not current and thread.ident is not None:
+                thread.join(max(0., deadline - time.monotonic()))
+        pending = [
+            thread.name for thread in threads
+            if thread.is_alive() and thread is not current]
+        with self.__lock:
+            self.__threads = [thread for thread in self.__threads if thread.is_alive()]
+
+        # Report threads, which did not stop, and print pending messages
+        stdout = conslayer.MessageQueue()
+        for name in pending:
+            stdout.queue(f"Thread '{name}' did not stop within {timeout:g} seconds.")
+        stdout.print()
+        return pending
+
+    def __halt(self) -> None:
+
+        # Dispose schedulers
+        for timer in self.__scheduler.values():
+            timer.dispose()
+        self.__scheduler.clear()
+        self.__audit([])
+
+        # Stop fight without message
+        if self.__started:
+            self.__started = False
+            self.__topics.publish('fight_state', False)
+
+    def snapshot(self, path: str) -> None:
+        """Save complete arena state to a snapshot file.
+
+        Args:
+            path (str): Path of the snapshot file.
+
+        Raises:
+            ValueError: A name is too long for the snapshot format.
+
+        """
+        conslayer.Snapshot.capture(self).save(path)
+
+    def restore(self, path: str) -> None:
+        """Restore complete arena state from a snapshot file.
+
+        Description:
+            Replace all combatants in arena by the combatants of the snapshot
+            and continue a started fight with the saved attack phases.
+
+        Args:
+            path (str): Path of the snapshot file.
+
+        Raises:
+            ValueError: The snapshot is invalid or contains unknown species.
+
+        """
+        with conslayer.Snapshot.load(path) as snapshot:
+            snapshot.restore(self)
+
     def record_attack(self, attacker: 'conslayer.Combatant', target: 'conslayer.Combatant') -> None:
         """Record attack in global registry.
         
@@ -307,46 +875,146 @@ class Arena(rx.subject.BehaviorSubject):
         if not isinstance(target, conslayer.Combatant):
             raise TypeError("Argument 'target' requires type 'Combatant'")
 
-        # Bind message queue
+        self.__commands.submit(self.__record_attack, attacker, target)
+
+    def __record_attack(self, attacker: 'conslayer.Combatant',
+            target: 'conslayer.Combatant') -> None:
+        self.__record_attacks(attacker, [target])
+
+    def record_attacks(self, attacker: 'conslayer.Combatant',
+            targets: Iterable['conslayer.Combatant']) -> None:
+        """Record attack on multiple targets in global registry.
+
+        Description:
+            The attack is validated and applied to all targets at once, such
+            that it creates a single aggregated message and propagates the
+            state change once. Targets, which are not in arena or already
+            dead, are skipped.
+
+        Args:
+            attacker (Combatant): Attacker
+            targets (Iterable[Combatant]): Targets
+
+        Raises:
+            TypeError: Argument 'attacker' requires type 'conslayer.Combatant'.
+            TypeError: Argument 'targets' requires an iterable of type 'conslayer.Combatant'.
+
+        """
+
+        # Check argument types
+        if not isinstance(attacker, conslayer.Combatant):
+            raise TypeError("Argument 'attacker' requires type 'Combatant'")
+        targets = list(targets)
+        if not all(isinstance(target, conslayer.Combatant) for target in targets):
+            raise TypeError("Argument 'targets' requires an iterable of type 'Combatant'")
+
+        self.__commands.submit(self.__record_attacks, attacker, targets)
+
+    def __record_attacks(self, attacker: 'conslayer.Combatant',
+            targets: List['conslayer.Combatant']) -> None:
+
+        # Bind message queue and metrics
         stdout = conslayer.MessageQueue()
+        metrics = Metrics()
+        start = time.perf_counter() if metrics.enabled else 0.
 
-        # Check if attacker and target are in arena
-        if attacker.name not in self.__registry:
+        # Check if attacker and a single target are in arena and alive
+        registry = self.__registry
+        if registry.get(attacker.id) is not attacker:
             stdout.queue(f"Attacker '{attacker.name}' is not known in arena")
             return
-        if target.name not in self.__registry:
-            stdout.queue(f"Target '{target.name}' is not known in arena")
-            return
-
-        # Check if attacker and target are alive
+        if len(targets) == 1:
+            if registry.get(targets[0].id) is not targets[0]:
+                stdout.queue(f"Target '{targets[0].name}' is not known in arena")
+                return
         if attacker.health <= 0:
             stdout.queue(f"Attacker '{attacker.name}' is already dead")
             return
-        if target.health <= 0:
-            stdout.queue(f"Target '{target.name}' is already dead")
-            return
+        if len(targets) == 1:
+            if targets[0].health <= 0:
+                stdout.queue(f"Target '{targets[0].name}' is already dead")
+                return
 
         # Check if fight is started
         if not self.__started:
             stdout.queue("Fight has not yet started.")
             return
 
-        # Create message
-        health = max(0, target.health - attacker.damage)
-        attacker_name = attacker.name.title()
-        target_name = target.name.title()
-        if health > 0:
-            message = f"{attacker_name} hits {target_name}. {target_name} health is {health}."
-        else:
-            message = f"{attacker_name} killed {target_name}."
-        stdout.queue(message)
+        # Skip targets, which are not in arena or already dead
+        targets = [
+            target for target in targets
+            if target.health > 0 and registry.get(target.id) is target]
+        if not targets:
+            stdout.queue(f"{attacker.name.title()} has no target to attack.")
+            return
+
+        # Update health of targets
+        damage = attacker.damage
+        for target in targets:
+            target.get_weakened(damage)
 
-        # Update health of target
-        target.get_weakened(attacker.damage)
+        # Create aggregated message
+        attacker_name = attacker.name.title()
+        hits = [
+            f"{target.name.title()}. {target.name.title()} health is {target.health}"
+            if len(targets) == 1 else
+            f"{target.name.title()} ({target.health})"
+            for target in targets if target.health > 0]
+        kills = [target.name.title() for target in targets if target.health <= 0]
+        if hits:
+            stdout.queue(f"{attacker_name} hits {', '.join(hits)}.")
+        if kills:
+            stdout.queue(f"{attacker_name} killed {', '.join(kills)}.")
+
+        # Publish events
+        topics = self.__topics
+        publish = 'hit' in topics
+        for target in targets:
+            topic = 'hit:' + target.name
+            if publish or topic in topics:
+                hit = {
+                    'attacker': attacker.name,
+                    'target': target.name,
+                    'damage': damage,
+                    'health': target.health
+                }
+                topics.publish('hit', hit)
+                topics.publish(topic, hit)
+            if target.health <= 0:
+                topics.publish('death', target)
 
         # Propagate state change
         self.on_next(self.state)
 
+        # Record metrics
+        if metrics.enabled:
+            metrics.attacks.inc(len(targets))
+            metrics.deaths.inc(len(kills))
+            metrics.attack_latency.observe(time.perf_counter() - start)
+
+    def select(self, pattern: str) -> List['conslayer.Combatant']:
+        """Select combatants by name pattern.
+
+        Args:
+            pattern (str): Shell-style wildcard pattern, e.g. 'orc*'.
+
+        Returns:
+            Combatants, whose names match the pattern
+
+        Raises:
+            TypeError: Argument 'pattern' requires type 'str'.
+
+        """
+
+        # Check argument type
+        if not isinstance(pattern, str):
+            raise TypeError("Argument 'pattern' requires type 'str'")
+
+        pattern = pattern.lower()
+        return [
+            combatant for combatant in list(self.__registry.values())
+            if fnmatch.fnmatchcase(combatant.name, pattern)]
+
 #
 # Guardian
 #
@@ -369,6 +1037,7 @@ class Guardian(rx.Observer):
 
     __instance: Optional['Guardian'] = None
     __arena: Optional['conslayer.Arena'] = None
+    __subscription: Optional[rx.abc.DisposableBase] = None
 
     @property
     def arena(self) -> 'conslayer.Arena':
@@ -391,8 +1060,17 @@ class Guardian(rx.Observer):
         # Bind arena
         self.__arena = arena
 
-        # Subscribe to arena state changes
-        arena.subscribe(self)
+        # Subscribe to arena state changes, once
+        if self.__subscription is not None:
+            self.__subscription.dispose()
+        self.__subscription = arena.subscribe(self)
+
+    def unwatch(self) -> None:
+        """Stop observing arena state changes."""
+        if self.__subscription is not None:
+            self.__subscription.dispose()
+            self.__subscription = None
+        self.__arena = None
 
     def on_next(self, table: List[dict]):
         """Evaluate arena state changes.
@@ -408,30 +1086,35 @@ class Guardian(rx.Observer):
         # Bind arena
         arena = conslayer.Arena()
 
+        # Record metrics
+        metrics = Metrics()
+        if metrics.enabled:
+            metrics.evaluations.inc()
+
         # Evaluate combatants health states
         heroes = 0
         monsters = 0
         remove = []
         for row in table:
             if row['health'] <= 0:
-                remove.append(row['name'])
+                remove.append(row['id'])
             elif row['kind'] is conslayer.Monster:
                 monsters += 1
             elif row['kind'] is conslayer.Hero:
                 heroes += 1
 
-        # Remove combatants
-        for name in remove:
-            arena.remove(name)
+        # Remove dead combatants at once
+        if remove:
+            arena.remove_many(remove)
 
         # Check if all monsters are dead
-        if remove and monsters == 0:
+        if remove and monsters == 0 and not arena.endless:
             arena.stop_fight("All monsters are dead. Hero wins!")
-            stdout.print()
+            arena.defer(stdout.print)
             return
         
         # Check if all heroes are dead
         if remove and heroes == 0:
             arena.stop_fight("Hero is dead. Monsters win!")
-            stdout.print()
+            arena.defer(stdout.print)
             return
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Command line interface.
+
+The command line interface parses console commands and handles the options,
+which do not require the combat engine, without importing it. For a fast
+startup this module therefore only depends on the standard library modules,
+which are imported by the interpreter anyway.
+
+"""
+
+# Postponed annotations avoid the import of the typing module at startup
+from __future__ import annotations
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import sys
+
+import conslayer
+
+# Names for annotations, which are only imported by static type checkers
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable
+
+# Module Constants
+USAGE = ("usage: conslayer [-h] [-V] [--check] [--metrics-port PORT] "
+    "[--metrics-file PATH] [--history PATH] [script]\n"
+    "       conslayer profile [-h] [roster|wave|arenas] [--size N] "
+    "[--duration SECONDS] [--output PREFIX]")
+OPTIONS = [
+    "  profile              Profile a fight scenario on a virtual clock and exit",
+    "  script               Run the console commands of a script file and exit",
+    "  -h, --help           Show this help message and exit",
+    "  -V, --version        Show application version and exit",
+    "  --check              Validate the console commands of the script and exit",
+    "  --metrics-port PORT  Serve engine metrics at http://127.0.0.1:PORT/metrics",
+    "  --metrics-file PATH  Write engine metrics to a file every 15 seconds",
+    "  --history PATH       Store fight results in a SQLite database"]
+COMMANDS = [
+    "  'add <name>': Add a combatant to the arena (orc, dragon, hero)",
+    "  'start': Start the fight",
+    "  'attack <name>': Attack the combatant",
+    "  'attack all', 'attack <pattern>': Attack all monsters or all matching (e.g. orc*)",
+    "  'stop': Stop the fight",
+    "  'wave [rate]': Spawn monsters endlessly (per second)",
+    "  'wave stop': Stop spawning monsters",
+    "  'stats [on|off|reset]': Show, enable, disable or reset engine metrics",
+    "  'dashboard [on|off]': Show the live status of all combatants",
+    "  'help': Show this help message",
+    "  'about': Show application version",
+    "  'exit': Exit the game"]
+
+def parse(command: str) -> tuple[str, object]:
+    """Parse console command.
+
+    Args:
+        command (str): Console command, e.g. 'add orc' or 'wave 2'
+
+    Returns:
+        Tuple with the verb and the argument of the command. Empty commands
+        and comments are returned with the verb ''.
+
+    Raises:
+        ValueError: If the command is unknown or its argument is invalid
+
+    """
+    command = command.strip().lower()
+    verb, _, arg = command.partition(" ")
+    arg = arg.strip()
+
+    # Empty commands and comments
+    if verb == "" or verb.startswith("#"):
+        return "", None
+
+    # Commands without argument
+    if verb in ("exit", "start", "stop", "help", "about") and not arg:
+        return verb, None
+
+    # Commands with a name argument
+    if verb in ("add", "attack"):
+        if not arg:
+            raise ValueError(f"Command '{verb}' requires a name.")
+        return verb, arg
+
+    # Metrics commands
+    if verb == "stats":
+        if arg not in ("", "on", "off", "reset"):
+            raise ValueError("Command 'stats' accepts 'on', 'off' or 'reset'.")
+        return verb, arg
+
+    # Dashboard commands
+    if verb == "dashboard":
+        if arg not in ("", "on", "off"):
+            raise ValueError("Command 'dashboard' accepts 'on' or 'off'.")
+        return verb, arg != "off"
+
+    # Wave commands
+    if verb == "wave":
+        if arg == "stop":
+            return "wave stop", None
+        try:
+            rate = float(arg or 1.)
+        except ValueError:
+            rate = 0.
+        if not rate > 0:
+            raise ValueError("Wave requires a positive spawn rate.")
+        return verb, rate
+
+    raise ValueError("Unknown command. Type 'help' for a list of available commands.")
+
+def check(path: str) -> list[str]:
+    """Validate the console commands of a script file.
+
+    Args:
+        path (str): Path of the script file
+
+    Returns:
+        List of error messages with line numbers. The list is empty, if all
+        commands are valid.
+
+    """
+    errors = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            try:
+                parse(line)
+            except ValueError as err:
+                errors.append(f"{path}:{number}: {err}")
+    return errors
+
+def play(commands: Iterable[str] | None = None) -> None:
+    """Play the game.
+
+    Args:
+        commands (Iterable[str], optional): Console commands to run. By
+            default the commands are read from the console.
+
+    """
+
+    # Bind message queue
+    stdout = conslayer.MessageQueue()
+
+    # Create arena and add hero
+    arena = conslayer.Arena()
+    arena.add("hero")
+
+    # Create guardian and let the guardian watch the arena
+    guardian = conslayer.Guardian()
+    guardian.watch(arena)
+
+    # Endless wave of monsters and live status view
+    wave = None
+    dashboard = None
+
+    # Print and flush message queue
+    stdout.print()
+
+    # Start the game
+    lines = iter(commands) if commands is not None else None
+    while True:
+
+        # Get input from user or script
+        if lines is None:
+            command = input("> ")
+        else:
+            command = next(lines, "exit")
+
+        # Parse input
+        try:
+            verb, arg = parse(command)
+        except ValueError as err:
+            stdout.queue(str(err))
+            verb, arg = "", None
+
+        # Evaluate input
+        if verb == "exit":
+            if wave is not None:
+                wave.stop()
+            if dashboard is not None:
+                dashboard.stop()
+            arena.shutdown()
+            break
+        elif verb == "add":
+            arena.add(arg)
+        elif verb == "start":
+            arena.start_fight()
+        elif verb == "stop":
+            arena.stop_fight()
+        elif verb == "attack":
+            arena["hero"].attack(arg)
+        elif verb == "wave stop":
+            if wave is not None:
+                wave.stop()
+                stdout.queue("Wave stopped!")
+        elif verb == "wave":
+            if wave is not None:
+                wave.stop()
+            wave = conslayer.Wave(rate=arg)
+            wave.start()
+            stdout.queue(f"Wave started with {arg:g} monsters per second!")
+        elif verb == "stats":
+            metrics = conslayer.Metrics()
+            if arg == "on":
+                metrics.enabled = True
+                stdout.queue("Metrics enabled!")
+            elif arg == "off":
+                metrics.enabled = False
+                stdout.queue("Metrics disabled!")
+            elif arg == "reset":
+                metrics.reset()
+                stdout.queue("Metrics reset!")
+            else:
+                if not metrics.enabled:
+                    stdout.queue("Metrics are disabled. Type 'stats on' to enable them.")
+                stdout.queue(str(metrics))
+        elif verb == "dashboard":
+            if arg and dashboard is None:
+                dashboard = conslayer.Dashboard()
+                dashboard.start()
+            elif not arg and dashboard is not None:
+                dashboard.stop()
+                dashboard = None
+        elif verb == "help":
+            stdout.queue("Available commands:")
+            for line in COMMANDS:
+                stdout.queue(line)
+        elif verb == "about":
+            stdout.queue(f"Console Slayer v{conslayer.__version__}")
+
+        # Print and flush message queue
+        stdout.print()
+
+def main(argv: list[str] | None = None) -> int:
+    """Entrypoint for conslayer.
+
+    Args:
+        argv (List[str], optional): Command line arguments. By default the
+            arguments of the process.
+
+    Returns:
+        Exit status of the process
+
+    """
+    args = sys.argv[1:] if argv is None else list(argv)
+
+    # Subcommands
+    if args[:1] == ["profile"]:
+        from conslayer.profiler import main as profile
+        return profile(args[1:])
+
+    # Options, which do not require the combat engine
+    if "-h" in args or "--help" in args:
+        print(USAGE)
+        print()
+        print(conslayer.__description__)
+        print()
+        print("options:")
+        print("\n".join(OPTIONS))
+        print()
+        print("console commands:")
+        print("\n".join(COMMANDS))
+        return 0
+    if "-V" in args or "--version" in args:
+        print(f"Console Slayer v{conslayer.__version__}")
+        return 0
+    validate = "--check" in args
+    options: dict[str, str] = {}
+    paths = []
+    rest = iter(arg for arg in args if arg != "--check")
+    for arg in rest:
+        if arg in ("--metrics-port", "--metrics-file", "--history"):
+            options[arg] = next(rest, "")
+        else:
+            paths.append(arg)
+    unknown = [arg for arg in paths if arg.startswith("-")]
+    port = options.get("--metrics-port")
+    invalid = (port is not None and not port.isdigit()) or "" in options.values()
+    if invalid or unknown or len(paths) > 1 or (validate and not paths):
+        print(USAGE, file=sys.stderr)
+        return 2
+
+    # Check script
+    script = paths[0] if paths else None
+    if script is not None:
+        try:
+            errors = check(script)
+        except OSError as err:
+            print(f"conslayer: {err}", file=sys.stderr)
+            return 1
+        for error in errors:
+            print(error, file=sys.stderr)
+        if validate or errors:
+            return 1 if errors else 0
+
+    # Export metrics and record fight history
+    exporters = []
+    if port is not None or "--metrics-file" in options:
+        conslayer.Metrics().enabled = True
+    try:
+        if port is not None:
+            exporters.append(conslayer.MetricsServer(int(port)))
+        if "--metrics-file" in options:
+            exporters.append(conslayer.MetricsDump(options["--metrics-file"]))
+        if "--history" in options:
+            exporters.append(conslayer.FightHistory(options["--history"]))
+        for exporter in exporters:
+            exporter.start()
+    except OSError as err:
+        for exporter in exporters:
+            exporter.stop()
+        print(f"conslayer: {err}", file=sys.stderr)
+        return 1
+
+    # Play the game
+    try:
+        if script is None:
+            play()
+        else:
+            with open(script, encoding="utf-8") as file:
+                play(file)
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+            if isinstance(exporter, conslayer.FightHistory):
+                exporter.close()
+    return 0
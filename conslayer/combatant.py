@@ -12,38 +12,52 @@ __author__ = 'Patrick Michl'
 __email__ = 'patrick.michl@gmail.com'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
-from typing import Any, List, Optional
+import json
+import os
+from typing import Dict, List, Optional, Tuple
 from abc import ABC
 
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
 import reactivex as rx
 import conslayer
+from conslayer.subject import Subject
+from conslayer.view import CombatantView
 
 #
-# Combatant
+# Species
 #
 
-class Combatant(rx.subject.BehaviorSubject, ABC):
-    """Combatant base class.
+class Species(object):
+    """Species class.
 
-    Abstract base class for all combatant classes. Stores individual combatant
-    states and propagates state changes by using the following design patterns:
-        (1) Behaviour Subject pattern for concurrent observability
-        (2) State pattern for combatant state determination
+    Immutable and pre-validated prototype of combatants, which stores the
+    properties, that are shared by all combatants of a species, using the
+    following design patterns:
+        (1) Flyweight pattern for sharing of combatant properties
+        (2) Prototype pattern for cloning of combatants
 
     Args:
-        kind (type): Kind of the combatant (conslayer.Hero or conslayer.Monster)
-        name (str): Name of the combatant
-        health (int): Health of the combatant
-        damage (int): Health damage points an attack of the combatant causes
+        kind (type): Kind of the combatants (conslayer.Hero or conslayer.Monster)
+        name (str): Name of the species
+        health (int): Initial health of the combatants
+        damage (int): Health damage points an attack of the combatants causes
         interval (float, optional): Interval between attacks in seconds
+        area (bool, optional): Flag indicating that attacks hit all opponents
 
     Attributes:
-        kind (readonly, type): Kind of the combatant (conslayer.Hero or conslayer.Monster)
-        name (readonly, str): Name of the combatant
-        health (readonly, int): Health of the combatant
-        damage (readonly, int): Health damage points an attack of the combatant causes
+        kind (readonly, type): Kind of the combatants
+        name (readonly, str): Name of the species
+        health (readonly, int): Initial health of the combatants
+        damage (readonly, int): Health damage points an attack of the combatants causes
         interval (readonly, float): Interval between attacks in seconds
-        state (readonly, dict): Current state of the combatant
+        area (readonly, bool): Flag indicating that attacks hit all opponents
 
     Raises:
         TypeError: If any of the arguments has the wrong type
@@ -51,20 +65,16 @@ class Combatant(rx.subject.BehaviorSubject, ABC):
 
     """
 
-    __name: str
-    __kind: type
-    __health: int
-    __damage: int
-    __interval: Optional[float]
-
-    @property
-    def name(self) -> str: 
-        return self.__name
+    __slots__ = ('__kind', '__name', '__health', '__damage', '__interval', '__area')
 
     @property
     def kind(self) -> type:
         return self.__kind
 
+    @property
+    def name(self) -> str:
+        return self.__name
+
     @property
     def health(self) -> int:
         return self.__health
@@ -78,64 +88,252 @@ class Combatant(rx.subject.BehaviorSubject, ABC):
         return self.__interval
 
     @property
-    def state(self) -> dict:
-        return self.__getstate__()
+    def area(self) -> bool:
+        return self.__area
 
-    def __init__(self, kind: type, name: str, health: int, damage: int, interval: Optional[float] = None) -> None:
+    def __init__(self, kind: type, name: str, health: int, damage: int,
+            interval: Optional[float] = None, area: bool = False) -> None:
 
         # Check argument types
+        if not isinstance(kind, type) or not issubclass(kind, Combatant):
+            raise TypeError("Argument 'kind' requires to be a subclass of 'Combatant'")
         if not isinstance(name, str):
             raise TypeError("Argument 'name' requires type 'str'")
-        if not isinstance(health, int):
+        if not isinstance(health, int) or isinstance(health, bool):
             raise TypeError("Argument 'health' requires type 'int'")
-        if not isinstance(damage, int):
+        if not isinstance(damage, int) or isinstance(damage, bool):
             raise TypeError("Argument 'damage' requires type 'int'")
         if interval is not None and not isinstance(interval, float):
             raise TypeError("Argument 'interval' requires type 'float'")
-        
+        if not isinstance(area, bool):
+            raise TypeError("Argument 'area' requires type 'bool'")
+
         # Check argument values
         if health < 0:
             raise ValueError("Argument 'health' requires to be positive")
         if damage < 0:
             raise ValueError("Argument 'damage' requires to be positive")
-        if interval is not None and interval < 0:
+        if interval is not None and interval <= 0:
             raise ValueError("Argument 'interval' requires to be positive or None")
-        
+
         # Initialize attributes
         self.__kind = kind
         self.__name = name
         self.__health = health
         self.__damage = damage
         self.__interval = interval
+        self.__area = area
+
+    def __repr__(self) -> str:
+        area = ", area=True" if self.__area else ""
+        return f"Species({self.__kind.__name__}, {self.__name!r}, {self.__health}, {self.__damage}, {self.__interval}{area})"
+
+    def spawn(self, name: Optional[str] = None) -> 'Combatant':
+        """Spawn combatant of the species.
+
+        Args:
+            name (str, optional): Name of the combatant. By default the name
+                of the species.
+
+        Returns:
+            New combatant with the initial health of the species
+
+        """
+        return self.__kind.from_species(self, name)
+
+#
+# Combatant
+#
+
+class Combatant(Subject, ABC):
+    """Combatant base class.
+
+    Abstract base class for all combatant classes. Stores individual combatant
+    states and propagates state changes by using the following design patterns:
+        (1) Behaviour Subject pattern for concurrent observability
+        (2) State pattern for combatant state determination
+
+    Combatants store their name and health in slots and share all other
+    properties with the combatants of the same species. The state is only
+    created and propagated, when the combatant is subscribed by an observer,
+    such that unobserved combatants remain compact.
+
+    Args:
+        kind (type): Kind of the combatant (conslayer.Hero or conslayer.Monster)
+        name (str): Name of the combatant
+        health (int): Health of the combatant
+        damage (int): Health damage points an attack of the combatant causes
+        interval (float, optional): Interval between attacks in seconds
+
+    Attributes:
+        kind (readonly, type): Kind of the combatant (conslayer.Hero or conslayer.Monster)
+        name (readonly, str): Name of the combatant
+        health (readonly, int): Health of the combatant
+        damage (readonly, int): Health damage points an attack of the combatant causes
+        interval (readonly, float): Interval between attacks in seconds
+        id (readonly, int): Identifier of the combatant, while it is in arena
+        state (readonly, CombatantView): Read-only view of the state of the
+            combatant, which is created once on first access. The method 'copy'
+            returns a detached dictionary.
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __slots__ = ('__species', '__name', '__health', '__id', '__view')
+
+    @property
+    def species(self) -> Species:
+        return self.__species
+
+    @property
+    def id(self) -> Optional[int]:
+        return self.__id
+
+    @property
+    def name(self) -> str: 
+        return self.__name
+
+    @property
+    def kind(self) -> type:
+        return self.__species.kind
+
+    @property
+    def health(self) -> int:
+        return self.__health
+
+    @property
+    def damage(self) -> int:
+        return self.__species.damage
+
+    @property
+    def interval(self) -> Optional[float]:
+        return self.__species.interval
+
+    @property
+    def state(self) -> CombatantView:
+
+        # The view is created on first access, such that combatants, which
+        # are not observed, do not pay for it
+        view = self.__view
+        if view is None:
+            view = self.__view = CombatantView(self)
+        return view
+
+    @property
+    def value(self) -> CombatantView:
+        return self.state
+
+    def __init__(self, kind: type, name: str, health: int, damage: int, interval: Optional[float] = None) -> None:
+
+        # Create and validate individual species
+        species = Species(kind, name, health, damage, interval)
+
+        # Initialize attributes
+        self.__species = species
+        self.__name = name
+        self.__health = health
+        self.__id = None
+        self.__view = None
 
         # Initialize superclass
-        super().__init__(self.state)
+        super().__init__()
+
+    @classmethod
+    def from_species(cls, species: Species, name: Optional[str] = None) -> 'Combatant':
+        """Create combatant from a species prototype.
+
+        Description:
+            The properties of the species are already validated and shared,
+            such that creating a combatant is a cheap clone.
+
+        Args:
+            species (Species): Species of the combatant
+            name (str, optional): Name of the combatant. By default the name
+                of the species.
+
+        Returns:
+            New combatant with the initial health of the species
+
+        """
+        combatant = cls.__new__(cls)
+        Subject.__init__(combatant)
+        combatant.__species = species
+        combatant.__name = species.name if name is None else name
+        combatant.__health = species.health
+        combatant.__id = None
+        combatant.__view = None
+        return combatant
 
     def __getstate__(self) -> dict:
+        species = self.__species
         return {
-            'kind': self.__kind,
+            'id': self.__id,
+            'kind': species.kind,
             'name': self.__name,
             'health': self.__health,
-            'damage': self.__damage,
-            'interval': self.__interval
+            'damage': species.damage,
+            'interval': species.interval
         }
 
+    def __setstate__(self, state: dict) -> None:
+        self.__health = max(0, state.get('health', self.__health))
+        if self.observed:
+            self.on_next(self.state)
+
     def attack(self, name: str) -> None:
         """Attack another combatant
         
+        Description:
+            The name 'all' attacks all living opponents of another kind
+            than the attacker. Names with shell-style wildcards, like 'orc*',
+            attack all other matching combatants. Multiple targets are hit
+            by a single batched attack.
+
         Args:
-            name (str): Name of the combatant to attack
+            name (str): Name or pattern of the combatants to attack
 
         """
 
         arena = conslayer.Arena()
         stdout = conslayer.MessageQueue()
 
-        if not name in arena:
+        # Attack multiple targets
+        if name == "all" or any(char in name for char in "*?["):
+            if name == "all":
+                targets = [c for c in arena if c.kind is not self.kind and c.health > 0]
+            else:
+                targets = [c for c in arena.select(name) if c is not self]
+            if not targets:
+                stdout.queue(f"No combatant matches '{name}'.")
+                return
+            arena.record_attacks(self, targets)
+            return
+
+        target = arena.lookup(name)
+        if target is None:
             stdout.queue(f"{name} is not in arena.")
             return
         
-        arena.record_attack(self, arena[name])
+        arena.record_attack(self, arena[target])
+
+    def _bind(self, id: Optional[int]) -> None:
+        self.__id = id
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Reset combatant to the initial health of its species
+
+        Args:
+            name (str, optional): New name of the combatant
+
+        """
+        if name is not None:
+            self.__name = name
+        self.__health = self.__species.health
+        if self.observed:
+            self.on_next(self.state)
 
     def get_weakened(self, damage: int) -> None:
         """Get weakened by damage points
@@ -146,7 +344,8 @@ class Combatant(rx.subject.BehaviorSubject, ABC):
         """
 
         self.__health = max(0, self.__health - damage)
-        self.on_next(self.state)
+        if self.observed:
+            self.on_next(self.state)
 
 #
 # Monster
@@ -176,6 +375,9 @@ class Monster(Combatant):
         ValueError: Monster name cannot be 'hero'
 
     """
+
+    __slots__ = ()
+
     def __init__(self, name: str, health: int, damage: int, interval: int) -> None:
 
         # Check argument values
@@ -205,6 +407,9 @@ class Hero(Combatant):
         damage (int, readonly): Health damage points an attack of the hero causes
 
     """
+
+    __slots__ = ()
+
     def __init__(self, health: int, damage: int) -> None:
         super().__init__(Hero, "hero", health, damage)
 
@@ -215,20 +420,43 @@ class Hero(Combatant):
 class CombatantDict(dict):
     """CombatantDict class.
     
-    Stores known combatant properties using the following patterns:
+    Stores known species using the following patterns:
         (1) Singleton pattern for application global availability
-        (2) Iterable pattern for iteration over all combatant properties
+        (2) Iterable pattern for iteration over all species
+        (3) Flyweight pattern for sharing of species prototypes
+
+    By default the dictionary contains the built-in roster. Alternatively the
+    species can be loaded from a JSON or TOML roster file, which maps species
+    names to their properties, e.g.:
+
+        {"orc": {"kind": "monster", "health": 7, "damage": 1, "interval": 1.5}}
+
+    The file is validated once when loaded and compiled to species prototypes.
+    When the roster file is watched, changes are reloaded while running, such
+    that new spawns use the changed species and existing combatants keep
+    their species.
+
+    Attributes:
+        path (str, readonly): Path of the loaded roster file or None
 
     """
 
     __instance: Optional['CombatantDict'] = None
     __initialized: bool = False
-    __items: List[Any] = [
-        ("hero", [Hero, 40, 2]),
-        ("dragon", [Monster, "dragon", 20, 3, 2.0]),
-        ("orc", [Monster, "orc", 7, 1, 1.5]),
+    __path: Optional[str] = None
+    __mtime: Optional[int] = None
+    __kinds: Dict[str, type] = {'hero': Hero, 'monster': Monster}
+    __fields: Tuple[str, ...] = ('kind', 'health', 'damage', 'interval', 'area')
+    __items: List[Tuple[str, Species]] = [
+        ("hero", Species(Hero, "hero", 40, 2)),
+        ("dragon", Species(Monster, "dragon", 20, 3, 2.0)),
+        ("orc", Species(Monster, "orc", 7, 1, 1.5)),
     ]
 
+    @property
+    def path(self) -> Optional[str]:
+        return self.__path
+
     def __new__(cls) -> 'CombatantDict':
         if cls.__instance is None:
             cls.__instance = dict.__new__(cls)
@@ -238,3 +466,142 @@ class CombatantDict(dict):
         if not self.__initialized:
             super().__init__(self.__items)
             self.__initialized = True
+
+    def load(self, path: str) -> None:
+        """Load species from roster file.
+
+        Args:
+            path (str): Path of a JSON or TOML roster file
+
+        Raises:
+            ValueError: If the roster file is invalid
+
+        """
+
+        # Parse roster file
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as file:
+            data = file.read()
+        if path.endswith('.toml'):
+            if tomllib is None:
+                raise ValueError("Loading TOML roster files requires 'tomllib' or 'tomli'")
+            try:
+                roster = tomllib.loads(data.decode('utf-8'))
+            except tomllib.TOMLDecodeError as err:
+                raise ValueError(f"Roster file '{path}' is invalid: {err}") from err
+        else:
+            try:
+                roster = json.loads(data)
+            except json.JSONDecodeError as err:
+                raise ValueError(f"Roster file '{path}' is invalid: {err}") from err
+
+        # Compile species
+        species = self.__compile(roster)
+
+        # Replace species without removing names, that are still known
+        self.update(species)
+        for name in set(self) - set(species):
+            del self[name]
+        self.__path = path
+        self.__mtime = mtime
+
+    def reload(self) -> bool:
+        """Reload roster file, if it has been changed.
+
+        Returns:
+            True, if the roster file has been reloaded
+
+        Raises:
+            ValueError: If the changed roster file is invalid
+
+        """
+        if self.__path is None:
+            return False
+        if os.stat(self.__path).st_mtime_ns == self.__mtime:
+            return False
+        self.load(self.__path)
+        return True
+
+    def watch(self, interval: float = 1.,
+            scheduler: Optional[rx.abc.SchedulerBase] = None) -> 'conslayer.PeriodicTimer':
+        """Periodically reload roster file, if it has been changed.
+
+        Invalid changes of the roster file are reported and ignored. The
+        watching stops, when the arena is shut down.
+
+        Args:
+            interval (float, optional): Interval between checks in seconds
+            scheduler (Scheduler, optional): Scheduler for the checks
+
+        Returns:
+            Timer, which stops watching when disposed
+
+        """
+        arena = conslayer.Arena()
+        owned = scheduler is None
+        if scheduler is None:
+            scheduler = rx.scheduler.EventLoopScheduler(
+                thread_factory=lambda target: arena.thread(target, "conslayer-roster"),
+                exit_if_empty=True)
+
+        def check() -> None:
+            try:
+                if self.reload():
+                    conslayer.MessageQueue().queue(f"Roster file '{self.__path}' reloaded.")
+            except (OSError, ValueError) as err:
+                conslayer.MessageQueue().queue(str(err))
+
+        timer = conslayer.PeriodicTimer(scheduler, interval, check, policy='skip')
+
+        # Stop watching and the own scheduler on shutdown of the arena
+        def shutdown(deadline: float) -> None:
+            listener.dispose()
+            timer.dispose()
+            if owned:
+                scheduler.dispose()
+        listener = arena.on('shutdown', shutdown)
+
+        return timer
+
+    def __compile(self, roster: dict) -> Dict[str, Species]:
+
+        # Check roster
+        if not isinstance(roster, dict) or not roster:
+            raise ValueError("Roster requires a non-empty mapping of species")
+
+        species = {}
+        for name, fields in roster.items():
+
+            # Check fields
+            if name.lower() in species:
+                raise ValueError(f"Species '{name}' is defined more than once")
+            if not isinstance(fields, dict):
+                raise ValueError(f"Species '{name}' requires a mapping of properties")
+            unknown = set(fields) - set(self.__fields)
+            if unknown:
+                raise ValueError(f"Species '{name}' has unknown properties {sorted(unknown)}")
+            kind = fields.get('kind')
+            kind = self.__kinds.get(kind) if isinstance(kind, str) else None
+            if kind is None:
+                raise ValueError(f"Species '{name}' requires kind 'hero' or 'monster'")
+            if kind is Hero and name.lower() != "hero":
+                raise ValueError(f"Species '{name}' of kind 'hero' requires name 'hero'")
+            if kind is Monster and name.lower() == "hero":
+                raise ValueError("Monster name cannot be 'hero'")
+            interval = fields.get('interval')
+            if kind is Monster and interval is None:
+                raise ValueError(f"Species '{name}' requires an attack interval")
+            if isinstance(interval, bool):
+                raise ValueError(f"Species '{name}' requires a numeric attack interval")
+            if isinstance(interval, int):
+                interval = float(interval)
+
+            # Create species prototype
+            try:
+                species[name.lower()] = Species(
+                    kind, name.lower(), fields.get('health'), fields.get('damage'), interval,
+                    fields.get('area', False))
+            except (TypeError, ValueError) as err:
+                raise ValueError(f"Species '{name}' is invalid: {err}") from err
+
+        return species
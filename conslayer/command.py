@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Command management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, List, Tuple
+
+from conslayer.console import MessageQueue
+
+#
+# CommandQueue
+#
+
+class CommandQueue(object):
+    """CommandQueue class.
+
+    Serializes the execution of commands from concurrent threads using the
+    following design patterns:
+        (1) Command pattern for deferred execution of state mutations
+        (2) Single writer pattern for race-free execution of commands
+
+    Submitted commands are appended to a queue. The submitting thread tries
+    to become the single writer without blocking and, if successful, executes
+    all pending commands in order of submission. Otherwise the command is left
+    to the current writer, which may be another thread or the same thread, if
+    the command has been submitted from within an executed command. Threads
+    therefore never wait for each other and commands are never interleaved.
+
+    A failing command does not prevent the execution of the remaining
+    commands. Its exception is raised in the submitting thread, if this
+    thread executed the command, and otherwise reported to the message
+    queue, such that timer threads, which execute commands of other threads,
+    are not terminated.
+
+    Attributes:
+        pending (int, readonly): Number of pending commands
+
+    """
+
+    __queue: Deque[Tuple[Callable[..., Any], tuple, int]]
+    __writer: threading.Lock
+
+    @property
+    def pending(self) -> int:
+        return len(self.__queue)
+
+    def __init__(self) -> None:
+        self.__queue = deque()
+        self.__writer = threading.Lock()
+
+    def submit(self, command: Callable[..., Any], *args: Any) -> None:
+        """Submit a command for execution.
+
+        Args:
+            command (Callable): Command to execute
+            *args: Arguments of the command
+
+        """
+        self.__queue.append((command, args, threading.get_ident()))
+        self.drain()
+
+    def drain(self) -> None:
+        """Execute pending commands, if no other writer is active."""
+
+        # The queue has to be checked again after releasing the writer, since
+        # commands may have been submitted while the writer was releasing.
+        thread = threading.get_ident()
+        errors: List[Exception] = []
+        while self.__queue:
+            if not self.__writer.acquire(blocking=False):
+                break
+            try:
+                while self.__queue:
+                    command, args, owner = self.__queue.popleft()
+                    try:
+                        command(*args)
+                    except Exception as err:
+                        if owner == thread:
+                            errors.append(err)
+                        else:
+                            name = getattr(command, '__name__', repr(command))
+                            MessageQueue().queue(f"Command '{name}' failed: {err!r}")
+            finally:
+                self.__writer.release()
+
+        # Raise the first error of a command of this thread
+        if errors:
+            raise errors[0]
@@ -12,7 +12,12 @@ __author__ = 'Patrick Michl'
 __email__ = 'patrick.michl@gmail.com'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
-from typing import Iterator, List, Optional
+from typing import Callable, Iterator, List, Optional
+
+from conslayer.metrics import Metrics
+
+# Metrics of messages
+_metrics = Metrics()
 
 #
 # MessageQueue
@@ -28,12 +33,16 @@ class MessageQueue(object):
 
     Attributes:
         silent (bool): Flag to temporary suppress console outputs
+        sink (Callable, optional): Callback, which receives all messages
+            before they are queued. Messages, for which the callback returns
+            True, are consumed by the callback and not queued.
 
     """
 
     __instance: Optional['MessageQueue'] = None
     __queue: List[str]
     __silent: bool = False
+    __sink: Optional[Callable[[str], bool]] = None
 
     @property
     def silent(self):
@@ -43,10 +52,23 @@ class MessageQueue(object):
     def silent(self, silent: bool):
         self.__silent = silent
 
+    @property
+    def sink(self) -> Optional[Callable[[str], bool]]:
+        return self.__sink
+
+    @sink.setter
+    def sink(self, sink: Optional[Callable[[str], bool]]) -> None:
+        if sink is not None and not callable(sink):
+            raise TypeError("Argument 'sink' requires to be callable")
+        self.__sink = sink
+
     def __new__(cls):
         if cls.__instance is None:
             cls.__instance = object.__new__(cls)
             cls.__instance.__queue = []
+            _metrics.gauge(
+                'messages', "Queued messages, which are not yet printed",
+                cls.__instance.__len__)
         return cls.__instance
 
     def __str__(self):
@@ -68,10 +90,17 @@ class MessageQueue(object):
             message (str): Message to be queued
         
         """
+        sink = self.__sink
+        if sink is not None and sink(message):
+            return
         self.__queue.append(message)
+        if _metrics.enabled:
+            _metrics.queued.inc()
 
     def flush(self):
         """Flush the message queue."""
+        if _metrics.enabled:
+            _metrics.dropped.inc(len(self.__queue))
         self.__queue = []
 
     def print(self):
@@ -80,4 +109,6 @@ class MessageQueue(object):
         message = str(self)
         if message != "":
             print(message)
-            self.flush()
+            if _metrics.enabled:
+                _metrics.flushed.inc(len(self.__queue))
+            self.__queue = []
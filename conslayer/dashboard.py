@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Dashboard management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import shutil
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+import reactivex as rx
+import conslayer
+from conslayer.scheduler import SKIP, PeriodicTimer
+
+# Module Constants
+BAR = 20
+NAME = 16
+
+# ANSI escape codes
+CSI = "\x1b["
+SAVE = "\x1b7"
+RESTORE = "\x1b8"
+CLEAR = CSI + "2J"
+CLEAR_LINE = CSI + "2K"
+RESET = CSI + "0m"
+COLORS = [(.5, CSI + "32m"), (.25, CSI + "33m"), (0., CSI + "31m")]
+DIM = CSI + "2m"
+
+#
+# Dashboard
+#
+
+class Dashboard(object):
+    """Dashboard class.
+
+    Live status view of the arena with one row per combatant, which is drawn
+    with ANSI escape codes at the top of the terminal, using the following
+    design patterns:
+        (1) Dirty flag pattern for redrawing only changed rows
+        (2) Game loop pattern for drawing frames at a capped frame rate
+
+    The rows are drawn above a scrolling region, in which the console
+    commands and all other messages continue to scroll. The dashboard stops,
+    when the arena is shut down. Frames are drawn
+    periodically, but only rows with changed health are redrawn. Hit messages
+    are not queued, but are collapsed into a summary line with the number of
+    hits per attacker since the last frame. The hit counts are guarded by a
+    lock, since hits are counted by the threads of the attackers, while the
+    frames are drawn by the thread of the scheduler.
+
+    Args:
+        fps (float, optional): Maximum number of frames per second
+        rows (int, optional): Maximum number of combatant rows
+        stream (TextIO, optional): Output stream. By default standard output.
+        scheduler (Scheduler, optional): Scheduler of the frames. By default
+            the frames are drawn by an own event loop scheduler.
+
+    Attributes:
+        running (bool, readonly): Flag indicating that the dashboard is drawn
+        frames (int, readonly): Number of drawn frames, which changed the view
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __fps: float
+    __rows: int
+    __stream: Optional[TextIO]
+    __scheduler: Optional[rx.abc.SchedulerBase]
+    __timer: Optional[PeriodicTimer] = None
+    __clock: Optional[rx.abc.SchedulerBase] = None
+    __listener: Optional[rx.abc.DisposableBase] = None
+    __drawn: Dict[int, object]
+    __hits: Dict[str, int]
+    __lock: threading.Lock
+    __summary: Optional[str] = None
+    __frames: int = 0
+
+    @property
+    def running(self) -> bool:
+        return self.__timer is not None
+
+    @property
+    def frames(self) -> int:
+        return self.__frames
+
+    def __init__(self, fps: float = 10., rows: int = 20,
+            stream: Optional[TextIO] = None,
+            scheduler: Optional[rx.abc.SchedulerBase] = None) -> None:
+
+        # Check argument types
+        if not isinstance(fps, float):
+            raise TypeError("Argument 'fps' requires type 'float'")
+        if not isinstance(rows, int):
+            raise TypeError("Argument 'rows' requires type 'int'")
+        if scheduler is not None and not isinstance(scheduler, rx.abc.SchedulerBase):
+            raise TypeError("Argument 'scheduler' requires type 'SchedulerBase'")
+
+        # Check argument values
+        if fps <= 0:
+            raise ValueError("Argument 'fps' requires to be positive")
+        if rows <= 0:
+            raise ValueError("Argument 'rows' requires to be positive")
+
+        self.__fps = fps
+        self.__rows = rows
+        self.__stream = stream
+        self.__scheduler = scheduler
+        self.__drawn = {}
+        self.__hits = {}
+        self.__lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start drawing the dashboard."""
+        if self.running:
+            return
+
+        # Reserve the top lines of the terminal and scroll below them
+        height = shutil.get_terminal_size((80, 24)).lines
+        top = self.__rows + 2
+        self.__write(
+            f"{CLEAR}{CSI}{top + 1};{max(height, top + 2)}r{CSI}{top + 1};1H")
+        self.__drawn = {}
+        with self.__lock:
+            self.__hits = {}
+        self.__summary = None
+
+        # Collapse hit messages and draw frames
+        conslayer.MessageQueue().sink = self.__sink
+        arena = conslayer.Arena()
+        scheduler = self.__scheduler
+        if scheduler is None:
+            scheduler = self.__clock = rx.scheduler.EventLoopScheduler(
+                thread_factory=lambda target: arena.thread(target, "conslayer-dashboard"),
+                exit_if_empty=True)
+        self.render()
+        self.__timer = PeriodicTimer(scheduler, 1. / self.__fps, self.render, policy=SKIP)
+        self.__listener = arena.on('shutdown', self.__shutdown)
+
+    def stop(self) -> None:
+        """Stop drawing the dashboard and restore the scrolling region."""
+        timer = self.__timer
+        if timer is None:
+            return
+        self.__timer = None
+        timer.dispose()
+        if self.__clock is not None:
+            self.__clock.dispose()
+            self.__clock = None
+        if self.__listener is not None:
+            self.__listener.dispose()
+            self.__listener = None
+        stdout = conslayer.MessageQueue()
+        if stdout.sink == self.__sink:
+            stdout.sink = None
+        self.__write(f"{SAVE}{CSI}r{RESTORE}")
+
+    def __shutdown(self, deadline: float) -> None:
+        self.stop()
+
+    def __write(self, text: str) -> None:
+        stream = self.__stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+
+    def __sink(self, message: str) -> bool:
+
+        # Count hit messages per attacker instead of queueing them
+        attacker, hits, _ = message.partition(" hits ")
+        if not hits:
+            return False
+        with self.__lock:
+            self.__hits[attacker] = self.__hits.get(attacker, 0) + 1
+        return True
+
+    def __row(self, combatant: 'conslayer.Combatant') -> str:
+        health = max(0, combatant.health)
+        maximum = max(1, combatant.species.health)
+        ratio = min(1., health / maximum)
+        filled = round(ratio * BAR)
+        color = DIM if health == 0 else next(
+            code for bound, code in COLORS if ratio >= bound)
+        name = combatant.name.title()[:NAME]
+        return (f"{name:<{NAME}} {color}{'#' * filled}{'-' * (BAR - filled)}{RESET} "
+            f"{health:>6}/{maximum}")
+
+    def render(self) -> None:
+        """Draw a frame with the rows of all changed combatants."""
+        arena = conslayer.Arena()
+        combatants = list(arena)
+        drawn = self.__drawn
+        lines: List[str] = []
+
+        # Rows of combatants, which are new, changed or moved
+        shown = combatants[:self.__rows]
+        for index, combatant in enumerate(shown):
+            key = (index, combatant.name, combatant.health)
+            if drawn.get(index) != key:
+                drawn[index] = key
+                lines.append(f"{CSI}{index + 2};1H{CLEAR_LINE}{self.__row(combatant)}")
+        for index in [index for index in drawn if index >= len(shown)]:
+            del drawn[index]
+            lines.append(f"{CSI}{index + 2};1H{CLEAR_LINE}")
+
+        # Header and summary of the hits since the last frame
+        header = f"Arena: {len(combatants)} combatants"
+        if len(combatants) > len(shown):
+            header += f" ({len(combatants) - len(shown)} not shown)"
+        if drawn.get(-1) != header:
+            drawn[-1] = header
+            lines.append(f"{CSI}1;1H{CLEAR_LINE}{header}")
+        with self.__lock:
+            hits, self.__hits = self.__hits, {}
+        summary = ", ".join(
+            f"{attacker} {count} {'hit' if count == 1 else 'hits'}"
+            for attacker, count in hits.items())
+        if summary != self.__summary:
+            self.__summary = summary
+            lines.append(f"{CSI}{self.__rows + 2};1H{CLEAR_LINE}{summary}")
+
+        # Draw changes without moving the cursor of the scrolling region
+        if lines:
+            self.__frames += 1
+            self.__write(SAVE + "".join(lines) + RESTORE)
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Metrics export management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import reactivex as rx
+import conslayer
+from conslayer.metrics import Metrics
+from conslayer.scheduler import SKIP, PeriodicTimer
+
+# Module Constants
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+#
+# MetricsHandler
+#
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:
+        if self.path.partition("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = Metrics().expose().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+
+        # Requests are not logged, since they would interfere with the console
+        pass
+
+#
+# MetricsServer
+#
+
+class MetricsServer(object):
+    """MetricsServer class.
+
+    Local HTTP endpoint, which serves the engine metrics at '/metrics' in the
+    Prometheus text exposition format from a background thread. The server
+    stops, when the arena is shut down.
+
+    Args:
+        port (int, optional): Port to listen on. By default 9464. The port 0
+            binds an arbitrary free port.
+        host (str, optional): Host to listen on. By default only local
+            connections are accepted.
+
+    Attributes:
+        port (int, readonly): Port, which is listened on, if started
+        url (str, readonly): URL of the metrics endpoint, if started
+        started (bool, readonly): Flag indicating that the server is started
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+
+    """
+
+    __host: str
+    __port: int
+    __server: Optional[ThreadingHTTPServer] = None
+    __thread: Optional[threading.Thread] = None
+    __listener: Optional[rx.abc.DisposableBase] = None
+
+    @property
+    def port(self) -> int:
+        if self.__server is not None:
+            return self.__server.server_address[1]
+        return self.__port
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.__host}:{self.port}/metrics"
+
+    @property
+    def started(self) -> bool:
+        return self.__server is not None
+
+    def __init__(self, port: int = 9464, host: str = '127.0.0.1') -> None:
+
+        # Check argument types
+        if not isinstance(port, int):
+            raise TypeError("Argument 'port' requires type 'int'")
+        if not isinstance(host, str):
+            raise TypeError("Argument 'host' requires type 'str'")
+
+        self.__host = host
+        self.__port = port
+
+    def start(self) -> None:
+        """Start serving metrics.
+
+        Raises:
+            OSError: If the port cannot be bound
+
+        """
+        if self.__server is not None:
+            return
+        server = ThreadingHTTPServer((self.__host, self.__port), _MetricsHandler)
+        server.daemon_threads = True
+        self.__server = server
+        arena = conslayer.Arena()
+        self.__thread = arena.thread(server.serve_forever, "conslayer-metrics")
+        self.__thread.start()
+        self.__listener = arena.on('shutdown', self.__shutdown)
+
+    def stop(self) -> None:
+        """Stop serving metrics."""
+        server, thread = self.__server, self.__thread
+        if server is None:
+            return
+        self.__server = self.__thread = None
+        if self.__listener is not None:
+            self.__listener.dispose()
+            self.__listener = None
+        server.shutdown()
+        server.server_close()
+        if thread is not None:
+            thread.join()
+
+    def __shutdown(self, deadline: float) -> None:
+        self.stop()
+
+#
+# MetricsDump
+#
+
+class MetricsDump(object):
+    """MetricsDump class.
+
+    Periodically writes the engine metrics in the Prometheus text exposition
+    format to a file, e.g. for the textfile collector of the node exporter or
+    for batch jobs. The file is replaced atomically, such that readers never
+    see partially written metrics. The writes stop, when the arena is shut
+    down.
+
+    Args:
+        path (str): Path of the metrics file
+        interval (float, optional): Interval between writes in seconds. By
+            default 15 seconds.
+        scheduler (Scheduler, optional): Scheduler of the writes. By default
+            the writes are executed by an own event loop scheduler.
+
+    Attributes:
+        path (str, readonly): Path of the metrics file
+        started (bool, readonly): Flag indicating that writes are scheduled
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __path: str
+    __interval: float
+    __scheduler: Optional[rx.abc.SchedulerBase]
+    __timer: Optional[PeriodicTimer] = None
+    __clock: Optional[rx.abc.SchedulerBase] = None
+    __listener: Optional[rx.abc.DisposableBase] = None
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def started(self) -> bool:
+        return self.__timer is not None
+
+    def __init__(self, path: str, interval: float = 15.,
+            scheduler: Optional[rx.abc.SchedulerBase] = None) -> None:
+
+        # Check argument types
+        if not isinstance(path, str):
+            raise TypeError("Argument 'path' requires type 'str'")
+        if not isinstance(interval, float):
+            raise TypeError("Argument 'interval' requires type 'float'")
+        if scheduler is not None and not isinstance(scheduler, rx.abc.SchedulerBase):
+            raise TypeError("Argument 'scheduler' requires type 'SchedulerBase'")
+
+        # Check argument values
+        if interval <= 0:
+            raise ValueError("Argument 'interval' requires to be positive")
+
+        self.__path = path
+        self.__interval = interval
+        self.__scheduler = scheduler
+
+    def write(self) -> None:
+        """Write the current metrics to the file."""
+        temp = f"{self.__path}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            file.write(Metrics().expose())
+        os.replace(temp, self.__path)
+
+    def start(self) -> None:
+        """Start periodic writes.
+
+        The metrics are written immediately and then once per interval.
+
+        """
+        if self.__timer is not None:
+            return
+        arena = conslayer.Arena()
+        scheduler = self.__scheduler
+        if scheduler is None:
+            scheduler = self.__clock = rx.scheduler.EventLoopScheduler(
+                thread_factory=lambda target: arena.thread(target, "conslayer-metrics-dump"),
+                exit_if_empty=True)
+        self.write()
+        self.__timer = PeriodicTimer(scheduler, self.__interval, self.write, policy=SKIP)
+        self.__listener = arena.on('shutdown', self.__shutdown)
+
+    def stop(self) -> None:
+        """Stop periodic writes and write the final metrics."""
+        timer = self.__timer
+        if timer is None:
+            return
+        self.__timer = None
+        timer.dispose()
+        if self.__clock is not None:
+            self.__clock.dispose()
+            self.__clock = None
+        if self.__listener is not None:
+            self.__listener.dispose()
+            self.__listener = None
+        self.write()
+
+    def __shutdown(self, deadline: float) -> None:
+        self.stop()
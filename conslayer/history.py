@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Fight history management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+BATCH = 64
+
+# Schema of the fight history
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fights (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    winner TEXT,
+    combatants INTEGER NOT NULL,
+    attacks INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS combatants (
+    fight INTEGER NOT NULL REFERENCES fights(id),
+    name TEXT NOT NULL,
+    species TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    attacks INTEGER NOT NULL,
+    damage INTEGER NOT NULL,
+    kills INTEGER NOT NULL,
+    died INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS fights_winner ON fights (winner);
+CREATE INDEX IF NOT EXISTS combatants_fight ON combatants (fight);
+CREATE INDEX IF NOT EXISTS combatants_species ON combatants (species, kind);
+CREATE INDEX IF NOT EXISTS combatants_score ON combatants (kills DESC, damage DESC);
+"""
+
+#
+# FightHistory
+#
+
+class FightHistory(object):
+    """FightHistory class.
+
+    Stores results and summary statistics of the fights in arena in a local
+    SQLite database using the following design patterns:
+        (1) Observer pattern for observation of arena events
+        (2) Producer consumer pattern for asynchronous writes
+
+    While recording, the arena events of a fight are aggregated in memory.
+    When the fight stops, its result is queued without blocking and written
+    by a background writer, which writes all queued fights in one
+    transaction. The winner is 'hero', if only heroes are alive at the end
+    of the fight, 'monsters', if no hero is alive, and None, if the fight
+    was stopped otherwise. Durations are measured on the clock of the arena
+    scheduler. When the arena is shut down, the history is closed within the
+    deadline of the shutdown.
+
+    Args:
+        path (str, optional): Path of the database file. By default the
+            database is kept in memory.
+
+    Attributes:
+        path (str, readonly): Path of the database file
+        recording (bool, readonly): Flag indicating that fights are recorded
+        pending (int, readonly): Number of fights, which are not yet written
+
+    Raises:
+        TypeError: Argument 'path' requires type 'str'
+        OSError: The database cannot be opened
+
+    """
+
+    __path: str
+    __connection: sqlite3.Connection
+    __lock: threading.Lock
+    __queue: 'queue.Queue[Optional[dict]]'
+    __writer: threading.Thread
+    __listeners: List[rx.abc.DisposableBase]
+    __shutdown: Optional[rx.abc.DisposableBase] = None
+    __fight: Optional[Dict[str, Any]] = None
+    __closed: bool = False
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def recording(self) -> bool:
+        return bool(self.__listeners)
+
+    @property
+    def pending(self) -> int:
+        return self.__queue.unfinished_tasks
+
+    def __init__(self, path: str = ':memory:') -> None:
+
+        # Check argument types
+        if not isinstance(path, str):
+            raise TypeError("Argument 'path' requires type 'str'")
+
+        # Connect database, which is shared by the writer and queries
+        self.__path = path
+        try:
+            self.__connection = sqlite3.connect(path, check_same_thread=False)
+            self.__connection.executescript(SCHEMA)
+        except sqlite3.Error as err:
+            raise OSError(f"Fight history '{path}' cannot be opened: {err}") from err
+        self.__lock = threading.Lock()
+        self.__listeners = []
+
+        # Start background writer
+        arena = conslayer.Arena()
+        self.__queue = queue.Queue()
+        self.__writer = arena.thread(self.__write, "conslayer-history")
+        self.__writer.start()
+        self.__shutdown = arena.on('shutdown', self.__close)
+
+    def start(self) -> None:
+        """Start recording the fights in arena.
+
+        If a fight is already started, it is recorded from now on.
+
+        Raises:
+            ValueError: The fight history is closed
+
+        """
+        if self.recording:
+            return
+        if self.__closed:
+            raise ValueError("Fight history is closed")
+        arena = conslayer.Arena()
+        self.__listeners = [
+            arena.on('fight_state', self.__fight_state),
+            arena.on('spawn', self.__spawn),
+            arena.on('hit', self.__hit),
+            arena.on('death', self.__death)]
+        if arena.started:
+            self.__fight_state(True)
+
+    def stop(self) -> None:
+        """Stop recording. A started fight is discarded."""
+        for listener in self.__listeners:
+            listener.dispose()
+        self.__listeners = []
+        self.__fight = None
+
+    def flush(self) -> None:
+        """Wait until all queued fights are written."""
+        self.__queue.join()
+
+    def close(self, timeout: float = 1.) -> bool:
+        """Stop recording, write all queued fights and close the database.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the writer
+
+        Returns:
+            True, if all queued fights have been written within the timeout
+
+        """
+        self.stop()
+        if self.__shutdown is not None:
+            self.__shutdown.dispose()
+            self.__shutdown = None
+        if self.__closed:
+            return True
+        self.__closed = True
+        self.__queue.put(None)
+        self.__writer.join(timeout)
+        if self.__writer.is_alive():
+            return False
+        self.__connection.close()
+        return True
+
+    def __close(self, deadline: float) -> None:
+
+        # A writer, which does not stop in time, is reported by the arena
+        self.close(max(0., deadline - time.monotonic()))
+
+    def __fight_state(self, started: bool) -> None:
+        arena = conslayer.Arena()
+        if started:
+            self.__fight = {
+                'started': time.time(),
+                'clock': arena.scheduler.now,
+                'combatants': {}}
+            for combatant in arena:
+                self.__spawn(combatant)
+            return
+        fight = self.__fight
+        if fight is None:
+            return
+        self.__fight = None
+
+        # Determine winner
+        heroes = any(hero.health > 0 for hero in arena.heroes)
+        monsters = any(monster.health > 0 for monster in arena.monsters)
+        winner = None
+        if not heroes:
+            winner = 'monsters'
+        elif not monsters and not arena.endless:
+            winner = 'hero'
+
+        # Queue result for the background writer
+        fight['duration'] = (arena.scheduler.now - fight.pop('clock')).total_seconds()
+        fight['winner'] = winner
+        self.__queue.put_nowait(fight)
+
+    def __spawn(self, combatant: 'conslayer.Combatant') -> None:
+        fight = self.__fight
+        if fight is None or combatant.name in fight['combatants']:
+            return
+        fight['combatants'][combatant.name] = [
+            combatant.species.name, combatant.kind.__name__.lower(), 0, 0, 0, 0]
+
+    def __hit(self, hit: dict) -> None:
+        fight = self.__fight
+        if fight is None:
+            return
+        stats = fight['combatants'].get(hit['attacker'])
+        if stats is None:
+            return
+        stats[2] += 1
+        stats[3] += hit['damage']
+        if hit['health'] <= 0:
+            stats[4] += 1
+
+    def __death(self, combatant: 'conslayer.Combatant') -> None:
+        fight = self.__fight
+        if fight is None:
+            return
+        stats = fight['combatants'].get(combatant.name)
+        if stats is not None:
+            stats[5] = 1
+
+    def __write(self) -> None:
+        while True:
+
+            # Collect queued fights into one batch
+            batch = [self.__queue.get()]
+            while len(batch) < BATCH:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Write batch in one transaction
+            fights = [fight for fight in batch if fight is not None]
+            try:
+                if fights:
+                    with self.__lock, self.__connection:
+                        for fight in fights:
+                            self.__insert(fight)
+            except sqlite3.Error as err:
+                conslayer.MessageQueue().queue(f"Fight history could not be written: {err}")
+            finally:
+                for _ in batch:
+                    self.__queue.task_done()
+            if len(fights) < len(batch):
+                return
+
+    def __insert(self, fight: dict) -> None:
+        combatants = fight['combatants']
+        cursor = self.__connection.execute(
+            "INSERT INTO fights (started, duration, winner, combatants, attacks) "
+            "VALUES (?, ?, ?, ?, ?)", (
+                fight['started'], fight['duration'], fight['winner'],
+                len(combatants), sum(stats[2] for stats in combatants.values())))
+        id = cursor.lastrowid
+        self.__connection.executemany(
+            "INSERT INTO combatants "
+            "(fight, name, species, kind, attacks, damage, kills, died) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(id, name, *stats) for name, stats in combatants.items()])
+
+    def __query(self, sql: str, params: tuple = ()) -> List[dict]:
+        self.flush()
+        with self.__lock:
+            cursor = self.__connection.execute(sql, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def fights(self, limit: int = 10) -> List[dict]:
+        """Get the most recent fights.
+
+        Args:
+            limit (int, optional): Maximum number of fights
+
+        Returns:
+            Fights with start time, duration, winner, number of combatants
+            and number of attacks, starting with the most recent fight
+
+        """
+        return self.__query(
+            "SELECT id, started, duration, winner, combatants, attacks "
+            "FROM fights ORDER BY id DESC LIMIT ?", (limit,))
+
+    def leaderboard(self, limit: int = 10) -> List[dict]:
+        """Get the combatants with the most kills and damage in a fight.
+
+        Args:
+            limit (int, optional): Maximum number of combatants
+
+        Returns:
+            Combatants with fight, species, kills, damage and attacks
+
+        """
+        return self.__query(
+            "SELECT fight, name, species, kills, damage, attacks FROM combatants "
+            "ORDER BY kills DESC, damage DESC LIMIT ?", (limit,))
+
+    def balance(self) -> List[dict]:
+        """Get summary statistics of all species for balance analysis.
+
+        Returns:
+            Species with number of appearances, win rate of their side, death
+            rate and mean attacks, damage and kills per fight
+
+        """
+        return self.__query(
+            "SELECT c.species AS species, c.kind AS kind, "
+            "COUNT(*) AS appearances, "
+            "AVG((c.kind = 'hero' AND f.winner = 'hero') "
+            "OR (c.kind = 'monster' AND f.winner = 'monsters')) AS win_rate, "
+            "AVG(c.died) AS death_rate, AVG(c.attacks) AS attacks, "
+            "AVG(c.damage) AS damage, AVG(c.kills) AS kills "
+            "FROM combatants AS c JOIN fights AS f ON f.id = c.fight "
+            "GROUP BY c.species, c.kind ORDER BY c.kind, c.species")
+
+    def summary(self) -> dict:
+        """Get summary statistics of all fights.
+
+        Returns:
+            Number of fights, wins of the hero and the monsters, undecided
+            fights and mean duration and attacks per fight
+
+        """
+        return self.__query(
+            "SELECT COUNT(*) AS fights, "
+            "COALESCE(SUM(winner = 'hero'), 0) AS hero, "
+            "COALESCE(SUM(winner = 'monsters'), 0) AS monsters, "
+            "COALESCE(SUM(winner IS NULL), 0) AS undecided, "
+            "AVG(duration) AS duration, AVG(attacks) AS attacks FROM fights")[0]
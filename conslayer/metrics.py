@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Metrics management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import conslayer
+
+# Module Constants
+BUCKETS = 24
+PREFIX = 'conslayer_'
+
+def _duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} us"
+    if seconds < 1.:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+#
+# Counter
+#
+
+class Counter(object):
+    """Counter class.
+
+    Monotonic counter of events. Increments are guarded by a lock, such that
+    events, which are counted from different threads, are not lost.
+
+    Args:
+        name (str): Name of the counter
+        help (str): Description of the counter
+
+    Attributes:
+        name (str, readonly): Name of the counter
+        help (str, readonly): Description of the counter
+        value (int, readonly): Number of counted events
+
+    """
+
+    __slots__ = ('__name', '__help', '__value', '__lock')
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def help(self) -> str:
+        return self.__help
+
+    @property
+    def value(self) -> int:
+        return self.__value
+
+    def __init__(self, name: str, help: str) -> None:
+        self.__name = name
+        self.__help = help
+        self.__value = 0
+        self.__lock = threading.Lock()
+
+    def inc(self, count: int = 1) -> None:
+        """Count events.
+
+        Args:
+            count (int, optional): Number of events. By default 1.
+
+        """
+        with self.__lock:
+            self.__value += count
+
+    def reset(self) -> None:
+        """Reset the number of counted events."""
+        with self.__lock:
+            self.__value = 0
+
+#
+# Histogram
+#
+
+class Histogram(object):
+    """Histogram class.
+
+    Latency histogram with exponential buckets, whose upper bounds double
+    from the unit. Each bucket includes its upper bound. Observations only
+    cost a bit length computation and do not depend on the number of buckets.
+
+    Args:
+        name (str): Name of the histogram
+        help (str): Description of the histogram
+        unit (float, optional): Upper bound of the first bucket in seconds.
+            By default one microsecond.
+
+    Attributes:
+        name (str, readonly): Name of the histogram
+        help (str, readonly): Description of the histogram
+        unit (float, readonly): Upper bound of the first bucket in seconds
+        count (int, readonly): Number of observations
+        sum (float, readonly): Sum of observed durations in seconds
+        mean (float, readonly): Mean of observed durations in seconds
+        buckets (List[Tuple[float, int]], readonly): Upper bounds in seconds
+            and cumulative counts of the buckets. The last upper bound is
+            infinite.
+
+    """
+
+    __slots__ = ('__name', '__help', '__unit', '__scale', '__counts', '__count', '__sum')
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def help(self) -> str:
+        return self.__help
+
+    @property
+    def unit(self) -> float:
+        return self.__unit
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+    @property
+    def mean(self) -> float:
+        return self.__sum / self.__count if self.__count else 0.
+
+    @property
+    def buckets(self) -> List[Tuple[float, int]]:
+        buckets = []
+        total = 0
+        for index, count in enumerate(self.__counts):
+            total += count
+            bound = 2 ** index * self.__unit if index < BUCKETS else float('inf')
+            buckets.append((bound, total))
+        return buckets
+
+    def __init__(self, name: str, help: str, unit: float = 1e-6) -> None:
+
+        # Check argument values
+        if not unit > 0:
+            raise ValueError("Argument 'unit' requires to be positive")
+
+        self.__name = name
+        self.__help = help
+        self.__unit = unit
+        self.__scale = 1. / unit
+        self.__counts = [0] * (BUCKETS + 1)
+        self.__count = 0
+        self.__sum = 0.
+
+    def observe(self, seconds: float) -> None:
+        """Observe duration.
+
+        Args:
+            seconds (float): Observed duration in seconds
+
+        """
+        ceiling = math.ceil(seconds * self.__scale)
+        index = min((ceiling - 1).bit_length(), BUCKETS) if ceiling > 1 else 0
+        self.__counts[index] += 1
+        self.__count += 1
+        self.__sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate quantile of observed durations.
+
+        Args:
+            q (float): Quantile between 0 and 1, e.g. 0.99
+
+        Returns:
+            Upper bound of the bucket, which contains the quantile, in seconds
+
+        """
+        rank = q * self.__count
+        for bound, total in self.buckets:
+            if total >= rank and total > 0:
+                return bound
+        return 0.
+
+    def reset(self) -> None:
+        """Reset all observations."""
+        self.__counts = [0] * (BUCKETS + 1)
+        self.__count = 0
+        self.__sum = 0.
+
+#
+# Metrics
+#
+
+class Metrics(object):
+    """Metrics class.
+
+    Stores counters, latency histograms and gauges of the engine using the
+    following design patterns:
+        (1) Singleton pattern for application global availability
+        (2) Registry pattern for indexing metrics by name
+
+    Metrics are disabled by default. Instrumented hot paths only check the
+    'enabled' flag, which is a plain attribute instead of a property, since
+    a property call would multiply the cost of an emission without
+    subscribers. Gauges are only evaluated when they are read.
+
+    Attributes:
+        enabled (bool): Flag indicating that metrics are recorded
+        counters (Dict[str, Counter], readonly): Counters by name
+        histograms (Dict[str, Histogram], readonly): Histograms by name
+        gauges (Dict[str, float], readonly): Current values of gauges by name
+        attacks (Counter, readonly): Resolved attacks per target
+        emissions (Counter, readonly): Emitted state changes
+        evaluations (Counter, readonly): Evaluations of the guardian
+        deaths (Counter, readonly): Killed combatants
+        queued (Counter, readonly): Queued messages
+        dropped (Counter, readonly): Messages flushed without printing
+        flushed (Counter, readonly): Printed messages
+        attack_latency (Histogram, readonly): Durations of recorded attacks
+        dispatch_latency (Histogram, readonly): Durations of the dispatch of
+            state changes to observers
+        fight_duration (Histogram, readonly): Durations of finished fights
+
+    """
+
+    __instance: Optional['Metrics'] = None
+    __counters: Dict[str, Counter]
+    __histograms: Dict[str, Histogram]
+    __gauges: Dict[str, Tuple[str, Callable[[], float]]]
+    enabled: bool
+
+    @property
+    def counters(self) -> Dict[str, Counter]:
+        return dict(self.__counters)
+
+    @property
+    def histograms(self) -> Dict[str, Histogram]:
+        return dict(self.__histograms)
+
+    @property
+    def gauges(self) -> Dict[str, float]:
+        return {name: gauge() for name, (_, gauge) in list(self.__gauges.items())}
+
+    @property
+    def attacks(self) -> Counter:
+        return self.__counters['attacks']
+
+    @property
+    def emissions(self) -> Counter:
+        return self.__counters['emissions']
+
+    @property
+    def evaluations(self) -> Counter:
+        return self.__counters['evaluations']
+
+    @property
+    def deaths(self) -> Counter:
+        return self.__counters['deaths']
+
+    @property
+    def queued(self) -> Counter:
+        return self.__counters['queued']
+
+    @property
+    def dropped(self) -> Counter:
+        return self.__counters['dropped']
+
+    @property
+    def flushed(self) -> Counter:
+        return self.__counters['flushed']
+
+    @property
+    def attack_latency(self) -> Histogram:
+        return self.__histograms['attack_latency']
+
+    @property
+    def dispatch_latency(self) -> Histogram:
+        return self.__histograms['dispatch_latency']
+
+    @property
+    def fight_duration(self) -> Histogram:
+        return self.__histograms['fight_duration']
+
+    def __new__(cls) -> 'Metrics':
+        if cls.__instance is None:
+            instance = object.__new__(cls)
+            instance.enabled = False
+            instance.__counters = {
+                counter.name: counter for counter in [
+                    Counter('attacks', "Resolved attacks per target"),
+                    Counter('emissions', "Emitted state changes"),
+                    Counter('evaluations', "Evaluations of the guardian"),
+                    Counter('deaths', "Killed combatants"),
+                    Counter('queued', "Queued messages"),
+                    Counter('dropped', "Messages flushed without printing"),
+                    Counter('flushed', "Printed messages")]}
+            instance.__histograms = {
+                histogram.name: histogram for histogram in [
+                    Histogram('attack_latency', "Durations of recorded attacks"),
+                    Histogram('dispatch_latency', "Durations of state change dispatch"),
+                    Histogram('fight_duration', "Durations of finished fights", unit=1e-3)]}
+            instance.__gauges = {
+                'timers': (
+                    "Live periodic timers",
+                    lambda: conslayer.PeriodicTimer.live()),
+                'subscriptions': (
+                    "Live subscriptions of subjects and topics",
+                    lambda: conslayer.Subject.live() + conslayer.TopicRegistry.live())}
+            cls.__instance = instance
+        return cls.__instance
+
+    def __str__(self) -> str:
+        lines = ["Counters:"]
+        for name, counter in self.__counters.items():
+            lines.append(f"  {name}: {counter.value}")
+        lines.append("Latencies:")
+        for name, histogram in self.__histograms.items():
+            lines.append(
+                f"  {name}: count {histogram.count}, "
+                f"mean {_duration(histogram.mean)}, "
+                f"p50 {_duration(histogram.quantile(.5))}, "
+                f"p99 {_duration(histogram.quantile(.99))}")
+        lines.append("Gauges:")
+        for name, value in self.gauges.items():
+            lines.append(f"  {name}: {value:g}")
+        return "\n".join(lines)
+
+    def expose(self) -> str:
+        """Get metrics in the Prometheus text exposition format.
+
+        Counters are exposed with the suffix '_total' and histograms in
+        seconds with the suffix '_seconds'. All names have the prefix
+        'conslayer_'.
+
+        Returns:
+            Exposition of all counters, histograms and gauges
+
+        """
+        lines = []
+        for name, counter in self.__counters.items():
+            metric = f"{PREFIX}{name}_total"
+            lines.append(f"# HELP {metric} {counter.help}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {counter.value}")
+        for name, histogram in self.__histograms.items():
+            metric = f"{PREFIX}{name}_seconds"
+            lines.append(f"# HELP {metric} {histogram.help}")
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, total in histogram.buckets:
+                le = repr(bound) if bound != float('inf') else "+Inf"
+                lines.append(f'{metric}_bucket{{le="{le}"}} {total}')
+            lines.append(f"{metric}_sum {histogram.sum!r}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, (help, gauge) in list(self.__gauges.items()):
+            metric = f"{PREFIX}{name}"
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {gauge()!r}")
+        return "\n".join(lines) + "\n"
+
+    def help(self, name: str) -> str:
+        """Get description of a metric.
+
+        Args:
+            name (str): Name of the counter, histogram or gauge
+
+        Returns:
+            Description of the metric
+
+        Raises:
+            KeyError: Metric is not known
+
+        """
+        if name in self.__counters:
+            return self.__counters[name].help
+        if name in self.__histograms:
+            return self.__histograms[name].help
+        return self.__gauges[name][0]
+
+    def gauge(self, name: str, help: str, function: Callable[[], float]) -> None:
+        """Register gauge.
+
+        Args:
+            name (str): Name of the gauge
+            help (str): Description of the gauge
+            function (Callable): Function, which returns the current value
+
+        Raises:
+            TypeError: Argument 'function' requires to be callable
+
+        """
+        if not callable(function):
+            raise TypeError("Argument 'function' requires to be callable")
+        self.__gauges[name] = (help, function)
+
+    def reset(self) -> None:
+        """Reset all counters and histograms."""
+        for counter in self.__counters.values():
+            counter.reset()
+        for histogram in self.__histograms.values():
+            histogram.reset()
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Profiling management.
+
+Runs fight scenarios on a virtual clock and profiles them. Since the tracing
+of memory allocations distorts the measurement of CPU times and vice versa,
+each scenario is played twice, once with the CPU profiler and once with the
+tracing of memory allocations. Profiles are written from the command line:
+
+    $ conslayer profile [roster|wave|arenas] [--size N] [--duration SECONDS]
+        [--output PREFIX]
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import argparse
+import cProfile
+import inspect
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+STEP = 1.
+FRAMES = 16
+SUBSYSTEMS = {
+    'Arena': ['Arena'],
+    'Guardian': ['Guardian'],
+    'Combatant': ['Combatant', 'Hero', 'Monster', 'Species'],
+    'MessageQueue': ['MessageQueue']}
+
+#
+# Scenarios
+#
+
+def _setup(scheduler: rx.abc.SchedulerBase,
+        hero: Optional['conslayer.Species'] = None) -> 'conslayer.Arena':
+
+    # Setup empty arena with a hero on the virtual clock
+    arena = conslayer.Arena()
+    arena.stop_fight()
+    arena.clear()
+    arena.scheduler = scheduler
+    if hero is None:
+        arena.add("hero")
+    else:
+        arena.enter(hero.spawn())
+    conslayer.Guardian().watch(arena)
+    return arena
+
+def _teardown() -> None:
+    conslayer.Guardian().unwatch()
+    arena = conslayer.Arena()
+    arena.stop_fight()
+    arena.clear()
+    arena.scheduler = None
+    conslayer.MessageQueue().flush()
+
+def _play(scheduler: rx.scheduler.HistoricalScheduler,
+        arena: 'conslayer.Arena', duration: float, interval: float) -> float:
+
+    # Let the hero attack the first living monster
+    def attack() -> None:
+        if not arena.started or "hero" not in arena:
+            return
+        for monster in arena.monsters:
+            if monster.health > 0:
+                arena["hero"].attack(monster.name)
+                return
+    hero = conslayer.PeriodicTimer(scheduler, interval, attack)
+
+    # Advance the virtual clock until the fight is finished
+    stdout = conslayer.MessageQueue()
+    elapsed = 0.
+    try:
+        arena.start_fight()
+        while elapsed < duration and arena.started:
+            scheduler.advance_by(STEP)
+            stdout.flush()
+            elapsed += STEP
+    finally:
+        hero.dispose()
+    return elapsed
+
+def roster(scheduler: rx.scheduler.HistoricalScheduler,
+        size: int, duration: float) -> int:
+    """Fights of the default hero against monsters of the default roster.
+
+    Fights are repeated until the duration elapsed.
+
+    Returns:
+        Number of fights
+
+    Raises:
+        ValueError: The roster has no hero or monster species, or a fight
+            cannot be started
+
+    """
+    combatants = conslayer.CombatantDict()
+    species = [
+        species for species in combatants.values()
+        if species.kind is conslayer.Monster]
+    if "hero" not in combatants or not species:
+        raise ValueError("Scenario 'roster' requires a hero and monster species")
+    fights = 0
+    while duration > 0:
+        arena = _setup(scheduler)
+        for index in range(size):
+            arena.enter(species[index % len(species)].spawn(f"monster-{index}"))
+        elapsed = _play(scheduler, arena, duration, .5)
+        if elapsed <= 0:
+            raise ValueError("Scenario 'roster' cannot start a fight")
+        duration -= elapsed
+        fights += 1
+    return fights
+
+def wave(scheduler: rx.scheduler.HistoricalScheduler,
+        size: int, duration: float) -> int:
+    """Endless wave with up to 'size' living monsters against an immortal hero.
+
+    Returns:
+        Number of fights
+
+    """
+    hero = conslayer.Species(conslayer.Hero, "hero", 10**9, 2)
+    arena = _setup(scheduler, hero)
+    endless = conslayer.Wave(rate=5., limit=size)
+    endless.start()
+    try:
+        _play(scheduler, arena, duration, .1)
+    finally:
+        endless.stop()
+    return 1
+
+def arenas(scheduler: rx.scheduler.HistoricalScheduler,
+        size: int, duration: float) -> int:
+    """Consecutive fights of the default hero against an orc and a dragon.
+
+    Since the arena is application global, the arenas are played one after
+    another. Each fight is limited to the duration.
+
+    Returns:
+        Number of fights
+
+    """
+    for _ in range(size):
+        arena = _setup(scheduler)
+        arena.add("orc")
+        arena.add("dragon")
+        _play(scheduler, arena, duration, .5)
+    return size
+
+SCENARIOS: Dict[str, Callable[..., int]] = {
+    'roster': roster,
+    'wave': wave,
+    'arenas': arenas}
+
+#
+# Profiler
+#
+
+class Profiler(object):
+    """Profiler class.
+
+    Profiles a fight scenario on a virtual clock for CPU time per function,
+    memory allocations per subsystem and peak memory.
+
+    Allocations are attributed to the innermost frame of the traceback,
+    which is located in one of the subsystems Arena, Guardian, Combatant or
+    MessageQueue. Allocations are measured at the end of the scenario,
+    before the arena is cleared.
+
+    Args:
+        scenario (str, optional): Name of the scenario, 'roster', 'wave' or
+            'arenas'. By default 'roster'.
+        size (int, optional): Number of monsters or arenas of the scenario
+        duration (float, optional): Virtual duration of the scenario in seconds
+
+    Attributes:
+        fights (int, readonly): Number of played fights
+        time (float, readonly): CPU time of the scenario in seconds
+        stats (pstats.Stats, readonly): Statistics of the CPU profiler
+        allocations (Dict[str, Tuple[int, int]], readonly): Allocated bytes
+            and blocks by subsystem
+        peak (int, readonly): Peak of the traced memory in bytes
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __scenario: str
+    __size: int
+    __duration: float
+    __fights: int = 0
+    __time: float = 0.
+    __stats: Optional[pstats.Stats] = None
+    __allocations: Dict[str, Tuple[int, int]]
+    __peak: int = 0
+
+    @property
+    def fights(self) -> int:
+        return self.__fights
+
+    @property
+    def time(self) -> float:
+        return self.__time
+
+    @property
+    def stats(self) -> Optional[pstats.Stats]:
+        return self.__stats
+
+    @property
+    def allocations(self) -> Dict[str, Tuple[int, int]]:
+        return dict(self.__allocations)
+
+    @property
+    def peak(self) -> int:
+        return self.__peak
+
+    def __init__(self, scenario: str = 'roster', size: int = 10,
+            duration: float = 60.) -> None:
+
+        # Check argument types
+        if not isinstance(scenario, str):
+            raise TypeError("Argument 'scenario' requires type 'str'")
+        if not isinstance(size, int):
+            raise TypeError("Argument 'size' requires type 'int'")
+        if not isinstance(duration, float):
+            raise TypeError("Argument 'duration' requires type 'float'")
+
+        # Check argument values
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Argument 'scenario' requires to be one of {list(SCENARIOS)}")
+        if size <= 0:
+            raise ValueError("Argument 'size' requires to be positive")
+        if duration <= 0:
+            raise ValueError("Argument 'duration' requires to be positive")
+
+        self.__scenario = scenario
+        self.__size = size
+        self.__duration = duration
+        self.__allocations = {}
+
+    def __play(self) -> int:
+        scheduler = rx.scheduler.HistoricalScheduler()
+        return SCENARIOS[self.__scenario](scheduler, self.__size, self.__duration)
+
+    def run(self) -> None:
+        """Play the scenario with the CPU profiler and the memory tracing."""
+        stdout = conslayer.MessageQueue()
+        silent = stdout.silent
+        stdout.silent = True
+        try:
+
+            # Profile CPU time
+            profile = cProfile.Profile()
+            start = time.process_time()
+            profile.enable()
+            try:
+                self.__fights = self.__play()
+            finally:
+                profile.disable()
+                self.__time = time.process_time() - start
+                _teardown()
+            self.__stats = pstats.Stats(profile)
+
+            # Trace memory allocations
+            tracemalloc.start(FRAMES)
+            try:
+                self.__play()
+                snapshot = tracemalloc.take_snapshot()
+                self.__peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                _teardown()
+            self.__allocations = self.__attribute(snapshot)
+        finally:
+            stdout.silent = silent
+
+    def __attribute(self, snapshot: tracemalloc.Snapshot) -> Dict[str, Tuple[int, int]]:
+
+        # Get source lines of the classes of the subsystems
+        ranges: List[Tuple[str, str, int, int]] = []
+        for subsystem, names in SUBSYSTEMS.items():
+            for name in names:
+                cls = getattr(conslayer, name)
+                lines, first = inspect.getsourcelines(cls)
+                ranges.append((inspect.getsourcefile(cls), subsystem, first, first + len(lines)))
+
+        # Attribute allocations to the innermost frame of a subsystem
+        allocations = {subsystem: [0, 0] for subsystem in list(SUBSYSTEMS) + ['Other']}
+        for stat in snapshot.statistics('traceback'):
+            found = 'Other'
+            for frame in reversed(stat.traceback):
+                found = next((
+                    subsystem for path, subsystem, first, last in ranges
+                    if frame.filename == path and first <= frame.lineno < last), None)
+                if found is not None:
+                    break
+            allocation = allocations[found or 'Other']
+            allocation[0] += stat.size
+            allocation[1] += stat.count
+        return {subsystem: (size, count) for subsystem, (size, count) in allocations.items()}
+
+    def report(self, limit: int = 25) -> str:
+        """Get report of the profile.
+
+        Args:
+            limit (int, optional): Number of functions with the largest
+                cumulative CPU time, which are reported
+
+        Returns:
+            Report as text
+
+        """
+        lines = [
+            f"Scenario: {self.__scenario} (size {self.__size}, "
+            f"{self.__duration:g} virtual seconds)",
+            f"Fights: {self.__fights}",
+            f"CPU time: {self.__time:.3f} s",
+            f"Peak memory: {self.__peak / 1024:.1f} KiB",
+            "",
+            "Allocations by subsystem:"]
+        for subsystem, (size, count) in self.__allocations.items():
+            lines.append(f"  {subsystem:<14} {size / 1024:>10.1f} KiB {count:>8} blocks")
+        if self.__stats is not None:
+            stream = io.StringIO()
+            self.__stats.stream = stream
+            self.__stats.sort_stats('cumulative').print_stats(limit)
+            lines += ["", "CPU time by function:", stream.getvalue().strip("\n")]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write statistics of the CPU profiler to a pstats file.
+
+        Args:
+            path (str): Path of the pstats file
+
+        Raises:
+            ValueError: The profiler has not been run
+
+        """
+        if self.__stats is None:
+            raise ValueError("The profiler has not been run")
+        self.__stats.dump_stats(path)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entrypoint for 'conslayer profile'.
+
+    Args:
+        argv (List[str], optional): Command line arguments after 'profile'
+
+    Returns:
+        Exit status of the process
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="conslayer profile", description="Profile a fight scenario on a virtual clock")
+    parser.add_argument('scenario', nargs='?', default='roster', choices=list(SCENARIOS),
+        help="scenario to profile")
+    parser.add_argument('--size', type=int, default=10,
+        help="number of monsters or arenas")
+    parser.add_argument('--duration', type=float, default=60.,
+        help="virtual duration in seconds")
+    parser.add_argument('--output', default='conslayer-profile',
+        help="prefix of the report (.txt) and the pstats file (.pstats)")
+    args = parser.parse_args(argv)
+    if args.size <= 0 or args.duration <= 0:
+        parser.error("size and duration require to be positive")
+
+    profiler = Profiler(args.scenario, args.size, args.duration)
+    try:
+        profiler.run()
+    except ValueError as err:
+        print(f"conslayer profile: error: {err}", file=sys.stderr)
+        return 1
+    report = profiler.report()
+    with open(f"{args.output}.txt", "w", encoding="utf-8") as file:
+        file.write(report)
+    profiler.dump(f"{args.output}.pstats")
+    print(report.split("\nCPU time by function:")[0].rstrip())
+    print()
+    print(f"Report written to {args.output}.txt")
+    print(f"Statistics written to {args.output}.pstats")
+    return 0
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Health recording management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import reactivex as rx
+import conslayer
+
+# Module Constants
+MAGIC = b'CSHR'
+VERSION = 1
+CHUNK = 64
+
+# Bytes of a sample: timestamp (float64) and health (int32)
+SAMPLE = 12
+
+# Header: magic, format version, number of series
+HEADER = struct.Struct('<4sHI')
+
+# Series: length of the name, number of samples. The series header is
+# followed by the name (utf-8), the timestamps (float64) and the health
+# values (int32) in little endian byte order.
+SERIES = struct.Struct('<HI')
+
+#
+# Series
+#
+
+class _Series(object):
+
+    __slots__ = ('name', 'times', 'health', 'count', 'last')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.times = array('d', bytes(8 * CHUNK))
+        self.health = array('i', bytes(4 * CHUNK))
+        self.count = 0
+        self.last = float('-inf')
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    def grow(self) -> None:
+        self.times.extend(array('d', bytes(8 * CHUNK)))
+        self.health.extend(array('i', bytes(4 * CHUNK)))
+
+    def decimate(self) -> None:
+
+        # Keep every second sample and the last sample, which may be a death
+        count = self.count
+        keep = list(range(0, count, 2))
+        if count and keep[-1] != count - 1:
+            keep.append(count - 1)
+        times = array('d', (self.times[index] for index in keep))
+        health = array('i', (self.health[index] for index in keep))
+
+        # Shrink preallocated samples to the next multiple of the chunk size
+        capacity = max(CHUNK, -(-len(keep) // CHUNK) * CHUNK)
+        times.extend(array('d', bytes(8 * (capacity - len(keep)))))
+        health.extend(array('i', bytes(4 * (capacity - len(keep)))))
+        self.times, self.health, self.count = times, health, len(keep)
+
+#
+# HealthRecorder
+#
+
+class HealthRecorder(object):
+    """HealthRecorder class.
+
+    Records the health of all combatants in arena over time into typed arrays
+    using the following design patterns:
+        (1) Observer pattern for observation of arena events
+        (2) Memento pattern for the export of recorded fights
+
+    Every started fight starts a new recording, which initially contains the
+    health of all combatants in arena. Afterwards, samples are recorded for
+    every hit and are downsampled to at most one sample per combatant and
+    interval. Samples of deaths are always recorded. The samples of each
+    combatant are stored in preallocated chunks of typed arrays. If a new
+    chunk would exceed the memory budget, all series are decimated to every
+    second sample and the interval is doubled. Samples, which cannot be
+    recorded within the budget, are counted as dropped.
+
+    Timestamps are seconds since the start of the fight on the clock of the
+    arena scheduler, such that fights on a virtual clock are recorded in
+    virtual time.
+
+    Args:
+        budget (int, optional): Memory budget of the samples of a fight in
+            bytes. By default 1 MiB.
+        interval (float, optional): Minimum seconds between two samples of a
+            combatant. By default every hit is recorded.
+
+    Attributes:
+        recording (bool, readonly): Flag indicating that the recorder is
+            started
+        interval (float, readonly): Current minimum seconds between samples,
+            which is doubled by decimation
+        size (int, readonly): Allocated bytes of the samples
+        dropped (int, readonly): Number of samples, which have been dropped
+        series (List[Tuple[str, array, array]], readonly): Names, timestamps
+            and health values of the combatants of the current fight
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __budget: int
+    __initial: float
+    __interval: float
+    __series: List[_Series]
+    __current: Dict[str, _Series]
+    __size: int = 0
+    __dropped: int = 0
+    __origin: Any = None
+    __scheduler: Optional[rx.abc.SchedulerBase] = None
+    __listeners: List[rx.abc.DisposableBase]
+
+    @property
+    def recording(self) -> bool:
+        return bool(self.__listeners)
+
+    @property
+    def interval(self) -> float:
+        return self.__interval
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    @property
+    def series(self) -> List[Tuple[str, array, array]]:
+        return [
+            (series.name, series.times[:series.count], series.health[:series.count])
+            for series in self.__series]
+
+    def __init__(self, budget: int = 1 << 20, interval: float = 0.) -> None:
+
+        # Check argument types
+        if not isinstance(budget, int):
+            raise TypeError("Argument 'budget' requires type 'int'")
+        if not isinstance(interval, float):
+            raise TypeError("Argument 'interval' requires type 'float'")
+
+        # Check argument values
+        if budget < CHUNK * SAMPLE:
+            raise ValueError(f"Argument 'budget' requires at least {CHUNK * SAMPLE} bytes")
+        if interval < 0:
+            raise ValueError("Argument 'interval' requires to be positive")
+
+        self.__budget = budget
+        self.__initial = interval
+        self.__interval = interval
+        self.__series = []
+        self.__current = {}
+        self.__listeners = []
+
+    def __len__(self) -> int:
+        return len(self.__series)
+
+    def start(self) -> None:
+        """Start recording the fights in arena.
+
+        If a fight is already started, the recording starts immediately.
+
+        """
+        if self.recording:
+            return
+        arena = conslayer.Arena()
+        self.__listeners = [
+            arena.on('fight_state', self.__fight_state),
+            arena.on('spawn', self.__spawn),
+            arena.on('hit', self.__hit)]
+        if arena.started:
+            self.__fight_state(True)
+
+    def stop(self) -> None:
+        """Stop recording. The recorded fight is kept until it is cleared."""
+        for listener in self.__listeners:
+            listener.dispose()
+        self.__listeners = []
+        self.__origin = None
+
+    def clear(self) -> None:
+        """Remove all recorded samples and reset the interval."""
+        self.__series = []
+        self.__current = {}
+        self.__size = 0
+        self.__dropped = 0
+        self.__interval = self.__initial
+
+    def __fight_state(self, started: bool) -> None:
+        if not started:
+            self.__origin = None
+            return
+
+        # Start new recording with the health of all combatants
+        self.clear()
+        arena = conslayer.Arena()
+        self.__scheduler = arena.scheduler
+        self.__origin = self.__scheduler.now
+        for combatant in arena:
+            self.__spawn(combatant)
+
+    def __spawn(self, combatant: 'conslayer.Combatant') -> None:
+        if self.__origin is None:
+            return
+
+        # Start new series, since names of removed combatants may be reused
+        series = self.__allocate(combatant.name)
+        if series is None:
+            self.__dropped += 1
+            return
+        self.__current[combatant.name] = series
+        self.__append(series, combatant.health, True)
+
+    def __hit(self, hit: dict) -> None:
+        if self.__origin is None:
+            return
+        series = self.__current.get(hit['target'])
+        if series is None:
+            series = self.__allocate(hit['target'])
+            if series is None:
+                self.__dropped += 1
+                return
+            self.__current[hit['target']] = series
+        health = hit['health']
+        self.__append(series, health, health <= 0)
+
+    def __allocate(self, name: str) -> Optional[_Series]:
+        if not self.__reserve():
+            return None
+        series = _Series(name)
+        self.__series.append(series)
+        return series
+
+    def __reserve(self) -> bool:
+
+        # Decimate all series until a new chunk fits into the budget
+        chunk = CHUNK * SAMPLE
+        while self.__size + chunk > self.__budget:
+            size = self.__size
+            self.__decimate()
+            if self.__size >= size:
+                return False
+        self.__size += chunk
+        return True
+
+    def __decimate(self) -> None:
+        for series in self.__series:
+            series.decimate()
+        self.__size = sum(series.capacity for series in self.__series) * SAMPLE
+        self.__interval = self.__interval * 2 if self.__interval > 0 else 1e-3
+
+    def __append(self, series: _Series, health: int, force: bool) -> None:
+        now = (self.__scheduler.now - self.__origin).total_seconds()
+
+        # Downsample
+        if not force and now - series.last < self.__interval:
+            return
+
+        # Allocate next chunk, unless decimation freed samples of the series
+        if series.count == series.capacity:
+            if not self.__reserve():
+                if series.count == series.capacity:
+                    self.__dropped += 1
+                    return
+            elif series.count == series.capacity:
+                series.grow()
+            else:
+                self.__size -= CHUNK * SAMPLE
+        series.times[series.count] = now
+        series.health[series.count] = health
+        series.count += 1
+        series.last = now
+
+    def save(self, path: str) -> None:
+        """Save recorded series to a binary file.
+
+        Args:
+            path (str): Path of the file
+
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(self.__series)))
+            for name, times, health in self.series:
+                encoded = name.encode('utf-8')
+                file.write(SERIES.pack(len(encoded), len(times)))
+                file.write(encoded)
+                if sys.byteorder == 'big':
+                    times.byteswap()
+                    health.byteswap()
+                file.write(times.tobytes())
+                file.write(health.tobytes())
+
+    @staticmethod
+    def load(path: str) -> List[Tuple[str, array, array]]:
+        """Load recorded series from a binary file.
+
+        Args:
+            path (str): Path of the file
+
+        Returns:
+            Names, timestamps and health values of the recorded combatants
+
+        Raises:
+            ValueError: If the file is not a valid recording
+
+        """
+        with open(path, 'rb') as file:
+            buffer = file.read()
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"File '{path}' is not a valid recording")
+        magic, version, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"File '{path}' is not a valid recording")
+        offset = HEADER.size
+        series = []
+        try:
+            for _ in range(count):
+                length, samples = SERIES.unpack_from(buffer, offset)
+                offset += SERIES.size
+                name = buffer[offset:offset + length].decode('utf-8')
+                offset += length
+                times = array('d', buffer[offset:offset + 8 * samples])
+                offset += 8 * samples
+                health = array('i', buffer[offset:offset + 4 * samples])
+                offset += 4 * samples
+                if len(health) != samples:
+                    raise ValueError(f"File '{path}' is truncated")
+                if sys.byteorder == 'big':
+                    times.byteswap()
+                    health.byteswap()
+                series.append((name, times, health))
+        except struct.error:
+            raise ValueError(f"File '{path}' is truncated")
+        return series
+
+    def to_numpy(self) -> List[Tuple[str, Any, Any]]:
+        """Get recorded series as NumPy arrays.
+
+        Returns:
+            Names, timestamps (float64) and health values (int32) of the
+            recorded combatants
+
+        Raises:
+            ImportError: NumPy is not installed
+
+        """
+        import numpy as np
+        return [
+            (name, np.array(times, dtype=np.float64), np.array(health, dtype=np.int32))
+            for name, times, health in self.series]
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Scheduler management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import reactivex as rx
+from conslayer.console import MessageQueue
+
+# Module Constants
+CATCHUP = 'catchup'
+SKIP = 'skip'
+
+# Lock for the number of live timers
+_lock = threading.Lock()
+
+#
+# PeriodicTimer
+#
+
+class PeriodicTimer(rx.abc.DisposableBase):
+    """PeriodicTimer class.
+
+    Drift-free periodic timer, which schedules the n-th execution of an action
+    at the absolute deadline 'origin + n * interval' instead of re-arming the
+    timer relative to the preceding execution, using the following design
+    patterns:
+        (1) Disposable pattern for cancellation of pending executions
+        (2) Strategy pattern for handling of missed deadlines
+
+    If the process stalls and deadlines are missed, the 'catchup' policy
+    executes the action once for every missed deadline, whereas the 'skip'
+    policy executes the action once and skips the remaining missed deadlines.
+    If the action raises an exception, the error is reported to the message
+    queue and the next execution is scheduled nevertheless.
+
+    Args:
+        scheduler (Scheduler): Scheduler to execute the action on
+        interval (float): Interval between executions in seconds
+        action (Callable): Action to execute
+        delay (float, optional): Seconds until the first execution. By default
+            the first execution is scheduled after one interval.
+        policy (str, optional): Policy for missed deadlines, 'catchup' or
+            'skip'. By default 'catchup'.
+
+    Attributes:
+        count (int, readonly): Number of executions
+        skipped (int, readonly): Number of skipped deadlines
+        errors (int, readonly): Number of executions, which raised an error
+        disposed (bool, readonly): Flag indicating that the timer is disposed
+        remaining (float, readonly): Seconds until the next deadline
+        stats (dict, readonly): Lag and jitter statistics in seconds
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __scheduler: rx.abc.SchedulerBase
+    __interval: timedelta
+    __action: Callable[[], Any]
+    __policy: str
+    __origin: datetime
+    __index: int = 1
+    __count: int = 0
+    __skipped: int = 0
+    __errors: int = 0
+    __lag_mean: float = 0.
+    __lag_m2: float = 0.
+    __lag_max: float = 0.
+    __pending: Optional[rx.abc.DisposableBase] = None
+    __disposed: bool = False
+    __live: int = 0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def skipped(self) -> int:
+        return self.__skipped
+
+    @property
+    def errors(self) -> int:
+        return self.__errors
+
+    @property
+    def disposed(self) -> bool:
+        return self.__disposed
+
+    @property
+    def remaining(self) -> float:
+        deadline = self.__origin + self.__index * self.__interval
+        return (deadline - self.__scheduler.now).total_seconds()
+
+    @property
+    def stats(self) -> dict:
+        jitter = math.sqrt(self.__lag_m2 / self.__count) if self.__count else 0.
+        return {
+            'count': self.__count,
+            'skipped': self.__skipped,
+            'lag': self.__lag_mean,
+            'lag_max': self.__lag_max,
+            'jitter': jitter
+        }
+
+    def __init__(self, scheduler: rx.abc.SchedulerBase, interval: float,
+            action: Callable[[], Any], delay: Optional[float] = None,
+            policy: str = CATCHUP) -> None:
+
+        # Check argument types
+        if not isinstance(interval, float):
+            raise TypeError("Argument 'interval' requires type 'float'")
+        if not callable(action):
+            raise TypeError("Argument 'action' requires to be callable")
+
+        # Check argument values
+        if interval <= 0:
+            raise ValueError("Argument 'interval' requires to be positive")
+        if delay is not None and delay < 0:
+            raise ValueError("Argument 'delay' requires to be positive or None")
+        if policy not in (CATCHUP, SKIP):
+            raise ValueError(f"Argument 'policy' requires to be '{CATCHUP}' or '{SKIP}'")
+
+        # Initialize attributes
+        self.__scheduler = scheduler
+        self.__interval = timedelta(seconds=interval)
+        self.__action = action
+        self.__policy = policy
+        if delay is None:
+            delay = interval
+        self.__origin = scheduler.now + timedelta(seconds=delay) - self.__interval
+
+        # Count live timers
+        with _lock:
+            PeriodicTimer.__live += 1
+
+        # Schedule first execution
+        self.__arm()
+
+    @classmethod
+    def live(cls) -> int:
+        """Get number of timers, which are not disposed."""
+        return PeriodicTimer.__live
+
+    def __arm(self) -> None:
+        if self.__disposed:
+            return
+        deadline = self.__origin + self.__index * self.__interval
+        self.__pending = self.__scheduler.schedule_absolute(deadline, self.__fire)
+
+    def __fire(self, scheduler: rx.abc.SchedulerBase, state: Any = None) -> None:
+        if self.__disposed:
+            return
+
+        # Determine lag of execution
+        interval = self.__interval.total_seconds()
+        deadline = self.__origin + self.__index * self.__interval
+        lag = (scheduler.now - deadline).total_seconds()
+
+        # Skip missed deadlines
+        if self.__policy == SKIP and lag >= interval:
+            missed = int(lag // interval)
+            self.__index += missed
+            self.__skipped += missed
+            lag -= missed * interval
+
+        # Update lag statistics
+        self.__count += 1
+        delta = lag - self.__lag_mean
+        self.__lag_mean += delta / self.__count
+        self.__lag_m2 += delta * (lag - self.__lag_mean)
+        self.__lag_max = max(self.__lag_max, lag)
+
+        # Execute action and schedule next execution, even if the action
+        # failed, since errors would otherwise terminate the scheduler thread
+        self.__index += 1
+        try:
+            self.__action()
+        except Exception as err:
+            self.__errors += 1
+            name = getattr(self.__action, '__name__', repr(self.__action))
+            MessageQueue().queue(f"Timer action '{name}' failed: {err!r}")
+        finally:
+            self.__arm()
+
+    def dispose(self) -> None:
+        """Cancel pending executions."""
+        with _lock:
+            if not self.__disposed:
+                PeriodicTimer.__live -= 1
+            self.__disposed = True
+        if self.__pending is not None:
+            self.__pending.dispose()
+            self.__pending = None
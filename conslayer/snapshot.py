@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Snapshot management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import math
+import mmap
+import struct
+from typing import Iterator, Tuple, Union
+
+import conslayer
+
+# Module Constants
+MAGIC = b'CSLY'
+VERSION = 2
+FLAG_STARTED = 0x1
+
+# Header: magic, format version, flags, number of records
+HEADER = struct.Struct('<4sHHI')
+
+# Record: name, species, health, seconds until next attack (NaN if not scheduled)
+RECORD = struct.Struct('<32s16sid')
+NAME = 32
+SPECIES = 16
+
+#
+# Snapshot
+#
+
+class Snapshot(object):
+    """Snapshot class.
+
+    Stores the complete state of an arena in a compact binary layout of a
+    fixed size header, followed by fixed size records per combatant, using
+    the following design patterns:
+        (1) Memento pattern for saving and restoring arena states
+        (2) Iterable pattern for iterating over combatant records
+
+    Snapshots, that are loaded from files are memory-mapped and records are
+    unpacked directly from the mapped buffer.
+
+    Args:
+        buffer (bytes-like): Binary snapshot data
+
+    Attributes:
+        started (bool, readonly): Flag indicating that the fight was started
+
+    Raises:
+        ValueError: If the buffer does not contain a valid snapshot
+
+    """
+
+    __buffer: Union[bytes, mmap.mmap]
+    __started: bool
+    __count: int
+
+    @property
+    def started(self) -> bool:
+        return self.__started
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+
+        # Check header
+        if len(buffer) < HEADER.size:
+            raise ValueError("Snapshot is truncated")
+        magic, version, flags, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Snapshot has an invalid format")
+        if version != VERSION:
+            raise ValueError(f"Snapshot version {version} is not supported")
+        if len(buffer) != HEADER.size + count * RECORD.size:
+            raise ValueError("Snapshot is truncated")
+
+        # Initialize attributes
+        self.__buffer = buffer
+        self.__started = bool(flags & FLAG_STARTED)
+        self.__count = count
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.__buffer)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __iter__(self) -> Iterator[Tuple[str, str, int, float]]:
+        view = memoryview(self.__buffer)[HEADER.size:]
+        try:
+            for name, species, health, phase in RECORD.iter_unpack(view):
+                name = name.rstrip(b'\0').decode('utf-8')
+                species = species.rstrip(b'\0').decode('utf-8')
+                yield name, species, health, phase
+        finally:
+            view.release()
+
+    @classmethod
+    def capture(cls, arena: 'conslayer.Arena') -> 'Snapshot':
+        """Capture the current state of an arena.
+
+        Args:
+            arena (Arena): Arena to capture
+
+        Returns:
+            Snapshot of the arena
+
+        Raises:
+            ValueError: If the utf-8 encoded name of a combatant is longer
+                than 32 bytes or the name of its species is longer than 16
+                bytes
+
+        """
+
+        # Take the combatants at once, since the arena may change
+        # concurrently, e.g. by spawns of an endless wave
+        combatants = list(arena)
+
+        # Allocate buffer
+        buffer = bytearray(HEADER.size + len(combatants) * RECORD.size)
+        flags = FLAG_STARTED if arena.started else 0
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, flags, len(combatants))
+
+        # Pack combatant records
+        offset = HEADER.size
+        for combatant in combatants:
+            phase = arena.next_attack(combatant.name)
+            if phase is None:
+                phase = math.nan
+            name = combatant.name.encode('utf-8')
+            species = combatant.species.name.encode('utf-8')
+            if len(name) > NAME:
+                raise ValueError(
+                    f"Name of combatant '{combatant.name}' exceeds {NAME} bytes")
+            if len(species) > SPECIES:
+                raise ValueError(
+                    f"Name of species '{combatant.species.name}' exceeds {SPECIES} bytes")
+            RECORD.pack_into(buffer, offset, name, species, combatant.health, phase)
+            offset += RECORD.size
+
+        return cls(bytes(buffer))
+
+    @classmethod
+    def load(cls, path: str) -> 'Snapshot':
+        """Load memory-mapped snapshot from file.
+
+        Args:
+            path (str): Path of the snapshot file
+
+        Returns:
+            Snapshot, that is backed by the memory-mapped file
+
+        """
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer)
+        except ValueError:
+            buffer.close()
+            raise
+
+    def save(self, path: str) -> None:
+        """Save snapshot to file.
+
+        Args:
+            path (str): Path of the snapshot file
+
+        """
+        with open(path, 'wb') as file:
+            file.write(self.__buffer)
+
+    def close(self) -> None:
+        """Release memory-mapped file."""
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+
+    def restore(self, arena: 'conslayer.Arena') -> None:
+        """Restore the state of an arena.
+
+        Args:
+            arena (Arena): Arena to restore
+
+        Raises:
+            ValueError: If the snapshot contains species, which are unknown.
+                The arena is not changed in this case.
+
+        """
+
+        # Check species before the arena is changed
+        combatants = conslayer.CombatantDict()
+        unknown = sorted({species for _, species, _, _ in self if species not in combatants})
+        if unknown:
+            raise ValueError(f"Snapshot contains unknown species {unknown}")
+
+        # Reset arena
+        if arena.started:
+            arena.stop_fight()
+        arena.clear()
+
+        # Restore combatants
+        phase = {}
+        for name, species, health, next_attack in self:
+            combatant = combatants[species].spawn(name)
+            combatant.__setstate__({'health': health})
+            arena.enter(combatant)
+            if not math.isnan(next_attack):
+                phase[name] = next_attack
+
+        # Continue fight
+        if self.__started:
+            arena.start_fight(phase=phase)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Subject management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple, Union
+
+import reactivex as rx
+from conslayer.metrics import Metrics
+
+# Lock for changes of subscriber lists, which are rare compared to emissions
+_lock = threading.Lock()
+
+# Metrics of emissions
+_metrics = Metrics()
+
+#
+# Subscription
+#
+
+class Subscription(rx.abc.DisposableBase):
+    """Subscription class.
+
+    Binds a callback to a subject until the subscription is disposed.
+
+    Args:
+        subject (Subject): Subscribed subject
+        callback (Callable): Subscribed callback
+
+    """
+
+    __slots__ = ('__subject', '__callback')
+
+    def __init__(self, subject: 'Subject', callback: Callable[[Any], None]) -> None:
+        self.__subject = subject
+        self.__callback = callback
+
+    def dispose(self) -> None:
+        """Unsubscribe callback from subject."""
+        subject = self.__subject
+        if subject is None:
+            return
+        self.__subject = None
+        subject._unsubscribe(self.__callback)
+
+#
+# Subject
+#
+
+class Subject(object):
+    """Subject class.
+
+    Lightweight subject, which propagates changes of a current value to
+    subscribed callbacks using the following design patterns:
+        (1) Behaviour Subject pattern for concurrent observability
+        (2) Observer pattern with direct callback dispatch
+
+    In contrast to reactivex subjects, emissions directly iterate over an
+    immutable tuple of callbacks without locking or wrapping of observers.
+    The current value is not stored by the subject, but provided by the
+    'value' property of subclasses. For the composition of reactivex
+    pipelines, subjects can be adapted to reactivex observables.
+
+    Attributes:
+        value (Any, readonly): Current value
+        observed (bool, readonly): Flag indicating that the subject has subscribers
+        observers (int, readonly): Number of subscribers
+
+    """
+
+    __slots__ = ('__callbacks',)
+    __live: int = 0
+
+    @property
+    def value(self) -> Any:
+        return None
+
+    @property
+    def observed(self) -> bool:
+        return bool(self.__callbacks)
+
+    @property
+    def observers(self) -> int:
+        return len(self.__callbacks)
+
+    def __init__(self) -> None:
+        self.__callbacks: Tuple[Callable[[Any], None], ...] = ()
+
+    def subscribe(self,
+            on_next: Union[Callable[[Any], None], rx.abc.ObserverBase, None] = None,
+            on_error: Optional[Callable[[Exception], None]] = None,
+            on_completed: Optional[Callable[[], None]] = None, *,
+            scheduler: Optional[rx.abc.SchedulerBase] = None) -> Subscription:
+        """Subscribe to value changes.
+
+        The subscriber immediately receives the current value. The signature
+        is compatible with reactivex observables. Since subjects neither fail
+        nor complete, the callbacks 'on_error' and 'on_completed' are never
+        called, and values are always delivered on the thread, which changed
+        the value.
+
+        Args:
+            on_next (Callable or Observer): Callback or observer, which
+                receives the values
+            on_error (Callable, optional): Ignored
+            on_completed (Callable, optional): Ignored
+            scheduler (Scheduler, optional): Ignored
+
+        Returns:
+            Subscription, which unsubscribes when disposed
+
+        Raises:
+            TypeError: Neither a callback nor an observer is given
+
+        """
+
+        # Get callback
+        callback = on_next
+        if hasattr(callback, 'on_next'):
+            callback = callback.on_next
+        if not callable(callback):
+            raise TypeError("Argument 'on_next' requires to be callable or an observer")
+
+        # Add callback
+        with _lock:
+            self.__callbacks = self.__callbacks + (callback,)
+            Subject.__live += 1
+
+        # Deliver current value. The callback is added before, such that no
+        # changes are missed, and removed again, if the delivery fails.
+        try:
+            callback(self.value)
+        except BaseException:
+            self._unsubscribe(callback)
+            raise
+
+        return Subscription(self, callback)
+
+    def _unsubscribe(self, callback: Callable[[Any], None]) -> None:
+        with _lock:
+            callbacks = list(self.__callbacks)
+            callbacks.remove(callback)
+            self.__callbacks = tuple(callbacks)
+            Subject.__live -= 1
+
+    @classmethod
+    def live(cls) -> int:
+        """Get number of subscriptions, which are not disposed."""
+        return Subject.__live
+
+    def on_next(self, value: Any) -> None:
+        """Propagate value to subscribers.
+
+        Args:
+            value (Any): New value
+
+        """
+        if not _metrics.enabled:
+            for callback in self.__callbacks:
+                callback(value)
+            return
+        start = time.perf_counter()
+        for callback in self.__callbacks:
+            callback(value)
+        _metrics.dispatch_latency.observe(time.perf_counter() - start)
+        _metrics.emissions.inc()
+
+    def as_observable(self) -> rx.Observable:
+        """Get reactivex observable of values.
+
+        Returns:
+            Observable, which emits the current value on subscription and all
+            subsequent values
+
+        """
+        def subscribe(observer: rx.abc.ObserverBase,
+                scheduler: Optional[rx.abc.SchedulerBase] = None) -> Subscription:
+            return self.subscribe(observer.on_next)
+        return rx.create(subscribe)
+
+    def pipe(self, *operators: Callable[[rx.Observable], Any]) -> Any:
+        """Compose reactivex operators with the observable of values.
+
+        Args:
+            *operators: Reactivex operators
+
+        Returns:
+            Composed observable
+
+        """
+        return self.as_observable().pipe(*operators)
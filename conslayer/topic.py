@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Topic management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+import reactivex as rx
+
+#
+# TopicRegistry
+#
+
+class TopicRegistry(object):
+    """TopicRegistry class.
+
+    Stores subscriptions to individual topics using the following design
+    patterns:
+        (1) Publish-subscribe pattern for topic based observability
+        (2) Registry pattern for indexing subscribers by topic
+
+    Subscribers are indexed by topic, such that publishing an event only
+    costs time in the number of subscribers of the respective topic.
+    Subscriber lists are immutable and replaced on changes, such that
+    publishing does not require locking or copying.
+
+    """
+
+    __topics: Dict[str, Tuple[Callable[[Any], None], ...]]
+    __lock: threading.Lock
+    __live: int = 0
+
+    def __init__(self) -> None:
+        self.__topics = {}
+        self.__lock = threading.Lock()
+
+    def __contains__(self, topic: str) -> bool:
+        return topic in self.__topics
+
+    def __len__(self) -> int:
+        return sum(len(callbacks) for callbacks in list(self.__topics.values()))
+
+    def count(self, topic: str) -> int:
+        """Get number of subscriptions of a topic.
+
+        Args:
+            topic (str): Topic of the subscriptions
+
+        Returns:
+            Number of callbacks, which are subscribed to the topic
+
+        """
+        return len(self.__topics.get(topic, ()))
+
+    @classmethod
+    def live(cls) -> int:
+        """Get number of topic subscriptions of all registries."""
+        return TopicRegistry.__live
+
+    def subscribe(self, topic: str, callback: Callable[[Any], None]) -> rx.abc.DisposableBase:
+        """Subscribe to topic.
+
+        Args:
+            topic (str): Topic to subscribe to
+            callback (Callable): Callback, which receives the published events
+
+        Returns:
+            Disposable to unsubscribe from topic
+
+        Raises:
+            TypeError: Argument 'topic' requires type 'str'
+            TypeError: Argument 'callback' requires to be callable
+
+        """
+
+        # Check argument types
+        if not isinstance(topic, str):
+            raise TypeError("Argument 'topic' requires type 'str'")
+        if not callable(callback):
+            raise TypeError("Argument 'callback' requires to be callable")
+
+        with self.__lock:
+            self.__topics[topic] = self.__topics.get(topic, ()) + (callback,)
+            TopicRegistry.__live += 1
+
+        def unsubscribe() -> None:
+            with self.__lock:
+                callbacks = list(self.__topics.get(topic, ()))
+                callbacks.remove(callback)
+                if callbacks:
+                    self.__topics[topic] = tuple(callbacks)
+                else:
+                    del self.__topics[topic]
+                TopicRegistry.__live -= 1
+
+        # Disposables only invoke the action on first disposal
+        return rx.disposable.Disposable(unsubscribe)
+
+    def publish(self, topic: str, event: Any) -> None:
+        """Publish event to the subscribers of a topic.
+
+        Args:
+            topic (str): Topic of the event
+            event (Any): Event to publish
+
+        """
+        for callback in self.__topics.get(topic, ()):
+            callback(event)
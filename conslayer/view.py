@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""State view management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import operator
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+# Getters of the state keys of combatants
+_getters: Dict[str, Callable[[Any], Any]] = {
+    key: operator.attrgetter(key)
+    for key in ('id', 'kind', 'name', 'health', 'damage', 'interval')}
+
+#
+# CombatantView
+#
+
+class CombatantView(Mapping):
+    """CombatantView class.
+
+    Read-only mapping of the state of a combatant, which reads the current
+    properties directly from the combatant, using the following design
+    patterns:
+        (1) Proxy pattern for allocation free state access
+
+    The view remains valid when the combatant changes. Observers, which keep
+    states for later comparison, are required to copy them.
+
+    Args:
+        combatant (Combatant): Viewed combatant
+
+    """
+
+    __slots__ = ('__combatant',)
+
+    def __init__(self, combatant: 'conslayer.Combatant') -> None:
+        self.__combatant = combatant
+
+    def __getitem__(self, key: str) -> Any:
+        getter = _getters.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self.__combatant)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_getters)
+
+    def __len__(self) -> int:
+        return len(_getters)
+
+    def __repr__(self) -> str:
+        return f"CombatantView({self.copy()!r})"
+
+    def copy(self) -> dict:
+        """Get a detached copy of the current state.
+
+        Returns:
+            Dictionary with the current state of the combatant
+
+        """
+        return self.__combatant.__getstate__()
+
+#
+# ArenaView
+#
+
+class ArenaView(Sequence):
+    """ArenaView class.
+
+    Read-only sequence of the states of all combatants in an arena, which
+    reads the current combatants directly from the arena, using the
+    following design patterns:
+        (1) Proxy pattern for allocation free state access
+
+    The view remains valid when the arena changes. Observers, which keep
+    states for later comparison, are required to copy them.
+
+    Args:
+        rows (Callable): Callable, which returns the current views of all
+            combatants in arena as an immutable tuple
+
+    """
+
+    __slots__ = ('__rows',)
+
+    def __init__(self, rows: Callable[[], Tuple[CombatantView, ...]]) -> None:
+        self.__rows = rows
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return self.__rows()[index]
+
+    def __iter__(self) -> Iterator[CombatantView]:
+        return iter(self.__rows())
+
+    def __len__(self) -> int:
+        return len(self.__rows())
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"ArenaView({self.copy()!r})"
+
+    def copy(self) -> List[dict]:
+        """Get a detached copy of the current states.
+
+        Returns:
+            List of dictionaries with the current states of the combatants
+
+        """
+        return [row.copy() for row in self.__rows()]
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Wave management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+from typing import Dict, List, Optional, Set
+
+import reactivex as rx
+import conslayer
+
+#
+# CombatantPool
+#
+
+class CombatantPool(object):
+    """CombatantPool class.
+
+    Recycles combatants, which have been removed from the arena, using the
+    following design patterns:
+        (1) Object pool pattern for recycling of combatants
+        (2) Flyweight pattern for pooling by shared species
+
+    Combatants, which are still subscribed by observers, are not recycled,
+    since the observers would otherwise follow the recycled combatant.
+
+    Args:
+        limit (int, optional): Maximum number of pooled combatants per species
+
+    Attributes:
+        created (int, readonly): Number of newly spawned combatants
+        recycled (int, readonly): Number of recycled combatants
+
+    """
+
+    __pool: Dict['conslayer.Species', List['conslayer.Combatant']]
+    __limit: int
+    __created: int = 0
+    __recycled: int = 0
+
+    @property
+    def created(self) -> int:
+        return self.__created
+
+    @property
+    def recycled(self) -> int:
+        return self.__recycled
+
+    def __init__(self, limit: int = 1024) -> None:
+
+        # Check argument values
+        if not isinstance(limit, int):
+            raise TypeError("Argument 'limit' requires type 'int'")
+        if limit < 0:
+            raise ValueError("Argument 'limit' requires to be positive")
+
+        self.__pool = {}
+        self.__limit = limit
+
+    def __len__(self) -> int:
+        return sum(len(pool) for pool in list(self.__pool.values()))
+
+    def acquire(self, species: 'conslayer.Species', name: str) -> 'conslayer.Combatant':
+        """Acquire combatant of a species.
+
+        Args:
+            species (Species): Species of the combatant
+            name (str): Name of the combatant
+
+        Returns:
+            Recycled or newly spawned combatant with initial health
+
+        """
+        pool = self.__pool.get(species)
+        if pool:
+            combatant = pool.pop()
+            combatant.reset(name)
+            self.__recycled += 1
+            return combatant
+        self.__created += 1
+        return species.spawn(name)
+
+    def release(self, combatant: 'conslayer.Combatant') -> bool:
+        """Release combatant for recycling.
+
+        Args:
+            combatant (Combatant): Combatant, which has been removed from arena
+
+        Returns:
+            True, if the combatant has been pooled
+
+        """
+        if combatant.observed:
+            return False
+        pool = self.__pool.setdefault(combatant.species, [])
+        if len(pool) >= self.__limit:
+            return False
+        pool.append(combatant)
+        return True
+
+#
+# Wave
+#
+
+class Wave(object):
+    """Wave class.
+
+    Endless wave mode, which continuously spawns monsters into the arena
+    using the following design patterns:
+        (1) Object pool pattern for recycling of dead monsters
+        (2) Observer pattern for observation of removed monsters
+
+    While the wave is running, the fight continues if all monsters are dead.
+    The wave stops, when the fight is stopped or the arena is shut down.
+
+    Args:
+        rate (float, optional): Spawned monsters per second
+        limit (int, optional): Maximum number of living monsters of the wave
+        species (List[str], optional): Names of the spawned species, which are
+            spawned in turns. By default all monster species.
+        pool (CombatantPool, optional): Pool for recycling of monsters
+
+    Attributes:
+        running (bool, readonly): Flag indicating that the wave is running
+        spawned (int, readonly): Number of spawned monsters
+        alive (int, readonly): Number of living monsters of the wave
+        pool (CombatantPool, readonly): Pool for recycling of monsters
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __rate: float
+    __limit: int
+    __species: Optional[List[str]]
+    __pool: 'CombatantPool'
+    __alive: Set[str]
+    __spawned: int = 0
+    __timer: Optional['conslayer.PeriodicTimer'] = None
+    __listeners: List[rx.abc.DisposableBase]
+
+    @property
+    def running(self) -> bool:
+        return self.__timer is not None
+
+    @property
+    def spawned(self) -> int:
+        return self.__spawned
+
+    @property
+    def alive(self) -> int:
+        return len(self.__alive)
+
+    @property
+    def pool(self) -> 'CombatantPool':
+        return self.__pool
+
+    def __init__(self, rate: float = 1., limit: int = 100,
+            species: Optional[List[str]] = None,
+            pool: Optional['CombatantPool'] = None) -> None:
+
+        # Check argument types
+        if not isinstance(rate, (int, float)):
+            raise TypeError("Argument 'rate' requires type 'float'")
+        if not isinstance(limit, int):
+            raise TypeError("Argument 'limit' requires type 'int'")
+
+        # Check argument values
+        if rate <= 0:
+            raise ValueError("Argument 'rate' requires to be positive")
+        if limit <= 0:
+            raise ValueError("Argument 'limit' requires to be positive")
+        if species is not None and len(species) == 0:
+            raise ValueError("Argument 'species' requires at least one species")
+
+        # Initialize attributes
+        self.__rate = float(rate)
+        self.__limit = limit
+        self.__species = species
+        self.__pool = pool or CombatantPool()
+        self.__alive = set()
+        self.__listeners = []
+
+    def start(self) -> None:
+        """Start spawning monsters."""
+        if self.running:
+            return
+
+        # Bind arena
+        arena = conslayer.Arena()
+        arena.endless = True
+
+        # Observe removed monsters, stopped fights and the shutdown
+        self.__listeners = [
+            arena.on('remove', self.__release),
+            arena.on('fight_state', self.__fight_state),
+            arena.on('shutdown', self.__shutdown)]
+
+        # Schedule spawns
+        self.__timer = conslayer.PeriodicTimer(
+            arena.scheduler, 1. / self.__rate, self.__spawn, policy='skip')
+
+    def stop(self) -> None:
+        """Stop spawning monsters."""
+        if not self.running:
+            return
+        self.__timer.dispose()
+        self.__timer = None
+        for listener in self.__listeners:
+            listener.dispose()
+        self.__listeners = []
+        self.__alive.clear()
+        conslayer.Arena().endless = False
+
+    def __spawn(self) -> None:
+
+        # Check limit of living monsters
+        if len(self.__alive) >= self.__limit:
+            return
+
+        # Get species in turns
+        combatants = conslayer.CombatantDict()
+        names = self.__species
+        if names is None:
+            names = [
+                name for name, species in combatants.items()
+                if species.kind is conslayer.Monster]
+        if not names:
+            return
+        species = combatants.get(names[self.__spawned % len(names)])
+        if species is None:
+            return
+
+        # Spawn monster
+        self.__spawned += 1
+        name = f"{species.name}-{self.__spawned}"
+        self.__alive.add(name)
+        conslayer.Arena().enter(self.__pool.acquire(species, name))
+
+    def __fight_state(self, started: bool) -> None:
+        if not started:
+            self.stop()
+
+    def __shutdown(self, deadline: float) -> None:
+        self.stop()
+
+    def __release(self, combatant: 'conslayer.Combatant') -> None:
+        if combatant.name not in self.__alive:
+            return
+        self.__alive.discard(combatant.name)
+        if combatant.health <= 0:
+            self.__pool.release(combatant)
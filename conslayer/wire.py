@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Wire protocol management.
+
+Binary format of arena states for remote observers. Frames are either
+keyframes, which contain the complete state of the arena, or deltas, which
+only contain the changes since the previous frame. All integers are encoded
+as unsigned LEB128 varints and signed integers are zigzag encoded before.
+
+    Frame:    type (uint8), sequence (varint)
+    Keyframe: version (uint8), count (varint), count records
+    Delta:    removed (varint), removed ids (varint), changed (varint),
+              changed records
+    Record:   id (varint), field mask (uint8), masked fields in the order
+              kind (uint8), name (varint length, utf-8), health (zigzag
+              varint), damage (varint), interval (varint milliseconds + 1,
+              0 if not scheduled)
+
+The low bits of the frame type distinguish keyframes and deltas, the high
+bit is set, if the fight is started. Records of keyframes and of combatants,
+which entered the arena, contain all fields.
+
+"""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+from typing import Dict, List, Optional, Tuple
+
+import conslayer
+
+# Module Constants
+VERSION = 1
+KEYFRAME = 0x1
+DELTA = 0x2
+FLAG_STARTED = 0x80
+CAPACITY = 256
+
+# Field mask
+KIND = 0x1
+NAME = 0x2
+HEALTH = 0x4
+DAMAGE = 0x8
+INTERVAL = 0x10
+ALL = KIND | NAME | HEALTH | DAMAGE | INTERVAL
+
+# Codes of the kinds of combatants
+KINDS = ('hero', 'monster')
+
+# Encoded fields of a combatant: kind, name, health, damage, interval
+_Fields = Tuple[int, str, int, int, int]
+
+#
+# Varints
+#
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+def _read(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        try:
+            byte = buffer[offset]
+        except IndexError:
+            raise ValueError("Frame is truncated") from None
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+#
+# WireEncoder
+#
+
+class WireEncoder(object):
+    """WireEncoder class.
+
+    Encodes the states of the combatants in an arena into keyframes and
+    deltas of the wire protocol, using the following design patterns:
+        (1) Memento pattern for the comparison with the previous frame
+        (2) Double buffer pattern for allocation free encoding
+
+    Frames are encoded once per tick and the same bytes can be sent to all
+    spectators. Every 'keyframe' frames, a keyframe is encoded, such that
+    spectators, which join or miss frames, resynchronize within a bounded
+    number of frames. Frames are written into two alternating buffers, which
+    are reused and only grow, if a frame exceeds their capacity. A returned
+    frame therefore remains valid until the next but one call of encode and
+    is required to be copied, if it is kept longer.
+
+    Args:
+        keyframe (int, optional): Number of frames between two keyframes. By
+            default every 30th frame is a keyframe.
+
+    Attributes:
+        sequence (int, readonly): Sequence number of the next frame
+        keyframe (int, readonly): Number of frames between two keyframes
+
+    Raises:
+        TypeError: If any of the arguments has the wrong type
+        ValueError: If any of the arguments has an invalid value
+
+    """
+
+    __keyframe: int
+    __sequence: int = 0
+    __state: Dict[int, _Fields]
+    __buffers: List[bytearray]
+    __buffer: bytearray
+    __index: int = 0
+    __offset: int = 0
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def keyframe(self) -> int:
+        return self.__keyframe
+
+    def __init__(self, keyframe: int = 30) -> None:
+
+        # Check argument types
+        if not isinstance(keyframe, int):
+            raise TypeError("Argument 'keyframe' requires type 'int'")
+
+        # Check argument values
+        if keyframe <= 0:
+            raise ValueError("Argument 'keyframe' requires to be positive")
+
+        self.__keyframe = keyframe
+        self.__state = {}
+        self.__buffers = [bytearray(CAPACITY), bytearray(CAPACITY)]
+        self.__buffer = self.__buffers[0]
+
+    def reset(self) -> None:
+        """Encode a keyframe with the next frame."""
+        self.__sequence = 0
+        self.__state = {}
+
+    def encode(self, arena: 'conslayer.Arena',
+            keyframe: bool = False) -> memoryview:
+        """Encode the current state of an arena.
+
+        Args:
+            arena (Arena): Arena to encode
+            keyframe (bool, optional): Encode a keyframe, regardless of the
+                number of frames since the last keyframe
+
+        Returns:
+            Encoded frame, which is valid until the next but one call
+
+        """
+
+        # Swap buffers
+        self.__index ^= 1
+        self.__buffer = self.__buffers[self.__index]
+        self.__offset = 0
+
+        # Encode fields of all combatants
+        state: Dict[int, _Fields] = {}
+        for combatant in arena:
+            interval = combatant.interval
+            state[combatant.id] = (
+                0 if issubclass(combatant.kind, conslayer.Hero) else 1,
+                combatant.name,
+                combatant.health,
+                combatant.damage,
+                0 if interval is None else round(interval * 1000) + 1)
+        flags = FLAG_STARTED if arena.started else 0
+        previous = self.__state
+        if keyframe or self.__sequence % self.__keyframe == 0:
+            self.__byte(KEYFRAME | flags)
+            self.__varint(self.__sequence)
+            self.__byte(VERSION)
+            self.__varint(len(state))
+            for id, fields in state.items():
+                self.__record(id, ALL, fields)
+        else:
+            self.__byte(DELTA | flags)
+            self.__varint(self.__sequence)
+            removed = [id for id in previous if id not in state]
+            self.__varint(len(removed))
+            for id in removed:
+                self.__varint(id)
+            changed = []
+            for id, fields in state.items():
+                old = previous.get(id)
+                if old is None:
+                    changed.append((id, ALL, fields))
+                    continue
+                mask = 0
+                for bit, new, value in zip((KIND, NAME, HEALTH, DAMAGE, INTERVAL), fields, old):
+                    if new != value:
+                        mask |= bit
+                if mask:
+                    changed.append((id, mask, fields))
+            self.__varint(len(changed))
+            for id, mask, fields in changed:
+                self.__record(id, mask, fields)
+
+        self.__state = state
+        self.__sequence += 1
+        return memoryview(self.__buffer)[:self.__offset]
+
+    def __reserve(self, size: int) -> None:
+        buffer = self.__buffer
+        if self.__offset + size <= len(buffer):
+            return
+
+        # Grow buffer. If a previous frame is still referenced, the buffer
+        # cannot be resized and is replaced.
+        extension = max(size, len(buffer))
+        try:
+            buffer.extend(bytes(extension))
+        except BufferError:
+            buffer = bytearray(len(buffer) + extension)
+            buffer[:self.__offset] = self.__buffer[:self.__offset]
+            self.__buffers[self.__index] = self.__buffer = buffer
+
+    def __byte(self, value: int) -> None:
+        self.__reserve(1)
+        self.__buffer[self.__offset] = value
+        self.__offset += 1
+
+    def __varint(self, value: int) -> None:
+        self.__reserve(10)
+        buffer, offset = self.__buffer, self.__offset
+        while value >= 0x80:
+            buffer[offset] = value & 0x7f | 0x80
+            value >>= 7
+            offset += 1
+        buffer[offset] = value
+        self.__offset = offset + 1
+
+    def __record(self, id: int, mask: int, fields: _Fields) -> None:
+        kind, name, health, damage, interval = fields
+        self.__varint(id)
+        self.__byte(mask)
+        if mask & KIND:
+            self.__byte(kind)
+        if mask & NAME:
+            encoded = name.encode('utf-8')
+            self.__varint(len(encoded))
+            self.__reserve(len(encoded))
+            self.__buffer[self.__offset:self.__offset + len(encoded)] = encoded
+            self.__offset += len(encoded)
+        if mask & HEALTH:
+            self.__varint(_zigzag(health))
+        if mask & DAMAGE:
+            self.__varint(damage)
+        if mask & INTERVAL:
+            self.__varint(interval)
+
+#
+# WireDecoder
+#
+
+class WireDecoder(object):
+    """WireDecoder class.
+
+    Decodes keyframes and deltas of the wire protocol into the states of the
+    combatants of a remote arena.
+
+    The decoder is synchronized by the first keyframe. Deltas, which are
+    received before the first keyframe or after a missed frame, are skipped
+    until the next keyframe.
+
+    Attributes:
+        synced (bool, readonly): Flag indicating that the state is
+            synchronized with the encoder
+        sequence (int, readonly): Sequence number of the last decoded frame
+        started (bool, readonly): Flag indicating that the fight is started
+        state (List[dict], readonly): States of all combatants with the keys
+            'id', 'kind', 'name', 'health', 'damage' and 'interval'. The kind
+            is either 'hero' or 'monster' and the interval is in seconds or
+            None.
+
+    """
+
+    __state: Dict[int, dict]
+    __sequence: Optional[int] = None
+    __started: bool = False
+
+    @property
+    def synced(self) -> bool:
+        return self.__sequence is not None
+
+    @property
+    def sequence(self) -> Optional[int]:
+        return self.__sequence
+
+    @property
+    def started(self) -> bool:
+        return self.__started
+
+    @property
+    def state(self) -> List[dict]:
+        return [dict(row) for row in self.__state.values()]
+
+    def __init__(self) -> None:
+        self.__state = {}
+
+    def decode(self, frame: bytes) -> bool:
+        """Apply a frame to the state.
+
+        Args:
+            frame (bytes-like): Encoded frame
+
+        Returns:
+            True, if the frame has been applied, and False, if it has been
+            skipped, since the decoder is not synchronized
+
+        Raises:
+            ValueError: If the frame is invalid or truncated
+
+        """
+        buffer = memoryview(frame)
+        if not len(buffer):
+            raise ValueError("Frame is truncated")
+        kind = buffer[0] & ~FLAG_STARTED
+        sequence, offset = _read(buffer, 1)
+
+        if kind == KEYFRAME:
+            if offset >= len(buffer):
+                raise ValueError("Frame is truncated")
+            if buffer[offset] != VERSION:
+                raise ValueError(f"Frame version {buffer[offset]} is not supported")
+            count, offset = _read(buffer, offset + 1)
+            state: Dict[int, dict] = {}
+            for _ in range(count):
+                offset = self.__record(buffer, offset, state)
+        elif kind == DELTA:
+            if self.__sequence is None or sequence != self.__sequence + 1:
+                self.__sequence = None
+                return False
+            state = dict(self.__state)
+            count, offset = _read(buffer, offset)
+            for _ in range(count):
+                id, offset = _read(buffer, offset)
+                state.pop(id, None)
+            count, offset = _read(buffer, offset)
+            for _ in range(count):
+                offset = self.__record(buffer, offset, state)
+        else:
+            raise ValueError(f"Frame type {kind} is not supported")
+        if offset != len(buffer):
+            raise ValueError("Frame has trailing bytes")
+
+        self.__state = state
+        self.__sequence = sequence
+        self.__started = bool(buffer[0] & FLAG_STARTED)
+        return True
+
+    def __record(self, buffer: memoryview, offset: int, state: Dict[int, dict]) -> int:
+        id, offset = _read(buffer, offset)
+        if offset >= len(buffer):
+            raise ValueError("Frame is truncated")
+        mask = buffer[offset]
+        offset += 1
+        if mask & ~ALL:
+            raise ValueError(f"Frame has an invalid field mask {mask}")
+        row = state.get(id)
+        if row is None:
+            if mask != ALL:
+                raise ValueError(f"Frame changes unknown combatant {id}")
+            row = {'id': id}
+        else:
+            row = dict(row)
+        if mask & KIND:
+            if offset >= len(buffer) or buffer[offset] >= len(KINDS):
+                raise ValueError("Frame has an invalid kind")
+            row['kind'] = KINDS[buffer[offset]]
+            offset += 1
+        if mask & NAME:
+            length, offset = _read(buffer, offset)
+            if offset + length > len(buffer):
+                raise ValueError("Frame is truncated")
+            row['name'] = bytes(buffer[offset:offset + length]).decode('utf-8')
+            offset += length
+        if mask & HEALTH:
+            health, offset = _read(buffer, offset)
+            row['health'] = _unzigzag(health)
+        if mask & DAMAGE:
+            row['damage'], offset = _read(buffer, offset)
+        if mask & INTERVAL:
+            interval, offset = _read(buffer, offset)
+            row['interval'] = None if interval == 0 else (interval - 1) / 1000
+        state[id] = row
+        return offset
@@ -12,7 +12,14 @@ __author__ = 'Patrick Michl'
 __email__ = 'patrick.michl@gmail.com'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
 import unittest
+import reactivex as rx
 import conslayer
 
 class ArenaTest(unittest.TestCase):
@@ -44,6 +51,26 @@ class ArenaTest(unittest.TestCase):
         self.assertTrue(arena.state[0]["damage"] > 0)
         self.assertEqual(arena.state[0]["interval"], None)
 
+    def test_state_view(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        state = arena.state
+        self.assertIs(arena.state, state)
+        arena.add("hero")
+        arena.add("orc")
+        self.assertEqual([row["name"] for row in state], ["hero", "orc"])
+        self.assertIs(state[1], arena.state[1])
+        copy = state.copy()
+        arena.start_fight()
+        arena["hero"].attack("orc")
+        arena.stop_fight()
+        self.assertEqual(state[1]["health"], arena["orc"].health)
+        self.assertEqual(copy[1]["health"], arena["orc"].health + arena["hero"].damage)
+        arena.remove("orc")
+        self.assertEqual(len(state), 1)
+        self.assertEqual(state, [arena["hero"].__getstate__()])
+
     def test_heroes(self):
         conslayer.MessageQueue().silent = True
         conslayer.Arena().clear()
@@ -155,6 +182,113 @@ class ArenaTest(unittest.TestCase):
         arena.remove("orc")
         self.assertEqual(len(arena.monsters), 0)
 
+    def test_remove_many(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.add("dragon")
+        arena.start_fight()
+        emissions = []
+        subscription = arena.subscribe(emissions.append)
+        arena.remove_many(["orc", "Dragon", "unknown"])
+        subscription.dispose()
+        arena.stop_fight()
+        self.assertEqual(len(emissions), 2)
+        self.assertEqual([row["name"] for row in emissions[-1]], ["hero"])
+        self.assertIsNone(arena.next_attack("orc"))
+        self.assertIsNone(arena.next_attack("dragon"))
+
+    def test_ids(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        hero = arena["hero"]
+        orc = arena["orc"]
+        self.assertIsInstance(orc.id, int)
+        self.assertNotEqual(hero.id, orc.id)
+        self.assertIs(arena[orc.id], orc)
+        self.assertIn(orc.id, arena)
+        self.assertEqual(arena.lookup("Orc"), orc.id)
+        self.assertIsNone(arena.lookup("dragon"))
+        self.assertEqual(arena.state[1]["id"], orc.id)
+        arena.remove_many([orc.id])
+        self.assertIsNone(orc.id)
+        self.assertNotIn("orc", arena)
+        arena.add("orc")
+        self.assertNotEqual(arena["orc"].id, hero.id)
+
+    def test_select(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.enter(conslayer.CombatantDict()["orc"].spawn("orc-2"))
+        arena.add("dragon")
+        self.assertEqual([c.name for c in arena.select("orc*")], ["orc", "orc-2"])
+        self.assertEqual([c.name for c in arena.select("D?AGON")], ["dragon"])
+        self.assertEqual(arena.select("troll*"), [])
+
+    def test_attack_all(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.add("dragon")
+        arena.start_fight()
+        health = {c.name: c.health for c in arena}
+        emissions = []
+        subscription = arena.subscribe(emissions.append)
+        arena["hero"].attack("all")
+        subscription.dispose()
+        arena.stop_fight()
+        damage = arena["hero"].damage
+        self.assertEqual(len(emissions), 2)
+        self.assertEqual(arena["hero"].health, health["hero"])
+        self.assertEqual(arena["orc"].health, health["orc"] - damage)
+        self.assertEqual(arena["dragon"].health, health["dragon"] - damage)
+
+    def test_attack_pattern(self):
+        stdout = conslayer.MessageQueue()
+        stdout.silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        species = conslayer.Species(conslayer.Monster, "orc", 2, 1, 1.5)
+        arena.add("hero")
+        arena.add("dragon")
+        arena.enter(species.spawn("orc-1"))
+        arena.enter(species.spawn("orc-2"))
+        arena.start_fight()
+        stdout.flush()
+        deaths = []
+        listener = arena.on('death', deaths.append)
+        arena["hero"].attack("orc*")
+        listener.dispose()
+        arena.stop_fight()
+        self.assertEqual(sorted(c.name for c in deaths), ["orc-1", "orc-2"])
+        self.assertEqual(arena["dragon"].health, 20)
+        self.assertIn("Hero killed Orc-1, Orc-2.", str(stdout))
+        stdout.flush()
+
+    def test_area_attack(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.scheduler = rx.scheduler.HistoricalScheduler()
+        species = conslayer.Species(conslayer.Monster, "troll", 30, 2, 1.0, area=True)
+        arena.add("hero")
+        arena.enter(species.spawn())
+        arena.start_fight()
+        arena.scheduler.advance_by(1.)
+        arena.stop_fight()
+        arena.scheduler = None
+        self.assertEqual(arena["hero"].health, 38)
+
     def test_start_fight(self):
         conslayer.MessageQueue().silent = True
         conslayer.Arena().clear()
@@ -196,6 +330,206 @@ class ArenaTest(unittest.TestCase):
         cur_health = arena["orc"].health
         self.assertEqual(prev_health - cur_health, hero.damage)
 
+    def test_policy(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        with self.assertRaises(ValueError):
+            arena.policy = "none"
+        arena.policy = "skip"
+        self.assertEqual(arena.policy, "skip")
+        arena.policy = "catchup"
+
+    def test_timing(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.start_fight()
+        timing = arena.timing
+        arena.stop_fight()
+        self.assertEqual(list(timing), ["orc"])
+        self.assertEqual(timing["orc"]["count"], 0)
+        self.assertEqual(arena.timing, {})
+
+    def test_stream_rate(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("dragon")
+        arena.start_fight()
+        scheduler = rx.scheduler.HistoricalScheduler()
+        states = []
+        subscription = arena.stream(rate=10., scheduler=scheduler).subscribe(states.append)
+        for _ in range(5):
+            arena["hero"].attack("dragon")
+        scheduler.advance_by(.1)
+        for _ in range(3):
+            arena["hero"].attack("dragon")
+        scheduler.advance_by(.3)
+        subscription.dispose()
+        arena.stop_fight()
+        self.assertEqual(len(states), 2)
+        self.assertEqual(states[-1][1]["health"], arena["dragon"].health)
+
+    def test_stream_debounce(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("dragon")
+        arena.start_fight()
+        scheduler = rx.scheduler.HistoricalScheduler()
+        states = []
+        subscription = arena.stream(debounce=.5, scheduler=scheduler).subscribe(states.append)
+        for _ in range(5):
+            arena["hero"].attack("dragon")
+            scheduler.advance_by(.1)
+        self.assertEqual(len(states), 0)
+        scheduler.advance_by(.5)
+        subscription.dispose()
+        arena.stop_fight()
+        self.assertEqual(len(states), 1)
+
+    def test_stream_sampler(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        sampler = rx.subject.Subject()
+        states = []
+        subscription = arena.stream(sampler=sampler).subscribe(states.append)
+        arena.add("orc")
+        arena.add("dragon")
+        self.assertEqual(len(states), 0)
+        sampler.on_next(None)
+        sampler.on_next(None)
+        subscription.dispose()
+        self.assertEqual(len(states), 1)
+        with self.assertRaises(ValueError):
+            arena.stream(rate=1., debounce=1.)
+
+    def test_resources(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.add("hero")
+        arena.add("orc")
+        base = arena.resources['subscriptions']
+        subscription = arena["orc"].subscribe(lambda _: None)
+        listener = arena.on('hit:orc', lambda _: None)
+        self.assertEqual(arena.resources['subscriptions'], base + 2)
+        self.assertEqual(arena.resources['combatants'], 2)
+        self.assertEqual(arena.resources['timers'], 0)
+        arena.start_fight()
+        self.assertEqual(arena.resources['timers'], 1)
+        self.assertGreaterEqual(arena.resources['threads'], 1)
+        arena.stop_fight()
+        self.assertEqual(arena.resources['timers'], 0)
+        subscription.dispose()
+        listener.dispose()
+        self.assertEqual(arena.resources['subscriptions'], base)
+        arena.clear()
+
+    def test_shutdown(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.add("hero")
+        arena.add("orc")
+        arena.start_fight()
+        self.assertGreaterEqual(arena.resources['threads'], 1)
+        self.assertEqual(arena.shutdown(), [])
+        self.assertFalse(arena.started)
+        self.assertEqual(arena.resources['timers'], 0)
+        self.assertEqual(arena.resources['threads'], 0)
+        self.assertIn("orc", arena)
+
+        # Threads, which do not stop in time, are reported
+        started = threading.Event()
+        def block(scheduler, state):
+            started.set()
+            time.sleep(.3)
+        arena.scheduler.schedule(block)
+        started.wait(1.)
+        self.assertEqual(arena.shutdown(.01), ["conslayer-arena"])
+        self.assertEqual(arena.shutdown(1.), [])
+        with self.assertRaises(TypeError):
+            arena.shutdown(1)
+        with self.assertRaises(ValueError):
+            arena.shutdown(-1.)
+        arena.clear()
+
+    def test_shutdown_workers(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.add("hero")
+        wave = conslayer.Wave(rate=1.)
+        wave.start()
+        dashboard = conslayer.Dashboard(stream=io.StringIO())
+        dashboard.start()
+        history = conslayer.FightHistory()
+        history.start()
+        watch = conslayer.CombatantDict().watch()
+        server = conslayer.MetricsServer(port=0)
+        server.start()
+        with tempfile.TemporaryDirectory() as tmp:
+            dump = conslayer.MetricsDump(os.path.join(tmp, "metrics.prom"))
+            dump.start()
+            self.assertGreaterEqual(arena.resources['threads'], 4)
+            topics = arena.resources['subscriptions']
+            self.assertEqual(arena.shutdown(), [])
+        self.assertFalse(wave.running)
+        self.assertFalse(dashboard.running)
+        self.assertTrue(watch.disposed)
+        self.assertFalse(server.started)
+        with self.assertRaises(ValueError):
+            history.start()
+        self.assertLess(arena.resources['subscriptions'], topics)
+        self.assertEqual(arena.resources['threads'], 0)
+
+        # Worker threads, which do not stop in time, are reported
+        release = threading.Event()
+        worker = arena.thread(release.wait, "conslayer-worker")
+        worker.start()
+        self.assertEqual(arena.shutdown(.01), ["conslayer-worker"])
+        release.set()
+        self.assertEqual(arena.shutdown(1.), [])
+        arena.clear()
+        conslayer.MessageQueue().flush()
+
+    def test_debug(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.scheduler = rx.scheduler.HistoricalScheduler()
+        arena.debug = True
+        try:
+            arena.add("hero")
+            arena.add("orc")
+            arena.add("dragon")
+            arena.start_fight()
+            arena.stop_fight()
+            arena.remove("dragon")
+            self.assertEqual(arena.leaks, [])
+            subscription = arena["orc"].subscribe(lambda _: None)
+            listener = arena.on('hit:orc', lambda _: None)
+            arena.remove("orc")
+            self.assertEqual(len(arena.leaks), 2)
+            self.assertIn("Combatant 'orc' removed with 1 subscriptions.", arena.leaks)
+            subscription.dispose()
+            listener.dispose()
+            arena.debug = False
+            arena.debug = True
+            self.assertEqual(arena.leaks, [])
+        finally:
+            arena.debug = False
+            arena.clear()
+            arena.scheduler = None
+
 
 class GuardianTest(unittest.TestCase):
     def test_new(self):
@@ -222,6 +556,23 @@ class GuardianTest(unittest.TestCase):
         guardian.watch(arena)
         self.assertNotEqual(guardian.arena, None)
 
+    def test_unwatch(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        guardian = conslayer.Guardian()
+        guardian.watch(arena)
+        guardian.unwatch()
+        self.assertIsNone(guardian.arena)
+        arena.start_fight()
+        for _ in range(5):
+            arena["hero"].attack("orc")
+        arena.stop_fight()
+        self.assertEqual(len(arena.monsters), 1)
+        arena.clear()
+
     def test_watch(self):
         conslayer.MessageQueue().silent = True
         conslayer.Arena().clear()
@@ -236,6 +587,64 @@ class GuardianTest(unittest.TestCase):
             arena["hero"].attack("orc")
         self.assertEqual(len(arena.monsters), 0)
 
+    def test_watch_many(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        guardian = conslayer.Guardian()
+        guardian.watch(arena)
+        guardian.watch(arena)
+        arena.add("hero")
+        arena.add("orc")
+        arena.add("dragon")
+        arena.enter(conslayer.CombatantDict()["orc"].spawn("ogre"))
+        arena["orc"].get_weakened(arena["orc"].health)
+        arena["dragon"].get_weakened(arena["dragon"].health)
+        arena.start_fight()
+        emissions = []
+        subscription = arena.subscribe(emissions.append)
+        removed = []
+        listener = arena.on('remove', removed.append)
+        arena.remove("unknown")
+        arena["hero"].attack("ogre")
+        subscription.dispose()
+        listener.dispose()
+        arena.stop_fight()
+        self.assertEqual(sorted(c.name for c in removed), ["dragon", "orc"])
+        self.assertEqual(len(emissions), 3)
+        self.assertEqual([row["name"] for row in emissions[-1]], ["hero", "ogre"])
+
+    def test_print(self):
+        stdout = conslayer.MessageQueue()
+        stdout.silent = True
+        scheduler = rx.scheduler.HistoricalScheduler()
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.scheduler = scheduler
+        guardian = conslayer.Guardian()
+        guardian.watch(arena)
+        try:
+            arena.add("hero")
+            arena.add("orc")
+            arena["hero"].get_weakened(arena["hero"].health - 1)
+            arena.start_fight()
+            stdout.flush()
+            stdout.silent = False
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                scheduler.advance_by(arena["orc"].interval)
+            self.assertEqual(output.getvalue().splitlines(), [
+                "Orc killed Hero.", "Hero is removed from arena.",
+                "Fight stopped!", "Hero is dead. Monsters win!"])
+            self.assertEqual(list(stdout), [])
+        finally:
+            stdout.silent = True
+            guardian.unwatch()
+            arena.stop_fight()
+            arena.clear()
+            arena.scheduler = None
+            stdout.flush()
+
 
 if __name__ == '__main__':
     unittest.main()
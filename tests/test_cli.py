@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for the command line interface."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import conslayer
+from conslayer import cli
+
+# Budget of the cumulative import time of the command line interface in ms
+IMPORT_BUDGET = 20.
+
+def run(code: str, *options: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    root = str(Path(__file__).resolve().parents[1])
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    return subprocess.run(
+        [sys.executable, *options, '-c', code],
+        env=env, capture_output=True, text=True, check=True)
+
+class ParseTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(cli.parse(" Add Orc "), ("add", "orc"))
+        self.assertEqual(cli.parse("attack orc*"), ("attack", "orc*"))
+        self.assertEqual(cli.parse("wave"), ("wave", 1.))
+        self.assertEqual(cli.parse("wave 2.5"), ("wave", 2.5))
+        self.assertEqual(cli.parse("wave stop"), ("wave stop", None))
+        self.assertEqual(cli.parse("start"), ("start", None))
+        self.assertEqual(cli.parse("stats"), ("stats", ""))
+        self.assertEqual(cli.parse("stats on"), ("stats", "on"))
+        self.assertEqual(cli.parse("dashboard"), ("dashboard", True))
+        self.assertEqual(cli.parse("dashboard off"), ("dashboard", False))
+        self.assertEqual(cli.parse("# comment"), ("", None))
+        self.assertEqual(cli.parse(""), ("", None))
+        with self.assertRaises(ValueError):
+            cli.parse("add")
+        with self.assertRaises(ValueError):
+            cli.parse("wave -1")
+        with self.assertRaises(ValueError):
+            cli.parse("stats all")
+        with self.assertRaises(ValueError):
+            cli.parse("dashboard 2")
+        with self.assertRaises(ValueError):
+            cli.parse("jump")
+
+    def test_check(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "fight.txt")
+            with open(path, "w") as file:
+                file.write("add orc\nstart\n\njump\nwave x\n")
+            errors = cli.check(path)
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].endswith(":4: Unknown command. Type 'help' for a list of available commands."))
+        self.assertTrue(errors[1].endswith(":5: Wave requires a positive spawn rate."))
+
+class MainTest(unittest.TestCase):
+    def test_version(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(cli.main(["--version"]), 0)
+        self.assertIn(conslayer.__version__, stdout.getvalue())
+
+    def test_help(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(cli.main(["-h"]), 0)
+        self.assertIn("usage: conslayer", stdout.getvalue())
+
+    def test_usage(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(cli.main(["--unknown"]), 2)
+            self.assertEqual(cli.main(["--check"]), 2)
+            self.assertEqual(cli.main(["--metrics-port", "http"]), 2)
+            self.assertEqual(cli.main(["--metrics-file"]), 2)
+            self.assertEqual(cli.main(["--history"]), 2)
+
+    def test_script(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "fight.txt")
+            with open(path, "w") as file:
+                file.write("add orc\n")
+            self.assertEqual(cli.main(["--check", path]), 0)
+            self.assertEqual(cli.main([path]), 0)
+            database = os.path.join(tempdir, "fights.db")
+            self.assertEqual(cli.main(["--history", database, path]), 0)
+            self.assertTrue(os.path.exists(database))
+        arena = conslayer.Arena()
+        self.assertIn("orc", arena)
+        arena.clear()
+
+class ImportTest(unittest.TestCase):
+    def test_lazy(self):
+        result = run(
+            "import sys, conslayer.cli\n"
+            "conslayer.cli.main(['--version'])\n"
+            "print('reactivex' in sys.modules, 'conslayer.arena' in sys.modules)")
+        self.assertEqual(result.stdout.splitlines()[-1], "False False")
+        self.assertIs(conslayer.Arena, conslayer.arena.Arena)
+        with self.assertRaises(AttributeError):
+            conslayer.Unknown
+
+    def test_budget(self):
+        result = run("import conslayer.cli", "-X", "importtime")
+        total = 0.
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split('|')]
+            if len(fields) == 3 and fields[2] == 'conslayer.cli':
+                total = int(fields[1]) / 1000
+        self.assertGreater(total, 0.)
+        self.assertLess(total, IMPORT_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,7 +12,12 @@ __author__ = 'Patrick Michl'
 __email__ = 'patrick.michl@gmail.com'
 __authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
 
+import json
+import os
+import tempfile
+import time
 import unittest
+import reactivex as rx
 import conslayer
 
 class CombatantTest(unittest.TestCase):
@@ -150,6 +155,52 @@ class CombatantTest(unittest.TestCase):
         arena["dragon"].get_weakened(next_health - 1)
         self.assertEqual(arena["dragon"].health, 1)
 
+    def test_compact(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("orc")
+        self.assertFalse(hasattr(arena["orc"], "__dict__"))
+        self.assertFalse(arena["orc"].observed)
+
+    def test_subscribe(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("orc")
+        states = []
+        subscription = arena["orc"].subscribe(lambda state: states.append(state.copy()))
+        self.assertTrue(arena["orc"].observed)
+        arena["orc"].get_weakened(1)
+        subscription.dispose()
+        arena["orc"].get_weakened(1)
+        self.assertFalse(arena["orc"].observed)
+        self.assertEqual([state["health"] for state in states], [7, 6])
+
+    def test_state_view(self):
+        orc = conslayer.CombatantDict()["orc"].spawn()
+        state = orc.state
+        self.assertEqual(state["health"], 7)
+        orc.get_weakened(2)
+        self.assertEqual(state["health"], 5)
+        self.assertEqual(sorted(state), ["damage", "health", "id", "interval", "kind", "name"])
+        with self.assertRaises(TypeError):
+            state["health"] = 1
+        with self.assertRaises(KeyError):
+            state["mana"]
+        copy = state.copy()
+        orc.get_weakened(2)
+        self.assertEqual(copy["health"], 5)
+        self.assertEqual(state, orc.__getstate__())
+        self.assertIs(orc.state, state)
+        self.assertIs(orc.value, state)
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.enter(orc)
+        self.assertIs(arena.state[0], state)
+        arena.clear()
+
 class MonsterTest(unittest.TestCase):
     def test_init_orc(self):
         conslayer.MessageQueue().silent = True
@@ -185,6 +236,46 @@ class HeroTest(unittest.TestCase):
         self.assertEqual(hero.damage, 5)
         self.assertEqual(hero.interval, None)
 
+class SpeciesTest(unittest.TestCase):
+    def test_init(self):
+        species = conslayer.Species(conslayer.Monster, "orc", 7, 1, 1.5)
+        self.assertEqual(species.kind, conslayer.Monster)
+        self.assertEqual(species.name, "orc")
+        self.assertEqual(species.health, 7)
+        self.assertEqual(species.damage, 1)
+        self.assertEqual(species.interval, 1.5)
+        with self.assertRaises(TypeError):
+            conslayer.Species(str, "orc", 7, 1, 1.5)
+        with self.assertRaises(TypeError):
+            conslayer.Species(conslayer.Monster, "orc", 7., 1, 1.5)
+        with self.assertRaises(ValueError):
+            conslayer.Species(conslayer.Monster, "orc", 7, -1, 1.5)
+        with self.assertRaises(TypeError):
+            conslayer.Species(conslayer.Monster, "orc", True, 1, 1.5)
+        with self.assertRaises(ValueError):
+            conslayer.Species(conslayer.Monster, "orc", 7, 1, 0.)
+
+    def test_area(self):
+        species = conslayer.Species(conslayer.Monster, "troll", 30, 2, 3.0, area=True)
+        self.assertTrue(species.area)
+        self.assertFalse(conslayer.Species(conslayer.Monster, "orc", 7, 1, 1.5).area)
+        with self.assertRaises(TypeError):
+            conslayer.Species(conslayer.Monster, "troll", 30, 2, 3.0, area=1)
+
+    def test_spawn(self):
+        species = conslayer.Species(conslayer.Monster, "orc", 7, 1, 1.5)
+        orc = species.spawn()
+        grunt = species.spawn("grunt")
+        self.assertIsInstance(orc, conslayer.Monster)
+        self.assertIs(orc.species, species)
+        self.assertIs(grunt.species, species)
+        self.assertEqual(orc.name, "orc")
+        self.assertEqual(grunt.name, "grunt")
+        orc.get_weakened(2)
+        self.assertEqual(orc.health, 5)
+        self.assertEqual(grunt.health, 7)
+        self.assertEqual(species.health, 7)
+
 class CombatantDictTest(unittest.TestCase):
     def test_new(self):
         conslayer.MessageQueue().silent = True
@@ -201,6 +292,75 @@ class CombatantDictTest(unittest.TestCase):
         self.assertIn("hero", combatants)
         self.assertIn("orc", combatants)
         self.assertIn("dragon", combatants)
+        self.assertIsInstance(combatants["orc"], conslayer.Species)
+
+class RosterTest(unittest.TestCase):
+    roster = {
+        "hero": {"kind": "hero", "health": 40, "damage": 2},
+        "goblin": {"kind": "monster", "health": 5, "damage": 1, "interval": 1}}
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "roster.json")
+        self.items = dict(conslayer.CombatantDict())
+
+    def tearDown(self):
+        combatants = conslayer.CombatantDict()
+        combatants.clear()
+        combatants.update(self.items)
+        self.tempdir.cleanup()
+
+    def write(self, roster):
+        with open(self.path, "w") as file:
+            json.dump(roster, file)
+
+    def test_load(self):
+        self.write(self.roster)
+        combatants = conslayer.CombatantDict()
+        combatants.load(self.path)
+        self.assertEqual(combatants.path, self.path)
+        self.assertEqual(sorted(combatants), ["goblin", "hero"])
+        self.assertEqual(combatants["goblin"].kind, conslayer.Monster)
+        self.assertEqual(combatants["goblin"].interval, 1.)
+
+    def test_load_invalid(self):
+        combatants = conslayer.CombatantDict()
+        invalid = [
+            [],
+            {"orc": {"kind": "monster", "health": 7, "damage": 1}},
+            {"orc": {"kind": "dwarf", "health": 7, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": ["monster"], "health": 7, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": {"monster": 1}, "health": 7, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": "monster", "health": -7, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": "monster", "health": 7, "damage": 1, "interval": 1., "armor": 2}},
+            {"hero": {"kind": "monster", "health": 7, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": "monster", "health": 7, "damage": 1, "interval": 0}},
+            {"orc": {"kind": "monster", "health": True, "damage": 1, "interval": 1.}},
+            {"orc": {"kind": "monster", "health": 7, "damage": False, "interval": 1.}},
+            {"orc": {"kind": "monster", "health": 7, "damage": 1, "interval": True}},
+            {"Orc": {"kind": "monster", "health": 7, "damage": 1, "interval": 1.},
+             "orc": {"kind": "monster", "health": 9, "damage": 1, "interval": 1.}}]
+        for roster in invalid:
+            self.write(roster)
+            with self.assertRaises(ValueError):
+                combatants.load(self.path)
+        self.assertIn("orc", combatants)
+
+    def test_reload(self):
+        self.write(self.roster)
+        combatants = conslayer.CombatantDict()
+        combatants.load(self.path)
+        self.assertFalse(combatants.reload())
+        goblin = combatants["goblin"].spawn()
+        roster = dict(self.roster, goblin=dict(self.roster["goblin"], health=9))
+        self.write(roster)
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        scheduler = rx.scheduler.HistoricalScheduler()
+        timer = combatants.watch(1., scheduler=scheduler)
+        scheduler.advance_by(1.)
+        timer.dispose()
+        self.assertEqual(combatants["goblin"].health, 9)
+        self.assertEqual(goblin.health, 5)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for command management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import threading
+import unittest
+import conslayer
+
+class CommandQueueTest(unittest.TestCase):
+    def test_submit(self):
+        commands = conslayer.CommandQueue()
+        calls = []
+        commands.submit(calls.append, 1)
+        commands.submit(calls.append, 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(commands.pending, 0)
+
+    def test_reentrant(self):
+        commands = conslayer.CommandQueue()
+        calls = []
+        def outer():
+            commands.submit(calls.append, "inner")
+            calls.append("outer")
+        commands.submit(outer)
+        self.assertEqual(calls, ["outer", "inner"])
+
+    def test_errors(self):
+        commands = conslayer.CommandQueue()
+        calls = []
+        def fail():
+            raise KeyError("orc")
+
+        # Errors of own commands are raised after all commands are executed
+        def outer():
+            commands.submit(fail)
+            commands.submit(calls.append, "after")
+        with self.assertRaises(KeyError):
+            commands.submit(outer)
+        self.assertEqual(calls, ["after"])
+        self.assertEqual(commands.pending, 0)
+
+        # Errors of commands of other threads are reported
+        stdout = conslayer.MessageQueue()
+        stdout.flush()
+        thread = threading.Thread(target=commands.submit, args=(calls.append, "other"))
+        def block():
+            thread.start()
+            thread.join()
+            commands.submit(calls.append, "own")
+        commands.submit(block)
+        self.assertEqual(calls[1:], ["other", "own"])
+        def submit_fail_elsewhere():
+            other = threading.Thread(target=commands.submit, args=(fail,))
+            other.start()
+            other.join()
+        commands.submit(submit_fail_elsewhere)
+        self.assertEqual(list(stdout), ["Command 'fail' failed: KeyError('orc')"])
+        stdout.flush()
+
+    def test_concurrent(self):
+        commands = conslayer.CommandQueue()
+        counter = [0]
+        def increment():
+            value = counter[0]
+            counter[0] = value + 1
+        def worker():
+            for _ in range(1000):
+                commands.submit(increment)
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        commands.drain()
+        self.assertEqual(counter[0], 8000)
+
+
+if __name__ == '__main__':
+    unittest.main()
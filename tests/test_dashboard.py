@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for dashboard management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import io
+import threading
+import unittest
+import reactivex as rx
+import conslayer
+
+class DashboardTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.MessageQueue().flush()
+        self.scheduler = rx.scheduler.HistoricalScheduler()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = self.scheduler
+        arena.add("hero")
+        arena.add("orc")
+        self.scheduler.advance_by(0.)
+        conslayer.MessageQueue().flush()
+        self.stream = io.StringIO()
+        self.dashboard = conslayer.Dashboard(
+            fps=10., stream=self.stream, scheduler=self.scheduler)
+
+    def tearDown(self):
+        self.dashboard.stop()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = None
+        conslayer.MessageQueue().flush()
+
+    def frame(self):
+        self.stream.seek(0)
+        self.stream.truncate()
+        self.scheduler.advance_by(.1)
+        return self.stream.getvalue()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            conslayer.Dashboard(fps=10)
+        with self.assertRaises(TypeError):
+            conslayer.Dashboard(rows=1.)
+        with self.assertRaises(ValueError):
+            conslayer.Dashboard(fps=0.)
+        with self.assertRaises(ValueError):
+            conslayer.Dashboard(rows=0)
+
+    def test_start(self):
+        self.dashboard.start()
+        self.assertTrue(self.dashboard.running)
+        output = self.stream.getvalue()
+        self.assertIn("\x1b[23;", output)
+        self.assertIn("Arena: 2 combatants", output)
+        self.assertIn("Hero", output)
+        self.assertIn("Orc", output)
+        self.assertEqual(self.dashboard.frames, 1)
+
+    def test_dirty_rows(self):
+        self.dashboard.start()
+
+        # Unchanged frames are not drawn
+        self.assertEqual(self.frame(), "")
+        self.assertEqual(self.dashboard.frames, 1)
+
+        # Only the row of the weakened combatant is redrawn
+        arena = conslayer.Arena()
+        arena["orc"].get_weakened(2)
+        output = self.frame()
+        self.assertIn("Orc", output)
+        self.assertNotIn("Hero", output)
+        self.assertNotIn("Arena:", output)
+        self.assertEqual(self.dashboard.frames, 2)
+
+        # Rows of removed combatants are cleared
+        arena.remove("orc")
+        self.scheduler.advance_by(0.)
+        output = self.frame()
+        self.assertIn("Arena: 1 combatants", output)
+        self.assertIn("\x1b[3;1H\x1b[2K", output)
+
+    def test_rows(self):
+        dashboard = conslayer.Dashboard(
+            rows=1, stream=self.stream, scheduler=self.scheduler)
+        dashboard.start()
+        try:
+            self.assertIn("(1 not shown)", self.stream.getvalue())
+        finally:
+            dashboard.stop()
+
+    def test_hits(self):
+        self.dashboard.start()
+        stdout = conslayer.MessageQueue()
+
+        # Hit messages are collapsed into the summary of the next frame
+        for _ in range(3):
+            stdout.queue("Hero hits Orc. Orc health is 5.")
+        stdout.queue("Orc hits Hero. Hero health is 9.")
+        stdout.queue("Hero killed Orc.")
+        self.assertEqual(list(stdout), ["Hero killed Orc."])
+        self.assertIn("Hero 3 hits, Orc 1 hit", self.frame())
+
+        # The summary is cleared in the next frame without hits
+        self.assertIn("\x1b[22;1H\x1b[2K\x1b8", self.frame())
+        self.assertEqual(self.frame(), "")
+
+        # Hits from concurrent attackers are not lost
+        def attack():
+            for _ in range(1000):
+                stdout.queue("Hero hits Orc. Orc health is 5.")
+        threads = [threading.Thread(target=attack) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIn("Hero 4000 hits", self.frame())
+
+    def test_stop(self):
+        stdout = conslayer.MessageQueue()
+        self.dashboard.start()
+        self.dashboard.stop()
+        self.assertFalse(self.dashboard.running)
+        self.assertIsNone(stdout.sink)
+        self.assertTrue(self.stream.getvalue().endswith("\x1b7\x1b[r\x1b8"))
+        frames = self.dashboard.frames
+        conslayer.Arena()["orc"].get_weakened(2)
+        self.scheduler.advance_by(1.)
+        self.assertEqual(self.dashboard.frames, frames)
+        stdout.queue("Hero hits Orc. Orc health is 3.")
+        self.assertEqual(list(stdout), ["Hero hits Orc. Orc health is 3."])
+        stdout.flush()
+
+if __name__ == '__main__':
+    unittest.main()
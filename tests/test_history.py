@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for fight history management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import os
+import tempfile
+import unittest
+import reactivex as rx
+import conslayer
+
+class FightHistoryTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        self.scheduler = rx.scheduler.HistoricalScheduler()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = self.scheduler
+        conslayer.Guardian().watch(arena)
+        self.history = conslayer.FightHistory()
+
+    def tearDown(self):
+        self.history.close()
+        conslayer.Guardian().unwatch()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = None
+
+    def fight(self, *monsters):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        for monster in monsters:
+            arena.add(monster)
+        arena.start_fight()
+        while arena.started and arena.monsters:
+            self.scheduler.advance_by(1.)
+            if arena.started:
+                arena["hero"].attack(arena.monsters[0].name)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            conslayer.FightHistory(1)
+        with self.assertRaises(OSError):
+            conslayer.FightHistory(os.path.join(tempfile.gettempdir(), "missing", "fights.db"))
+
+    def test_record(self):
+        self.history.start()
+        self.assertTrue(self.history.recording)
+        self.fight("orc")
+        self.fight("dragon")
+        arena = conslayer.Arena()
+        arena.clear()
+        fights = self.history.fights()
+        self.assertEqual(self.history.pending, 0)
+        self.assertEqual([fight['winner'] for fight in fights], ['hero', 'hero'])
+        self.assertEqual(fights[1]['combatants'], 2)
+        self.assertEqual(fights[1]['attacks'], 4 + 2)
+        self.assertEqual(fights[1]['duration'], 4.)
+        summary = self.history.summary()
+        self.assertEqual(summary['fights'], 2)
+        self.assertEqual(summary['hero'], 2)
+        self.assertEqual(summary['monsters'], 0)
+
+    def test_monsters_win(self):
+        self.history.start()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("dragon")
+        arena.start_fight()
+        self.scheduler.advance_by(100.)
+        self.assertFalse(arena.started)
+        arena.add("hero")
+        arena.start_fight()
+        arena.stop_fight()
+        self.assertEqual(
+            [fight['winner'] for fight in self.history.fights()], [None, 'monsters'])
+
+    def test_queries(self):
+        self.history.start()
+        self.fight("orc", "dragon")
+        leaderboard = self.history.leaderboard(1)
+        self.assertEqual(len(leaderboard), 1)
+        self.assertEqual(leaderboard[0]['name'], 'hero')
+        self.assertEqual(leaderboard[0]['kills'], 2)
+        balance = {row['species']: row for row in self.history.balance()}
+        self.assertEqual(set(balance), {'hero', 'orc', 'dragon'})
+        self.assertEqual(balance['hero']['win_rate'], 1.)
+        self.assertEqual(balance['orc']['death_rate'], 1.)
+        self.assertEqual(balance['dragon']['win_rate'], 0.)
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "fights.db")
+            history = conslayer.FightHistory(path)
+            history.start()
+            self.fight("orc")
+            self.assertTrue(history.close())
+            history = conslayer.FightHistory(path)
+            self.assertEqual(history.summary()['fights'], 1)
+            self.assertTrue(history.close())
+            with self.assertRaises(ValueError):
+                history.start()
+
+if __name__ == '__main__':
+    unittest.main()
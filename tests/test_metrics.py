@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for metrics management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import reactivex as rx
+import conslayer
+
+class CounterTest(unittest.TestCase):
+    def test_inc(self):
+        counter = conslayer.Counter("hits", "Hits")
+        def count():
+            for _ in range(10000):
+                counter.inc()
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value, 40000)
+        counter.inc(2)
+        self.assertEqual(counter.value, 40002)
+        counter.reset()
+        self.assertEqual(counter.value, 0)
+
+class HistogramTest(unittest.TestCase):
+    def test_observe(self):
+        histogram = conslayer.Histogram("latency", "Latency")
+        for seconds in [0.5e-6, 3e-6, 3e-6, 100e-6]:
+            histogram.observe(seconds)
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 106.5e-6)
+        buckets = histogram.buckets
+        self.assertEqual(buckets[0], (1e-6, 1))
+        self.assertEqual(buckets[2], (4e-6, 3))
+        self.assertEqual(buckets[-1][1], 4)
+        self.assertEqual(buckets[-1][0], float('inf'))
+        self.assertEqual(histogram.quantile(.5), 4e-6)
+        self.assertEqual(histogram.quantile(1.), 128e-6)
+        histogram.reset()
+        self.assertEqual(histogram.count, 0)
+
+    def test_bounds(self):
+        histogram = conslayer.Histogram("duration", "Duration", unit=1.)
+        for seconds in [0., 1., 2., 4., 4.5]:
+            histogram.observe(seconds)
+        buckets = histogram.buckets
+        self.assertEqual(buckets[0], (1., 2))
+        self.assertEqual(buckets[1], (2., 3))
+        self.assertEqual(buckets[2], (4., 4))
+        self.assertEqual(buckets[3], (8., 5))
+        self.assertEqual(histogram.quantile(.5), 2.)
+        histogram.observe(2. ** 30)
+        self.assertEqual(histogram.buckets[-2][1], 5)
+        self.assertEqual(histogram.buckets[-1][1], 6)
+
+    def test_unit(self):
+        histogram = conslayer.Histogram("duration", "Duration", unit=1e-3)
+        histogram.observe(3e-3)
+        self.assertEqual(histogram.unit, 1e-3)
+        self.assertEqual(histogram.quantile(1.), 4e-3)
+        with self.assertRaises(ValueError):
+            conslayer.Histogram("duration", "Duration", unit=0.)
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        self.metrics = conslayer.Metrics()
+        self.metrics.reset()
+
+    def tearDown(self):
+        self.metrics.enabled = False
+        self.metrics.reset()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+
+    def test_new(self):
+        self.assertIs(conslayer.Metrics(), self.metrics)
+        self.assertFalse(self.metrics.enabled)
+
+    def test_disabled(self):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.start_fight()
+        arena["hero"].attack("orc")
+        self.assertEqual(self.metrics.attacks.value, 0)
+        self.assertEqual(self.metrics.emissions.value, 0)
+        self.assertEqual(self.metrics.attack_latency.count, 0)
+
+    def test_enabled(self):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena.add("dragon")
+        conslayer.Guardian().watch(arena)
+        arena.start_fight()
+        self.metrics.enabled = True
+        arena["hero"].attack("all")
+        arena["hero"].attack("orc")
+        self.metrics.enabled = False
+        self.assertEqual(self.metrics.attacks.value, 3)
+        self.assertEqual(self.metrics.attack_latency.count, 2)
+        self.assertGreaterEqual(self.metrics.emissions.value, 2)
+        self.assertEqual(self.metrics.dispatch_latency.count, self.metrics.emissions.value)
+        self.assertGreaterEqual(self.metrics.evaluations.value, 2)
+        conslayer.Guardian().unwatch()
+
+    def test_messages(self):
+        stdout = conslayer.MessageQueue()
+        stdout.flush()
+        self.metrics.enabled = True
+        stdout.queue("a")
+        stdout.queue("b")
+        stdout.flush()
+        self.metrics.enabled = False
+        self.assertEqual(self.metrics.queued.value, 2)
+        self.assertEqual(self.metrics.dropped.value, 2)
+        self.assertEqual(self.metrics.flushed.value, 0)
+
+    def test_gauges(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        timers = self.metrics.gauges['timers']
+        timer = conslayer.PeriodicTimer(scheduler, 1., lambda: None)
+        self.assertEqual(self.metrics.gauges['timers'], timers + 1)
+        timer.dispose()
+        timer.dispose()
+        self.assertEqual(self.metrics.gauges['timers'], timers)
+        subscriptions = self.metrics.gauges['subscriptions']
+        subscription = conslayer.Subject().subscribe(lambda _: None)
+        listener = conslayer.Arena().on('death', lambda _: None)
+        self.assertEqual(self.metrics.gauges['subscriptions'], subscriptions + 2)
+        subscription.dispose()
+        listener.dispose()
+        self.assertEqual(self.metrics.gauges['subscriptions'], subscriptions)
+
+    def test_fight(self):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        self.metrics.enabled = True
+        arena.start_fight()
+        for _ in range(4):
+            arena["hero"].attack("orc")
+        arena.stop_fight()
+        self.metrics.enabled = False
+        self.assertEqual(self.metrics.deaths.value, 1)
+        self.assertEqual(self.metrics.fight_duration.count, 1)
+        self.assertIn('commands', self.metrics.gauges)
+        self.assertIn('scheduler_lag', self.metrics.gauges)
+        self.assertIn('messages', self.metrics.gauges)
+
+    def test_expose(self):
+        self.metrics.attacks.inc(2)
+        self.metrics.attack_latency.observe(3e-6)
+        text = self.metrics.expose()
+        self.assertIn("# TYPE conslayer_attacks_total counter\nconslayer_attacks_total 2\n", text)
+        self.assertIn("# TYPE conslayer_attack_latency_seconds histogram", text)
+        self.assertIn('conslayer_attack_latency_seconds_bucket{le="4e-06"} 1', text)
+        self.assertIn('conslayer_attack_latency_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("conslayer_attack_latency_seconds_count 1", text)
+        self.assertIn("# TYPE conslayer_timers gauge", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_str(self):
+        text = str(self.metrics)
+        self.assertIn("attacks: 0", text)
+        self.assertIn("attack_latency", text)
+        self.assertIn("timers", text)
+
+class ExporterTest(unittest.TestCase):
+    def tearDown(self):
+        conslayer.Metrics().reset()
+
+    def test_server(self):
+        server = conslayer.MetricsServer(port=0)
+        server.start()
+        try:
+            self.assertTrue(server.started)
+            conslayer.Metrics().attacks.inc()
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn("text/plain", response.headers['Content-Type'])
+                self.assertIn("conslayer_attacks_total 1", response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(server.url[:-len("metrics")], timeout=5)
+        finally:
+            server.stop()
+        self.assertFalse(server.started)
+
+    def test_dump(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "conslayer.prom")
+            dump = conslayer.MetricsDump(path, interval=10., scheduler=scheduler)
+            dump.start()
+            self.assertIn("conslayer_attacks_total 0", open(path).read())
+            conslayer.Metrics().attacks.inc()
+            scheduler.advance_by(10.)
+            self.assertIn("conslayer_attacks_total 1", open(path).read())
+            dump.stop()
+            self.assertFalse(dump.started)
+            self.assertEqual(os.listdir(folder), ["conslayer.prom"])
+        with self.assertRaises(TypeError):
+            conslayer.MetricsDump(path, interval=10)
+
+if __name__ == '__main__':
+    unittest.main()
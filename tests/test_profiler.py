@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for profiling management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+import unittest
+import reactivex as rx
+import conslayer
+from conslayer import cli, profiler
+from conslayer.profiler import Profiler
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            Profiler('unknown')
+        with self.assertRaises(TypeError):
+            Profiler('wave', 10, 60)
+        with self.assertRaises(ValueError):
+            Profiler('wave', 0)
+
+    def test_run(self):
+        profiler = Profiler('arenas', 2, 10.)
+        profiler.run()
+        self.assertEqual(profiler.fights, 2)
+        self.assertGreater(profiler.peak, 0)
+        self.assertEqual(
+            list(profiler.allocations),
+            ['Arena', 'Guardian', 'Combatant', 'MessageQueue', 'Other'])
+        self.assertGreater(profiler.allocations['Arena'][0], 0)
+        report = profiler.report()
+        self.assertIn("Scenario: arenas (size 2, 10 virtual seconds)", report)
+        self.assertIn("CPU time by function:", report)
+        self.assertEqual(len(conslayer.Arena()), 0)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "profile.pstats")
+            profiler.dump(path)
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+    def test_roster_invalid(self):
+        combatants = conslayer.CombatantDict()
+        saved = dict(combatants)
+        scheduler = rx.scheduler.HistoricalScheduler()
+        try:
+            for name in ("orc", "dragon"):
+                del combatants[name]
+            with self.assertRaises(ValueError):
+                profiler.roster(scheduler, 2, 10.)
+            combatants.update(saved)
+            del combatants["hero"]
+            with self.assertRaises(ValueError):
+                profiler.roster(scheduler, 2, 10.)
+        finally:
+            combatants.update(saved)
+            profiler._teardown()
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as folder:
+            prefix = os.path.join(folder, "wave")
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                status = cli.main(
+                    ["profile", "wave", "--size", "5", "--duration", "5", "--output", prefix])
+            self.assertEqual(status, 0)
+            self.assertIn("Scenario: wave", stdout.getvalue())
+            self.assertTrue(os.path.exists(prefix + ".txt"))
+            self.assertTrue(os.path.exists(prefix + ".pstats"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for health recording management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import importlib.util
+import os
+import tempfile
+import unittest
+import reactivex as rx
+import conslayer
+
+class HealthRecorderTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        self.scheduler = rx.scheduler.HistoricalScheduler()
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = self.scheduler
+        arena.add("hero")
+        arena.add("orc")
+
+    def tearDown(self):
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = None
+
+    def fight(self, recorder):
+        arena = conslayer.Arena()
+        recorder.start()
+        arena.start_fight()
+        for _ in range(4):
+            self.scheduler.advance_by(1.)
+            arena["hero"].attack("orc")
+        arena.stop_fight()
+        recorder.stop()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            conslayer.HealthRecorder(interval=1)
+        with self.assertRaises(ValueError):
+            conslayer.HealthRecorder(budget=10)
+        with self.assertRaises(ValueError):
+            conslayer.HealthRecorder(interval=-1.)
+
+    def test_record(self):
+        recorder = conslayer.HealthRecorder()
+        self.fight(recorder)
+        self.assertFalse(recorder.recording)
+        series = dict((name, (list(times), list(health)))
+            for name, times, health in recorder.series)
+        self.assertEqual(series["hero"], ([0., 1.5, 3.], [40, 39, 38]))
+        self.assertEqual(series["orc"], ([0., 1., 2., 3., 4.], [7, 5, 3, 1, 0]))
+        self.assertEqual(recorder.size, 2 * 64 * 12)
+        self.assertEqual(recorder.dropped, 0)
+
+    def test_downsample(self):
+        recorder = conslayer.HealthRecorder(interval=2.)
+        self.fight(recorder)
+        orc = [health for name, _, health in recorder.series if name == "orc"][0]
+        self.assertEqual(list(orc), [7, 3, 0])
+
+    def test_budget(self):
+        recorder = conslayer.HealthRecorder(budget=64 * 12)
+        self.fight(recorder)
+        self.assertEqual(recorder.size, 64 * 12)
+        self.assertEqual([name for name, _, _ in recorder.series], ["hero"])
+        self.assertEqual(recorder.dropped, 5)
+
+    def test_decimate(self):
+        species = conslayer.Species(conslayer.Monster, "golem", 10**6, 0, 1000.)
+        arena = conslayer.Arena()
+        arena.enter(species.spawn())
+        recorder = conslayer.HealthRecorder(budget=3 * 64 * 12)
+        recorder.start()
+        arena.start_fight()
+        for _ in range(1000):
+            self.scheduler.advance_by(.01)
+            arena["hero"].attack("golem")
+        recorder.stop()
+        self.assertLessEqual(recorder.size, 3 * 64 * 12)
+        self.assertGreater(recorder.interval, 0.)
+        golem = [times for name, times, _ in recorder.series if name == "golem"][0]
+        self.assertEqual(golem[0], 0.)
+        self.assertGreater(golem[-1], 9.)
+        self.assertEqual(list(golem), sorted(golem))
+        self.assertEqual(recorder.dropped, 0)
+
+    def test_save(self):
+        recorder = conslayer.HealthRecorder()
+        self.fight(recorder)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "fight.bin")
+            recorder.save(path)
+            self.assertEqual(conslayer.HealthRecorder.load(path), recorder.series)
+            with open(path, "r+b") as file:
+                file.truncate(30)
+            with self.assertRaises(ValueError):
+                conslayer.HealthRecorder.load(path)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "requires numpy")
+    def test_numpy(self):
+        recorder = conslayer.HealthRecorder()
+        self.fight(recorder)
+        for (name, times, health), series in zip(recorder.to_numpy(), recorder.series):
+            self.assertEqual(name, series[0])
+            self.assertEqual(list(times), list(series[1]))
+            self.assertEqual(list(health), list(series[2]))
+
+if __name__ == '__main__':
+    unittest.main()
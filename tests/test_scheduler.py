@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for scheduler management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import unittest
+import reactivex as rx
+import conslayer
+
+class PeriodicTimerTest(unittest.TestCase):
+    def test_init(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        with self.assertRaises(TypeError):
+            conslayer.PeriodicTimer(scheduler, 1, lambda: None)
+        with self.assertRaises(ValueError):
+            conslayer.PeriodicTimer(scheduler, 0., lambda: None)
+        with self.assertRaises(ValueError):
+            conslayer.PeriodicTimer(scheduler, 1., lambda: None, policy="none")
+
+    def test_deadlines(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        start = scheduler.now
+        calls = []
+        timer = conslayer.PeriodicTimer(
+            scheduler, 1.5, lambda: calls.append(scheduler.now - start))
+        scheduler.advance_by(6.)
+        self.assertEqual([t.total_seconds() for t in calls], [1.5, 3., 4.5, 6.])
+        self.assertEqual(timer.count, 4)
+        self.assertEqual(timer.stats['lag'], 0.)
+        self.assertEqual(timer.stats['jitter'], 0.)
+        self.assertEqual(timer.remaining, 1.5)
+        timer.dispose()
+        scheduler.advance_by(6.)
+        self.assertEqual(timer.count, 4)
+
+    def test_errors(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        stdout = conslayer.MessageQueue()
+        stdout.flush()
+        calls = []
+        def attack():
+            calls.append(scheduler.now)
+            if len(calls) == 1:
+                raise KeyError("orc")
+        timer = conslayer.PeriodicTimer(scheduler, 1., attack)
+        scheduler.advance_by(3.)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(timer.errors, 1)
+        self.assertEqual(list(stdout), ["Timer action 'attack' failed: KeyError('orc')"])
+        stdout.flush()
+        timer.dispose()
+
+    def test_delay(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        timer = conslayer.PeriodicTimer(scheduler, 2., lambda: None, delay=.5)
+        scheduler.advance_by(3.)
+        self.assertEqual(timer.count, 2)
+        self.assertEqual(timer.remaining, 1.5)
+
+    def test_catchup(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        stall = [2.5]
+        def action():
+            if stall: scheduler.sleep(stall.pop())
+        timer = conslayer.PeriodicTimer(scheduler, 1., action)
+        scheduler.advance_by(4.)
+        self.assertEqual(timer.count, 4)
+        self.assertEqual(timer.skipped, 0)
+        self.assertEqual(timer.stats['lag_max'], 1.5)
+        self.assertTrue(timer.stats['jitter'] > 0.)
+
+    def test_skip(self):
+        scheduler = rx.scheduler.HistoricalScheduler()
+        stall = [2.5]
+        def action():
+            if stall: scheduler.sleep(stall.pop())
+        timer = conslayer.PeriodicTimer(scheduler, 1., action, policy="skip")
+        scheduler.advance_by(4.)
+        self.assertEqual(timer.count, 3)
+        self.assertEqual(timer.skipped, 1)
+        self.assertEqual(timer.stats['lag_max'], .5)
+
+
+if __name__ == '__main__':
+    unittest.main()
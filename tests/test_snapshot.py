@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for snapshot management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import math
+import os
+import tempfile
+import unittest
+import conslayer
+from conslayer import snapshot
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "arena.snapshot")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_capture(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        snapshot = conslayer.Snapshot.capture(arena)
+        self.assertEqual(len(snapshot), 2)
+        self.assertFalse(snapshot.started)
+        records = list(snapshot)
+        self.assertEqual(records[0][:3], ("hero", "hero", arena["hero"].health))
+        self.assertEqual(records[1][:3], ("orc", "orc", arena["orc"].health))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            conslayer.Snapshot(b"")
+        with self.assertRaises(ValueError):
+            conslayer.Snapshot(b"XXXX" + bytes(8))
+
+    def test_restore(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("orc")
+        arena["orc"].get_weakened(3)
+        health = arena["orc"].health
+        arena.snapshot(self.path)
+        arena.clear()
+        arena.restore(self.path)
+        self.assertEqual(len(arena), 2)
+        self.assertEqual(arena["orc"].health, health)
+        self.assertFalse(arena.started)
+
+    def test_restore_fight(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        arena.add("hero")
+        arena.add("dragon")
+        arena.start_fight()
+        arena.snapshot(self.path)
+        arena.stop_fight()
+        arena.clear()
+        arena.restore(self.path)
+        self.assertTrue(arena.started)
+        phase = arena.next_attack("dragon")
+        self.assertEqual(arena.next_attack("hero"), None)
+        arena.stop_fight()
+        self.assertTrue(0 < phase <= arena["dragon"].interval)
+
+    def test_capture_long_name(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.enter(conslayer.CombatantDict()["orc"].spawn("orc" * 11))
+        with self.assertRaises(ValueError):
+            conslayer.Snapshot.capture(arena)
+        arena.clear()
+
+    def test_capture_concurrent(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.add("hero")
+        arena.add("orc")
+        species = conslayer.CombatantDict()["orc"]
+
+        # Arena, which is changed by another thread while it is captured
+        class Changing(object):
+            spawned = 0
+            def __len__(self):
+                return len(arena)
+            def __iter__(self):
+                return iter(arena)
+            @property
+            def started(self):
+                Changing.spawned += 1
+                arena.enter(species.spawn(f"orc-{Changing.spawned}"))
+                arena.remove("orc")
+                return arena.started
+            def next_attack(self, name):
+                return arena.next_attack(name)
+
+        try:
+            snapshot = conslayer.Snapshot.capture(Changing())
+            self.assertEqual([name for name, _, _, _ in snapshot], ["hero", "orc"])
+        finally:
+            arena.clear()
+            conslayer.MessageQueue().flush()
+
+    def test_restore_unknown(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.add("hero")
+        buffer = snapshot.HEADER.pack(snapshot.MAGIC, snapshot.VERSION, 0, 1) \
+            + snapshot.RECORD.pack(b"goblin", b"goblin", 5, math.nan)
+        with self.assertRaises(ValueError):
+            conslayer.Snapshot(buffer).restore(arena)
+        self.assertEqual([combatant.name for combatant in arena], ["hero"])
+        arena.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
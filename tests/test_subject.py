@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for subject management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import unittest
+import reactivex as rx
+from reactivex import operators as ops
+import conslayer
+
+class Value(conslayer.Subject):
+    __slots__ = ('__value',)
+
+    @property
+    def value(self):
+        return self.__value
+
+    def __init__(self, value):
+        super().__init__()
+        self.__value = value
+
+    def on_next(self, value):
+        self.__value = value
+        super().on_next(value)
+
+class SubjectTest(unittest.TestCase):
+    def test_init(self):
+        subject = Value(1)
+        self.assertEqual(subject.value, 1)
+        self.assertFalse(subject.observed)
+        self.assertFalse(hasattr(subject, "__dict__"))
+
+    def test_subscribe(self):
+        subject = Value(1)
+        values = []
+        subscription = subject.subscribe(values.append)
+        self.assertTrue(subject.observed)
+        self.assertEqual(subject.observers, 1)
+        subject.on_next(2)
+        subscription.dispose()
+        subscription.dispose()
+        subject.on_next(3)
+        self.assertEqual(values, [1, 2])
+        self.assertFalse(subject.observed)
+        self.assertEqual(subject.observers, 0)
+        with self.assertRaises(TypeError):
+            subject.subscribe(None)
+
+    def test_subscribe_error(self):
+        subject = Value(1)
+        live = conslayer.Subject.live()
+        def fail(value):
+            raise ValueError(value)
+        with self.assertRaises(ValueError):
+            subject.subscribe(fail)
+        self.assertFalse(subject.observed)
+        self.assertEqual(conslayer.Subject.live(), live)
+
+    def test_subscribe_rx(self):
+        subject = Value(1)
+        values = []
+        errors = []
+        subscription = subject.subscribe(values.append, errors.append, lambda: None)
+        subject.on_next(2)
+        subscription.dispose()
+        subscription = subject.subscribe(on_next=values.append, on_error=errors.append)
+        subject.on_next(3)
+        subscription.dispose()
+        self.assertEqual(values, [1, 2, 2, 3])
+        self.assertEqual(errors, [])
+        with self.assertRaises(TypeError):
+            subject.subscribe(on_error=errors.append)
+
+    def test_observer(self):
+        subject = Value(1)
+        values = []
+        observer = rx.Observer(on_next=values.append)
+        subject.subscribe(observer)
+        subject.on_next(2)
+        self.assertEqual(values, [1, 2])
+
+    def test_observable(self):
+        subject = Value(1)
+        values = []
+        subscription = subject.pipe(ops.map(lambda x: x * 10)).subscribe(values.append)
+        subject.on_next(2)
+        subscription.dispose()
+        subject.on_next(3)
+        self.assertEqual(values, [10, 20])
+        self.assertFalse(subject.observed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for topic management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import unittest
+import conslayer
+
+class TopicRegistryTest(unittest.TestCase):
+    def test_subscribe(self):
+        topics = conslayer.TopicRegistry()
+        events = []
+        with self.assertRaises(TypeError):
+            topics.subscribe(1, events.append)
+        with self.assertRaises(TypeError):
+            topics.subscribe("death", None)
+        subscription = topics.subscribe("death", events.append)
+        self.assertIn("death", topics)
+        self.assertEqual(len(topics), 1)
+        self.assertEqual(topics.count("death"), 1)
+        self.assertEqual(topics.count("hit"), 0)
+        subscription.dispose()
+        subscription.dispose()
+        self.assertNotIn("death", topics)
+        self.assertEqual(len(topics), 0)
+
+    def test_publish(self):
+        topics = conslayer.TopicRegistry()
+        deaths = []
+        spawns = []
+        topics.subscribe("death", deaths.append)
+        topics.subscribe("spawn", spawns.append)
+        topics.publish("death", "orc")
+        topics.publish("hit:orc", "hero")
+        self.assertEqual(deaths, ["orc"])
+        self.assertEqual(spawns, [])
+
+    def test_arena(self):
+        conslayer.MessageQueue().silent = True
+        conslayer.Arena().clear()
+        arena = conslayer.Arena()
+        spawns = []
+        hits = []
+        deaths = []
+        states = []
+        subscriptions = [
+            arena.on("spawn", lambda combatant: spawns.append(combatant.name)),
+            arena.on("hit:orc", hits.append),
+            arena.on("death", lambda combatant: deaths.append(combatant.name)),
+            arena.on("fight_state", states.append)]
+        arena.add("hero")
+        arena.add("orc")
+        arena.start_fight()
+        for _ in range(4):
+            arena["hero"].attack("orc")
+        arena.stop_fight()
+        for subscription in subscriptions:
+            subscription.dispose()
+        self.assertEqual(spawns, ["hero", "orc"])
+        self.assertEqual([hit["health"] for hit in hits], [5, 3, 1, 0])
+        self.assertEqual(deaths, ["orc"])
+        self.assertEqual(states, [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
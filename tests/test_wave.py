@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for wave management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import unittest
+import reactivex as rx
+import conslayer
+
+class CombatantPoolTest(unittest.TestCase):
+    def test_acquire(self):
+        species = conslayer.CombatantDict()["orc"]
+        pool = conslayer.CombatantPool()
+        orc = pool.acquire(species, "orc-1")
+        self.assertEqual(orc.name, "orc-1")
+        self.assertEqual(pool.created, 1)
+        orc.get_weakened(orc.health)
+        self.assertTrue(pool.release(orc))
+        self.assertEqual(len(pool), 1)
+        recycled = pool.acquire(species, "orc-2")
+        self.assertIs(recycled, orc)
+        self.assertEqual(recycled.name, "orc-2")
+        self.assertEqual(recycled.health, species.health)
+        self.assertEqual(pool.recycled, 1)
+        self.assertEqual(len(pool), 0)
+
+    def test_release(self):
+        species = conslayer.CombatantDict()["orc"]
+        pool = conslayer.CombatantPool(limit=1)
+        orcs = [pool.acquire(species, f"orc-{i}") for i in range(3)]
+        subscription = orcs[0].subscribe(lambda _: None)
+        self.assertFalse(pool.release(orcs[0]))
+        subscription.dispose()
+        self.assertTrue(pool.release(orcs[1]))
+        self.assertFalse(pool.release(orcs[2]))
+
+class WaveTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        self.scheduler = rx.scheduler.HistoricalScheduler()
+        arena = conslayer.Arena()
+        arena.clear()
+        arena.scheduler = self.scheduler
+
+    def tearDown(self):
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.scheduler = None
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            conslayer.Wave(rate=0.)
+        with self.assertRaises(ValueError):
+            conslayer.Wave(species=[])
+
+    def test_spawn(self):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        wave = conslayer.Wave(rate=2., limit=3, species=["orc"])
+        wave.start()
+        self.assertTrue(arena.endless)
+        arena.start_fight()
+        self.assertTrue(arena.started)
+        self.scheduler.advance_by(1.)
+        self.assertEqual(wave.spawned, 2)
+        self.assertEqual(len(arena.monsters), 2)
+        self.scheduler.advance_by(5.)
+        self.assertEqual(wave.alive, 3)
+        self.assertEqual(len(arena.monsters), 3)
+        wave.stop()
+        self.assertFalse(arena.endless)
+
+    def test_recycle(self):
+        arena = conslayer.Arena()
+        arena.add("hero")
+        conslayer.Guardian().watch(arena)
+        wave = conslayer.Wave(rate=1., species=["orc"])
+        wave.start()
+        arena.start_fight()
+        self.scheduler.advance_by(1.)
+        orc = arena["orc-1"]
+        for _ in range(4):
+            arena["hero"].attack("orc-1")
+        self.assertNotIn("orc-1", arena)
+        self.assertTrue(arena.started)
+        self.assertEqual(len(wave.pool), 1)
+        self.scheduler.advance_by(1.)
+        self.assertIs(arena["orc-2"], orc)
+        self.assertEqual(wave.pool.recycled, 1)
+        arena.stop_fight()
+        self.assertFalse(wave.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2022 Patrick Michl
+# This file is part of Console Slayer, https://github.com/fishroot/conslayer
+#
+"""Testcases for wire protocol management."""
+
+__copyright__ = '2022 Patrick Michl'
+__license__ = 'MIT'
+__docformat__ = 'google'
+__author__ = 'Patrick Michl'
+__email__ = 'patrick.michl@gmail.com'
+__authors__ = ['Patrick Michl <patrick.michl@gmail.com>']
+
+import unittest
+import conslayer
+from conslayer import wire
+
+class WireTest(unittest.TestCase):
+    def setUp(self):
+        conslayer.MessageQueue().silent = True
+        arena = conslayer.Arena()
+        arena.stop_fight()
+        arena.clear()
+        arena.add("hero")
+        arena.add("orc")
+        self.arena = arena
+
+    def tearDown(self):
+        self.arena.stop_fight()
+        self.arena.clear()
+        conslayer.MessageQueue().flush()
+
+    def expected(self):
+        state = self.arena.state.copy()
+        for row in state:
+            row['kind'] = row['kind'].__name__.lower()
+        return state
+
+    def test_varint(self):
+        for value in (0, 1, 127, 128, 300, 2**35):
+            self.assertEqual(wire._read(memoryview(self.varint(value)), 0)[0], value)
+        for value in (0, 1, -1, 64, -65):
+            self.assertEqual(wire._unzigzag(wire._zigzag(value)), value)
+        self.assertEqual(wire._zigzag(-1), 1)
+        with self.assertRaises(ValueError):
+            wire._read(memoryview(b"\x80"), 0)
+
+    def varint(self, value):
+        encoded = bytearray()
+        while value >= 0x80:
+            encoded.append(value & 0x7f | 0x80)
+            value >>= 7
+        encoded.append(value)
+        return bytes(encoded)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            conslayer.WireEncoder(1.)
+        with self.assertRaises(ValueError):
+            conslayer.WireEncoder(0)
+
+    def test_keyframe(self):
+        encoder = conslayer.WireEncoder()
+        decoder = conslayer.WireDecoder()
+        frame = encoder.encode(self.arena)
+        self.assertEqual(frame[0], wire.KEYFRAME)
+        self.assertTrue(decoder.decode(frame))
+        self.assertTrue(decoder.synced)
+        self.assertFalse(decoder.started)
+        self.assertEqual(decoder.sequence, 0)
+        self.assertEqual(decoder.state, self.expected())
+
+    def test_delta(self):
+        encoder = conslayer.WireEncoder()
+        decoder = conslayer.WireDecoder()
+        keyframe = bytes(encoder.encode(self.arena))
+
+        # Unchanged arena is encoded in a few bytes
+        frame = encoder.encode(self.arena)
+        self.assertEqual(bytes(frame), bytes([wire.DELTA, 1, 0, 0]))
+
+        # Changed health is encoded in a field mask
+        self.arena["orc"].get_weakened(2)
+        delta = bytes(encoder.encode(self.arena))
+        orc = self.arena["orc"]
+        self.assertEqual(delta, bytes([wire.DELTA, 2, 0, 1])
+            + self.varint(orc.id) + bytes([wire.HEALTH, orc.health * 2]))
+        self.arena.remove("orc")
+        self.arena.add("dragon")
+        self.arena.start_fight()
+        removed = bytes(encoder.encode(self.arena))
+        self.assertTrue(removed[0] & wire.FLAG_STARTED)
+
+        for frame in (keyframe, bytes([wire.DELTA, 1, 0, 0]), delta, removed):
+            self.assertTrue(decoder.decode(frame))
+        self.assertTrue(decoder.started)
+        self.assertEqual(decoder.state, self.expected())
+
+    def test_sync(self):
+        encoder = conslayer.WireEncoder(keyframe=3)
+        decoder = conslayer.WireDecoder()
+        frames = []
+        for _ in range(7):
+            self.arena["orc"].get_weakened(1)
+            frames.append(bytes(encoder.encode(self.arena)))
+        self.assertEqual([frame[0] for frame in frames], [
+            wire.KEYFRAME, wire.DELTA, wire.DELTA,
+            wire.KEYFRAME, wire.DELTA, wire.DELTA, wire.KEYFRAME])
+
+        # Deltas are skipped before the first keyframe and after missed frames
+        self.assertFalse(decoder.decode(frames[1]))
+        self.assertTrue(decoder.decode(frames[3]))
+        self.assertFalse(decoder.decode(frames[5]))
+        self.assertFalse(decoder.synced)
+        self.assertTrue(decoder.decode(frames[6]))
+        self.assertEqual(decoder.state, self.expected())
+
+        # Keyframes are encoded on demand
+        self.assertEqual(encoder.encode(self.arena, keyframe=True)[0], wire.KEYFRAME)
+        encoder.reset()
+        self.assertEqual(encoder.sequence, 0)
+        self.assertEqual(encoder.encode(self.arena)[0], wire.KEYFRAME)
+
+    def test_buffers(self):
+        encoder = conslayer.WireEncoder()
+        first = encoder.encode(self.arena)
+        data = bytes(first)
+        second = encoder.encode(self.arena)
+        self.assertEqual(bytes(first), data)
+        self.assertNotEqual(bytes(second), data)
+
+        # Buffers grow, even if previous frames are referenced
+        species = conslayer.CombatantDict()["orc"]
+        for index in range(40):
+            self.arena.enter(species.spawn(f"orc-{index}"))
+        third = encoder.encode(self.arena)
+        self.assertGreater(len(third), wire.CAPACITY)
+        decoder = conslayer.WireDecoder()
+        self.assertTrue(decoder.decode(encoder.encode(self.arena, keyframe=True)))
+        self.assertEqual(len(decoder.state), len(self.arena))
+
+    def test_invalid(self):
+        decoder = conslayer.WireDecoder()
+        frame = bytes(conslayer.WireEncoder().encode(self.arena))
+        with self.assertRaises(ValueError):
+            decoder.decode(b"")
+        with self.assertRaises(ValueError):
+            decoder.decode(frame[:-1])
+        with self.assertRaises(ValueError):
+            decoder.decode(frame + b"\0")
+        with self.assertRaises(ValueError):
+            decoder.decode(bytes([0x3, 0]))
+        with self.assertRaises(ValueError):
+            decoder.decode(bytes([wire.KEYFRAME, 0, wire.VERSION + 1, 0]))
+        self.assertFalse(decoder.synced)
+
+if __name__ == '__main__':
+    unittest.main()